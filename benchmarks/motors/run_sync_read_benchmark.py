@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Assess the latency and throughput of reading the positions of all the motors of a bus.
+
+The motors are simulated by the mocks used in the tests (`tests/mocks/mock_feetech.py` and
+`tests/mocks/mock_dynamixel.py`), so the results measure the overhead of the software rather than the one of the
+serial communication. Three ways of reading are compared:
+- `uncached`: the sync read packet is built again for every read (the previous behavior of `sync_read`).
+- `cached`: `sync_read` with the sync read packet built once and reused.
+- `pipelined`: `async_read`, which requests the next positions right after receiving the current ones.
+
+Between two reads, the loop simulates the computation of an action with `--work-ms`, during which the pipelined
+read gets its response. Run from the root of the repository:
+```
+python -m benchmarks.motors.run_sync_read_benchmark --num-reads 500 --work-ms 2
+```
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from contextlib import nullcontext
+from unittest.mock import patch
+
+import numpy as np
+
+from lerobot.common.motors import Motor, MotorNormMode
+from lerobot.common.motors.dynamixel import DynamixelMotorsBus
+from lerobot.common.motors.feetech import FeetechMotorsBus
+from lerobot.common.motors.motors_bus import MotorsBus, get_address
+
+BUSES = {
+    "feetech": (FeetechMotorsBus, "sts3215", "tests.mocks.mock_feetech", "scservo_sdk"),
+    "dynamixel": (DynamixelMotorsBus, "xl430-w250", "tests.mocks.mock_dynamixel", "dynamixel_sdk"),
+}
+MODES = ["uncached", "cached", "pipelined"]
+
+
+def read_positions(bus: MotorsBus, mode: str) -> float:
+    """Reads the positions of all motors and returns the age of the values."""
+    start = time.perf_counter()
+    if mode == "pipelined":
+        _, age = bus.async_read("Present_Position", normalize=False)
+        return age
+    if mode == "uncached":
+        bus._sync_read_plans.clear()
+    bus.sync_read("Present_Position", normalize=False)
+    return time.perf_counter() - start
+
+
+def benchmark_bus(bus_type: str, num_motors: int, num_reads: int, work_s: float) -> list[dict]:
+    bus_cls, model, mocks_module, sdk_module = BUSES[bus_type]
+    mocks = importlib.import_module(mocks_module)
+    sdk = importlib.import_module(sdk_module)
+
+    motors = {
+        f"motor_{id_}": Motor(id_, model, MotorNormMode.RANGE_M100_100) for id_ in range(1, num_motors + 1)
+    }
+    positions = {m.id: 1000 + m.id for m in motors.values()}
+    addr, length = get_address(bus_cls.model_ctrl_table, model, "Present_Position")
+
+    mock_motors = mocks.MockMotors()
+    mock_motors.open()
+    mock_motors.build_sync_read_stub(addr, length, positions)
+    # See the `patch_port_handler` fixtures of the tests
+    port_patch = (
+        patch.object(sdk, "PortHandler", mocks.MockPortHandler) if sys.platform == "darwin" else nullcontext()
+    )
+
+    results = []
+    try:
+        with port_patch:
+            bus = bus_cls(port=mock_motors.port, motors=motors)
+            bus.connect(handshake=False)
+        for mode in MODES:
+            read_positions(bus, mode)  # warmup
+            latencies, ages = [], []
+            start = time.perf_counter()
+            for _ in range(num_reads):
+                read_start = time.perf_counter()
+                ages.append(read_positions(bus, mode))
+                latencies.append(time.perf_counter() - read_start)
+                time.sleep(work_s)
+            elapsed = time.perf_counter() - start
+
+            latencies_ms, ages_ms = np.array(latencies) * 1e3, np.array(ages) * 1e3
+            results.append(
+                {
+                    "bus": bus_type,
+                    "mode": mode,
+                    "latency_mean_ms": latencies_ms.mean(),
+                    "latency_p99_ms": np.percentile(latencies_ms, 99),
+                    "age_mean_ms": ages_ms.mean(),
+                    "throughput_hz": num_reads / elapsed,
+                }
+            )
+        bus.disconnect(disable_torque=False)
+    finally:
+        mock_motors.close()
+
+    return results
+
+
+def main(buses: list[str], num_motors: int, num_reads: int, work_ms: float):
+    results = []
+    for bus_type in buses:
+        results.extend(benchmark_bus(bus_type, num_motors, num_reads, work_ms / 1e3))
+
+    header = list(results[0])
+    print(" | ".join(f"{col:>15}" for col in header))
+    for result in results:
+        print(
+            " | ".join(f"{val:>15.3f}" if isinstance(val, float) else f"{val:>15}" for val in result.values())
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--buses",
+        type=str,
+        nargs="*",
+        choices=list(BUSES),
+        default=list(BUSES),
+        help="Motors buses to benchmark.",
+    )
+    parser.add_argument("--num-motors", type=int, default=6, help="Number of simulated motors.")
+    parser.add_argument("--num-reads", type=int, default=500, help="Number of reads for each mode.")
+    parser.add_argument(
+        "--work-ms",
+        type=float,
+        default=2.0,
+        help="Time spent between two reads, simulating the computation of an action.",
+    )
+    args = parser.parse_args()
+    main(**vars(args))
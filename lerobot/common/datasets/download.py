@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Parallel download of the episode files of a LeRobotDataset.
+
+Files are fetched by a pool of threads from a `FileSource` (the Hugging Face Hub, any HTTP server mirroring the
+repository layout, or a local directory) in priority order. Each file is streamed into a '.incomplete' file
+next to its destination, hashed on the fly and checked against the size and sha256 reported by the source,
+then renamed. An interrupted download resumes from its '.incomplete' file on the next attempt. A file that
+failed to download leaves a '.failed' file behind, so that the processes waiting for it on disk find out, and
+these processes ask for the files they need first by leaving request files for the main process to pick up.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+from huggingface_hub import HfApi, hf_hub_url
+from huggingface_hub.utils import build_hf_headers
+
+CHUNK_SIZE = 1024**2
+INCOMPLETE_SUFFIX = ".incomplete"
+FAILED_SUFFIX = ".failed"
+REQUESTS_DIR = "cache/download_requests"
+REQUEST_SUFFIX = ".request"
+
+
+@dataclass
+class FileInfo:
+    size: int | None = None
+    sha256: str | None = None
+
+
+class FileSource:
+    """Where files are downloaded from, given their path relative to the root of the dataset."""
+
+    def get_files_info(self, paths: list[str]) -> dict[str, FileInfo]:
+        """Expected size and checksum of the files, when known."""
+        return {}
+
+    def open(self, path: str, offset: int = 0) -> tuple[Iterator[bytes], bool]:
+        """Returns an iterator over the bytes of the file starting at `offset`, and whether the source could
+        start at `offset`. If it couldn't, the iterator starts at the beginning of the file.
+        """
+        raise NotImplementedError
+
+
+class LocalDirSource(FileSource):
+    """Copies files from a local directory with the same layout as the dataset, e.g. a mirror on a network
+    drive. Checksums are computed from the source files.
+    """
+
+    def __init__(self, source_dir: str | Path):
+        self.source_dir = Path(source_dir)
+
+    def get_files_info(self, paths: list[str]) -> dict[str, FileInfo]:
+        infos = {}
+        for path in paths:
+            fpath = self.source_dir / path
+            if fpath.is_file():
+                infos[path] = FileInfo(size=fpath.stat().st_size, sha256=_hash_file(fpath).hexdigest())
+        return infos
+
+    def open(self, path: str, offset: int = 0) -> tuple[Iterator[bytes], bool]:
+        def _read():
+            with open(self.source_dir / path, "rb") as f:
+                f.seek(offset)
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+
+        return _read(), True
+
+
+class HttpSource(FileSource):
+    """Streams files from `base_url/path`, using range requests to resume downloads when supported."""
+
+    def __init__(self, base_url: str, headers: dict | None = None, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers if headers is not None else {}
+        self.timeout = timeout
+
+    def get_url(self, path: str) -> str:
+        return f"{self.base_url}/{path}"
+
+    def open(self, path: str, offset: int = 0) -> tuple[Iterator[bytes], bool]:
+        headers = dict(self.headers)
+        if offset > 0:
+            headers["Range"] = f"bytes={offset}-"
+        response = requests.get(self.get_url(path), headers=headers, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        return response.iter_content(chunk_size=CHUNK_SIZE), offset > 0 and response.status_code == 206
+
+
+class HubSource(HttpSource):
+    """Streams files of a dataset repository on the Hugging Face Hub. Checksums are only available for the
+    files stored with git LFS, which includes videos and parquet files.
+    """
+
+    def __init__(self, repo_id: str, revision: str | None = None, timeout: float = 30.0):
+        super().__init__("", headers=build_hf_headers(), timeout=timeout)
+        self.repo_id = repo_id
+        self.revision = revision
+
+    def get_url(self, path: str) -> str:
+        return hf_hub_url(self.repo_id, path, repo_type="dataset", revision=self.revision)
+
+    def get_files_info(self, paths: list[str], batch_size: int = 500) -> dict[str, FileInfo]:
+        infos = {}
+        hub_api = HfApi()
+        for start in range(0, len(paths), batch_size):
+            for file in hub_api.get_paths_info(
+                self.repo_id, paths[start : start + batch_size], revision=self.revision, repo_type="dataset"
+            ):
+                lfs = getattr(file, "lfs", None)
+                infos[file.path] = FileInfo(size=file.size, sha256=lfs.sha256 if lfs else None)
+        return infos
+
+
+class ParallelDownloader:
+    """
+    Downloads files into `root` with `num_workers` threads, in the order in which they are submitted unless
+    some of them are moved ahead with `prioritize`. Files which are already present with the expected size
+    are skipped.
+
+    `wait` blocks until the given files have landed. The downloader can be pickled to DataLoader workers, in
+    which case their copy only waits for the files to appear on disk while the downloads carry on in the
+    main process, and raises when the main process leaves a failure marker next to a file. Their `prioritize`
+    writes a request file into `root/REQUESTS_DIR` instead, which the main process reads before each download.
+    """
+
+    def __init__(self, source: FileSource, root: str | Path, num_workers: int = 8, max_attempts: int = 2):
+        self.source = source
+        self.root = Path(root)
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        self.file_infos: dict[str, FileInfo] = {}
+        self.status: dict[str, str] = {}  # path -> "queued", "running", "done" or "failed"
+        self.errors: dict[str, Exception] = {}
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._requests_dir = self.root / REQUESTS_DIR
+        for fpath in self._requests_dir.glob(f"*{REQUEST_SUFFIX}"):
+            # Left by a previous run
+            fpath.unlink(missing_ok=True)
+        self._threads = []
+        for _ in range(num_workers):
+            t = threading.Thread(target=self._worker_loop, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, paths: list[str]) -> None:
+        paths = [path for path in paths if path not in self.status]
+        if len(paths) == 0:
+            return
+        self.file_infos.update(self.source.get_files_info(paths))
+        for path in paths:
+            # Left by a previous attempt
+            self._failed_marker(path).unlink(missing_ok=True)
+        with self._condition:
+            for path in paths:
+                self.status[path] = "queued"
+                self._queue.put((1, next(self._counter), path))
+
+    def prioritize(self, paths: list[str]) -> None:
+        """Moves the given queued files ahead of the others, in the given order."""
+        if self._threads is None:
+            return self._request_priority(paths)
+
+        with self._condition:
+            for path in paths:
+                if self.status.get(path) == "queued":
+                    self._queue.put((0, next(self._counter), path))
+
+    def wait(self, paths: list[str] | None = None, timeout: float | None = None) -> None:
+        """Blocks until `paths` (all the submitted files by default) are downloaded. Raises an `OSError` if
+        one of them failed, and a `TimeoutError` if they are still missing after `timeout` seconds.
+        """
+        if self._threads is None:
+            return self._wait_on_disk(paths, timeout)
+
+        with self._condition:
+            paths = list(self.status) if paths is None else paths
+            pending = [path for path in paths if self.status.get(path) in ("queued", "running")]
+            if not self._condition.wait_for(
+                lambda: all(self.status[path] in ("done", "failed") for path in pending), timeout
+            ):
+                raise TimeoutError(f"Files still downloading after {timeout}s.")
+            failed = [path for path in paths if self.status.get(path) == "failed"]
+        if failed:
+            raise OSError(f"Failed to download {failed}.") from self.errors[failed[0]]
+
+    def download(self, paths: list[str]) -> None:
+        self.submit(paths)
+        self.wait(paths)
+
+    def _wait_on_disk(self, paths: list[str] | None, timeout: float | None) -> None:
+        start = time.perf_counter()
+        paths = list(self.status) if paths is None else paths
+        while not all((self.root / path).is_file() for path in paths):
+            failed = [path for path in paths if self._failed_marker(path).is_file()]
+            if failed:
+                error = self._failed_marker(failed[0]).read_text()
+                raise OSError(f"Failed to download {failed} in the main process: {error}")
+            if timeout is not None and time.perf_counter() - start > timeout:
+                raise TimeoutError(f"Files still downloading after {timeout}s.")
+            time.sleep(0.1)
+
+    def _request_priority(self, paths: list[str]) -> None:
+        paths = [path for path in paths if not (self.root / path).is_file()]
+        if len(paths) == 0:
+            return
+        self._requests_dir.mkdir(parents=True, exist_ok=True)
+        # Written under another name and then renamed, so that the main process never reads a partial request
+        fd, tmp_path = tempfile.mkstemp(dir=self._requests_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(paths, f)
+        os.replace(tmp_path, Path(tmp_path).with_suffix(REQUEST_SUFFIX))
+
+    def _read_priority_requests(self) -> None:
+        """Prioritizes the files requested by the pickled copies of the downloader, oldest requests first."""
+        request_files = []
+        for fpath in self._requests_dir.glob(f"*{REQUEST_SUFFIX}"):
+            try:
+                request_files.append((fpath.stat().st_mtime_ns, fpath))
+            except FileNotFoundError:
+                continue
+        for _, fpath in sorted(request_files):
+            try:
+                paths = json.loads(fpath.read_text())
+                fpath.unlink()
+            except FileNotFoundError:
+                # Already read by another thread
+                continue
+            self.prioritize(paths)
+
+    def _failed_marker(self, path: str) -> Path:
+        dst = self.root / path
+        return dst.with_name(dst.name + FAILED_SUFFIX)
+
+    def close(self) -> None:
+        if self._threads is None:
+            return
+        for _ in self._threads:
+            # Sentinels come after every queued file
+            self._queue.put((2, next(self._counter), None))
+        for t in self._threads:
+            t.join()
+        self._threads = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for key in ["_queue", "_counter", "_condition", "_threads"]:
+            state[key] = None
+        return state
+
+    def _worker_loop(self) -> None:
+        while True:
+            self._read_priority_requests()
+            _, _, path = self._queue.get()
+            if path is None:
+                break
+            with self._condition:
+                # Prioritized files are queued twice
+                if self.status[path] != "queued":
+                    continue
+                self.status[path] = "running"
+            try:
+                self._download_file(path)
+                status = "done"
+            except Exception as e:
+                logging.error(f"Error downloading {path}: {e}")
+                self.errors[path] = e
+                status = "failed"
+                try:
+                    self._failed_marker(path).parent.mkdir(parents=True, exist_ok=True)
+                    self._failed_marker(path).write_text(repr(e))
+                except OSError as marker_error:
+                    logging.error(f"Error writing the failure marker of {path}: {marker_error}")
+            with self._condition:
+                self.status[path] = status
+                self._condition.notify_all()
+
+    def _download_file(self, path: str) -> None:
+        info = self.file_infos.get(path, FileInfo())
+        dst = self.root / path
+        if dst.is_file() and (info.size is None or dst.stat().st_size == info.size):
+            return
+
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dst.with_name(dst.name + INCOMPLETE_SUFFIX)
+        for attempt in range(self.max_attempts):
+            offset = tmp_path.stat().st_size if tmp_path.is_file() else 0
+            if info.size is not None and offset > info.size:
+                offset = 0
+            chunks, resumed = self.source.open(path, offset)
+            sha256 = _hash_file(tmp_path) if offset > 0 and resumed else hashlib.sha256()
+            with open(tmp_path, "ab" if offset > 0 and resumed else "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    sha256.update(chunk)
+
+            size = tmp_path.stat().st_size
+            if (info.size is None or size == info.size) and (
+                info.sha256 is None or sha256.hexdigest() == info.sha256
+            ):
+                os.replace(tmp_path, dst)
+                return
+            logging.warning(
+                f"Size or checksum mismatch for {path} (attempt {attempt + 1}), downloading it again."
+            )
+            tmp_path.unlink()
+
+        raise OSError(f"Size or checksum of {path} doesn't match after {self.max_attempts} attempts.")
+
+
+def _hash_file(fpath: Path) -> "hashlib._Hash":
+    sha256 = hashlib.sha256()
+    with open(fpath, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256
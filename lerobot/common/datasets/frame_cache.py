@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A cache of decoded video frames shared between the processes reading a LeRobotDataset.
+
+Frames are stored as uint8 in fixed-size slots, either in shared memory or in a memory-mapped file, along
+with the small tables mapping frames to slots. All of them are allocated when the dataset is created, before
+DataLoader workers are started, so every worker reads and fills the same cache. Slots are (re)assigned under a
+lock following a LRU or LFU policy, and readers check after copying a frame that its slot hasn't been
+reassigned in the meantime. The slots are kept in a binary min-heap ordered by their LRU/LFU score, also in
+shared memory, so that finding the slot to evict costs O(log(capacity)) instead of a scan of all the slots.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F  # noqa: N812
+
+FRAME_CACHE_DIR = "cache/frames"
+
+# Indices in `VideoFrameCache.counters`
+_TICK, _HITS, _MISSES, _EVICTIONS = range(4)
+
+
+@dataclass
+class FrameCacheConfig:
+    # Keep decoded video frames in a cache shared by the DataLoader workers so that they are decoded only
+    # once across epochs, as long as they fit in `max_bytes`.
+    enable: bool = False
+    max_bytes: int = 4 * 1024**3
+    # Eviction policy, "lru" (least recently used) or "lfu" (least frequently used).
+    policy: str = "lru"
+    # Store the frames in a memory-mapped file under 'root/cache/frames' instead of shared memory. The file is
+    # deleted along with the cache.
+    on_disk: bool = False
+    # Optionally downscale frames to [height, width] before caching them. Note that items are then returned
+    # at this resolution whether or not their frames were found in the cache.
+    resize: list[int] | None = None
+
+    def __post_init__(self):
+        if self.policy not in ["lru", "lfu"]:
+            raise ValueError(f"Frame cache policy must be 'lru' or 'lfu', got '{self.policy}'.")
+        if self.resize is not None and len(self.resize) != 2:
+            raise ValueError(f"Frame cache resize must be [height, width], got {self.resize}.")
+
+
+class VideoFrameCache:
+    def __init__(
+        self,
+        episode_lengths: dict[int, int],
+        frame_shapes: dict[str, tuple[int, int, int]],
+        max_bytes: int,
+        policy: str = "lru",
+        storage_dir: str | Path | None = None,
+        resize: list[int] | None = None,
+    ):
+        """
+        Args:
+            episode_lengths: Number of frames of every episode of the dataset, by episode index.
+            frame_shapes: (channels, height, width) of the frames of each video key, before resizing.
+            max_bytes: Memory budget for the frames of all video keys.
+            policy: "lru" or "lfu".
+            storage_dir: If provided, frames are stored in a memory-mapped file created in this directory
+                instead of shared memory. The file is deleted by `close()`, or when the cache is garbage
+                collected in the process that created it.
+            resize: Optional [height, width] to downscale frames to.
+        """
+        self.policy = policy
+        self.resize = tuple(resize) if resize is not None else None
+        if self.resize is not None:
+            frame_shapes = {key: (shape[0], *self.resize) for key, shape in frame_shapes.items()}
+        self.frame_shapes = frame_shapes
+
+        ep_indices = sorted(episode_lengths)
+        lengths = [episode_lengths[ep_idx] for ep_idx in ep_indices]
+        self.episode_offsets = dict(zip(ep_indices, np.cumsum([0] + lengths[:-1]).tolist(), strict=True))
+        num_frames = sum(lengths)
+
+        bytes_per_position = sum(int(np.prod(shape)) for shape in frame_shapes.values())
+        self.capacity = min(num_frames, max_bytes // max(bytes_per_position, 1))
+        if self.capacity == 0:
+            logging.warning(f"Frame cache budget of {max_bytes} bytes is too small to hold a single frame.")
+
+        self.storage_path = None
+        self._owner_pid = os.getpid()
+        if storage_dir is not None:
+            Path(storage_dir).mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=storage_dir, suffix=".bin", delete=False) as f:
+                self.storage_path = Path(f.name)
+        self.frames = self._allocate_frames()
+
+        self.slot_position = {key: _shared_full(self.capacity, -1) for key in frame_shapes}
+        self.slot_score = {key: _shared_full(self.capacity, -1) for key in frame_shapes}
+        # Min-heap of the slots by score, and index of each slot in the heap. All scores start at -1, so the
+        # identity is a valid heap.
+        self.heap = {key: torch.arange(self.capacity).share_memory_() for key in frame_shapes}
+        self.heap_index = {key: torch.arange(self.capacity).share_memory_() for key in frame_shapes}
+        self.position_slot = {key: _shared_full(num_frames, -1) for key in frame_shapes}
+        self.counters = _shared_full(4, 0)
+        self.lock = mp.Lock()
+
+    def _allocate_frames(self) -> dict[str, torch.Tensor]:
+        shapes = {key: (self.capacity, *shape) for key, shape in self.frame_shapes.items()}
+        if self.storage_path is None:
+            return {
+                key: torch.zeros(shape, dtype=torch.uint8).share_memory_() for key, shape in shapes.items()
+            }
+
+        # Frames of all keys are laid out one after the other in the same file, which is mapped in shared mode
+        # and thus seen by the DataLoader workers forked from this process.
+        sizes = [int(np.prod(shape)) for shape in shapes.values()]
+        storage = torch.from_numpy(
+            np.memmap(self.storage_path, dtype=np.uint8, mode="w+", shape=max(sum(sizes), 1))
+        )
+        offsets = np.cumsum([0] + sizes).tolist()
+        return {
+            key: storage[offset : offset + size].view(shape)
+            for (key, shape), offset, size in zip(shapes.items(), offsets, sizes, strict=False)
+        }
+
+    def positions(self, ep_idx: int, frame_indices: np.ndarray) -> np.ndarray:
+        return self.episode_offsets[ep_idx] + frame_indices
+
+    def get(self, key: str, positions: np.ndarray) -> tuple[torch.Tensor, np.ndarray]:
+        """Returns the cached uint8 frames at `positions` (garbage where missing) along with the mask of hits."""
+        positions = torch.from_numpy(np.asarray(positions, dtype=np.int64))
+        if self.capacity == 0:
+            slots = torch.full_like(positions, -1)
+            frames = torch.empty((len(positions), *self.frame_shapes[key]), dtype=torch.uint8)
+            hits = torch.zeros(len(positions), dtype=torch.bool)
+        else:
+            slots = self.position_slot[key][positions]
+            valid_slots = slots.clamp(min=0)
+            frames = self.frames[key][valid_slots]
+            # Checked after copying the frames, in case their slots have been reassigned concurrently.
+            hits = (slots >= 0) & (self.slot_position[key][valid_slots] == positions)
+
+        num_hits = int(hits.sum())
+        with self.lock:
+            self.counters[_HITS] += num_hits
+            self.counters[_MISSES] += len(positions) - num_hits
+            if num_hits > 0:
+                score, heap, heap_index = self._heap_arrays(key)
+                self.counters[_TICK] += 1
+                tick = self.counters[_TICK].item()
+                for slot in slots[hits].tolist():
+                    score[slot] = tick if self.policy == "lru" else score[slot] + 1
+                    _sift_down(score, heap, heap_index, heap_index[slot])
+        return frames, hits.numpy()
+
+    def put(self, key: str, positions: np.ndarray, frames: torch.Tensor) -> None:
+        """Stores uint8 `frames` at `positions`, evicting frames according to the policy if needed."""
+        if self.capacity == 0:
+            return
+        slot_position = self.slot_position[key]
+        position_slot = self.position_slot[key]
+        with self.lock:
+            score, heap, heap_index = self._heap_arrays(key)
+            self.counters[_TICK] += 1
+            new_score = self.counters[_TICK].item() if self.policy == "lru" else 1
+            for position, frame in zip(np.asarray(positions).tolist(), frames, strict=True):
+                slot = position_slot[position].item()
+                if slot >= 0 and slot_position[slot].item() == position:
+                    continue
+
+                # Free slots have a score of -1 and are picked first.
+                slot = int(heap[0])
+                evicted = slot_position[slot].item()
+                if evicted >= 0:
+                    position_slot[evicted] = -1
+                    self.counters[_EVICTIONS] += 1
+                slot_position[slot] = -1
+                self.frames[key][slot] = frame
+                slot_position[slot] = position
+                position_slot[position] = slot
+                score[slot] = new_score
+                _sift_down(score, heap, heap_index, 0)
+
+    def _heap_arrays(self, key: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Numpy views of the shared tensors, whose scalar accesses are much cheaper.
+        return self.slot_score[key].numpy(), self.heap[key].numpy(), self.heap_index[key].numpy()
+
+    def to_uint8(self, frames: torch.Tensor) -> torch.Tensor:
+        """Converts float frames in [0, 1] as returned by `decode_video_frames` to cacheable uint8 frames."""
+        if self.resize is not None:
+            frames = F.interpolate(frames, size=self.resize, mode="bilinear", antialias=True)
+        return (frames * 255).round().clamp(0, 255).to(torch.uint8)
+
+    def stats(self) -> dict[str, float]:
+        hits, misses = self.counters[_HITS].item(), self.counters[_MISSES].item()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.counters[_EVICTIONS].item(),
+            "hit_rate": hits / (hits + misses) if hits + misses > 0 else 0.0,
+            "cached_frames": sum(int((pos >= 0).sum()) for pos in self.slot_position.values()),
+            "capacity": self.capacity,
+        }
+
+    def close(self) -> None:
+        """Deletes the file storing the frames, if any. Only the process that created it can delete it, copies
+        sent to other processes (e.g. DataLoader workers) leave it alone.
+        """
+        if self.storage_path is not None and os.getpid() == self._owner_pid:
+            self.storage_path.unlink(missing_ok=True)
+            self.storage_path = None
+
+    def __del__(self):
+        self.close()
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return (
+            f"{self.__class__.__name__}(hit_rate={stats['hit_rate']:.1%}, "
+            f"cached_frames={stats['cached_frames']}/{stats['capacity'] * len(self.frames)}, "
+            f"evictions={stats['evictions']})"
+        )
+
+
+def _shared_full(size: int, value: int) -> torch.Tensor:
+    return torch.full((size,), value, dtype=torch.int64).share_memory_()
+
+
+def _sift_down(score: np.ndarray, heap: np.ndarray, heap_index: np.ndarray, i: int) -> None:
+    """Moves down the slot at index `i` of the heap after its score changed. Scores only ever increase, except
+    the one of the root (the evicted slot) which is moved down all the same.
+    """
+    size = len(heap)
+    slot = heap[i]
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and score[heap[child + 1]] < score[heap[child]]:
+            child += 1
+        if score[heap[child]] >= score[slot]:
+            break
+        heap[i] = heap[child]
+        heap_index[heap[i]] = i
+        i = child
+    heap[i] = slot
+    heap_index[slot] = i
@@ -13,9 +13,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import logging
 import multiprocessing
 import queue
 import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
@@ -81,21 +84,72 @@ def write_image(image: np.ndarray | PIL.Image.Image, fpath: Path):
         print(f"Error writing image {fpath}: {e}")
 
 
-def worker_thread_loop(queue: queue.Queue):
+class SharedFrameRing:
+    """
+    Fixed number of shared memory slots, each large enough to hold one camera frame, used by `AsyncImageWriter`
+    to hand frames over to its subprocesses without pickling them. The main process copies the pixels of a
+    frame into a free slot and only sends the slot index through the queue; the worker thread writing the
+    image gives the slot back once the image is on disk.
+    """
+
+    def __init__(self, num_slots: int, slot_nbytes: int):
+        self.num_slots = num_slots
+        self.slot_nbytes = slot_nbytes
+        self.buffer = torch.zeros((num_slots, slot_nbytes), dtype=torch.uint8).share_memory_()
+        self.free_slots = multiprocessing.SimpleQueue()
+        for slot in range(num_slots):
+            self.free_slots.put(slot)
+
+    def fits(self, image: np.ndarray) -> bool:
+        return image.nbytes <= self.slot_nbytes
+
+    def acquire(self) -> tuple[int, bool]:
+        """Returns a free slot, blocking until a worker releases one if needed, and whether it had to wait."""
+        stalled = self.free_slots.empty()
+        return self.free_slots.get(), stalled
+
+    def write(self, slot: int, image: np.ndarray) -> "SharedFrame":
+        data = self.buffer[slot].numpy()[: image.nbytes]
+        np.copyto(data.view(image.dtype).reshape(image.shape), image)
+        return SharedFrame(slot, image.shape, image.dtype.str)
+
+    def read(self, frame: "SharedFrame") -> np.ndarray:
+        dtype = np.dtype(frame.dtype)
+        nbytes = int(np.prod(frame.shape)) * dtype.itemsize
+        return self.buffer[frame.slot].numpy()[:nbytes].view(dtype).reshape(frame.shape)
+
+    def release(self, slot: int) -> None:
+        self.free_slots.put(slot)
+
+
+@dataclass
+class SharedFrame:
+    """Reference to a frame stored in a `SharedFrameRing` slot, sent to the workers instead of the frame."""
+
+    slot: int
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def worker_thread_loop(queue: queue.Queue, ring: SharedFrameRing | None = None):
     while True:
         item = queue.get()
         if item is None:
             queue.task_done()
             break
         image_array, fpath = item
-        write_image(image_array, fpath)
+        if isinstance(image_array, SharedFrame):
+            write_image(ring.read(image_array), fpath)
+            ring.release(image_array.slot)
+        else:
+            write_image(image_array, fpath)
         queue.task_done()
 
 
-def worker_process(queue: queue.Queue, num_threads: int):
+def worker_process(queue: queue.Queue, num_threads: int, ring: SharedFrameRing | None = None):
     threads = []
     for _ in range(num_threads):
-        t = threading.Thread(target=worker_thread_loop, args=(queue,))
+        t = threading.Thread(target=worker_thread_loop, args=(queue, ring))
         t.daemon = True
         t.start()
         threads.append(t)
@@ -116,15 +170,28 @@ class AsyncImageWriter:
     The optimal number of processes and threads depends on your computer capabilities.
     We advise to use 4 threads per camera with 0 processes. If the fps is not stable, try to increase or lower
     the number of threads. If it is still not stable, try to use 1 subprocess, or more.
+
+    When using subprocesses and `image_shapes` is provided (the shapes of the camera frames, as in the
+    dataset features), numpy frames are passed to the subprocesses through a `SharedFrameRing` of `num_slots`
+    slots instead of being pickled. When all the slots are in use, i.e. the writers fall behind,
+    `save_image` blocks until one is released. These stalls are counted in `stats()`.
     """
 
-    def __init__(self, num_processes: int = 0, num_threads: int = 1):
+    def __init__(
+        self,
+        num_processes: int = 0,
+        num_threads: int = 1,
+        image_shapes: list[tuple[int, ...]] | None = None,
+        num_slots: int | None = None,
+    ):
         self.num_processes = num_processes
         self.num_threads = num_threads
         self.queue = None
+        self.ring = None
         self.threads = []
         self.processes = []
         self._stopped = False
+        self._stats = {"shared": 0, "pickled": 0, "stalls": 0, "stall_time_s": 0.0, "max_stall_s": 0.0}
 
         if num_threads <= 0 and num_processes <= 0:
             raise ValueError("Number of threads and processes must be greater than zero.")
@@ -140,8 +207,17 @@ class AsyncImageWriter:
         else:
             # Use multiprocessing
             self.queue = multiprocessing.JoinableQueue()
+            if image_shapes:
+                if num_slots is None:
+                    # Enough for every thread to be busy with one frame while the next ones are queued.
+                    num_slots = max(2 * self.num_processes * self.num_threads, 2 * len(image_shapes))
+                # Sized for uint8 frames, other frames are pickled.
+                slot_nbytes = max(int(np.prod(shape)) for shape in image_shapes)
+                self.ring = SharedFrameRing(num_slots, slot_nbytes)
             for _ in range(self.num_processes):
-                p = multiprocessing.Process(target=worker_process, args=(self.queue, self.num_threads))
+                p = multiprocessing.Process(
+                    target=worker_process, args=(self.queue, self.num_threads, self.ring)
+                )
                 p.daemon = True
                 p.start()
                 self.processes.append(p)
@@ -150,8 +226,34 @@ class AsyncImageWriter:
         if isinstance(image, torch.Tensor):
             # Convert tensor to numpy array to minimize main process time
             image = image.cpu().numpy()
+        if self.ring is not None and isinstance(image, np.ndarray) and self.ring.fits(image):
+            start = time.perf_counter()
+            slot, stalled = self.ring.acquire()
+            if stalled:
+                self._record_stall(time.perf_counter() - start)
+            image = self.ring.write(slot, image)
+            self._stats["shared"] += 1
+        elif self.num_processes > 0:
+            self._stats["pickled"] += 1
         self.queue.put((image, fpath))
 
+    def _record_stall(self, duration: float) -> None:
+        if self._stats["stalls"] == 0:
+            logging.warning(
+                "Image writer is falling behind: all shared memory slots are in use. Consider increasing the "
+                "number of image writer processes or threads."
+            )
+        self._stats["stalls"] += 1
+        self._stats["stall_time_s"] += duration
+        self._stats["max_stall_s"] = max(self._stats["max_stall_s"], duration)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Number of frames sent through shared memory or pickled to the subprocesses, and backpressure: number of
+        `save_image` calls which had to wait for a free slot, total and longest waiting time.
+        """
+        return dict(self._stats)
+
     def wait_until_done(self):
         self.queue.join()
 
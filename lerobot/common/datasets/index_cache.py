@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A persisted index of the timestamps and episode boundaries of a LeRobotDataset.
+
+Checking that timestamps are in sync with the fps needs the timestamp and episode index of every frame, which
+is slow to gather from the hf_dataset on large datasets. This check is done once, when the index is built, and
+its result is stored along with the fingerprint of the data files it was computed from. Subsequent loads of
+the same data with the same fps and tolerance only read a small json file, and the timestamps are then
+memory-mapped from the index when needed to query video frames.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import datasets
+import numpy as np
+import torch
+
+from lerobot.common.datasets.utils import (
+    check_timestamps_sync,
+    install_cache_dir,
+    load_json,
+    make_cache_tmp_dir,
+    write_json,
+)
+
+INDEX_CACHE_DIR = "cache/index"
+INDEX_CACHE_INFO = "info.json"
+# Bump when the content of the index changes, so that indices written by older versions get rebuilt.
+INDEX_FORMAT_VERSION = 1
+
+
+def get_index_cache_dir(root: Path, version: str, episodes: list[int] | None = None) -> Path:
+    """Returns the directory of the index for a given dataset version and selection of episodes."""
+    episodes_id = (
+        "all" if episodes is None else hashlib.sha256(json.dumps(episodes).encode()).hexdigest()[:16]
+    )
+    return Path(root) / INDEX_CACHE_DIR / version / episodes_id
+
+
+def get_files_fingerprint(data_files: list[Path], **params) -> str:
+    """Hash of the data files (path, size and modification time) and of the given parameters."""
+    files = []
+    for fpath in data_files:
+        stat = Path(fpath).stat()
+        files.append([str(fpath), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps({"files": files, **params}).encode()).hexdigest()
+
+
+def get_index_fingerprint(data_files: list[Path], fps: int, tolerance_s: float) -> str:
+    """Hash of the data files and of the parameters of the timestamps check. An index with the same
+    fingerprint was built from the same data and passed the same check.
+    """
+    return get_files_fingerprint(
+        data_files, format_version=INDEX_FORMAT_VERSION, fps=fps, tolerance_s=tolerance_s
+    )
+
+
+class DatasetIndex:
+    """Read-only view over an index directory. Arrays are opened lazily so that the object stays cheap to
+    pickle when sent to DataLoader workers.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        info = load_json(self.cache_dir / INDEX_CACHE_INFO)
+        self.format_version = info["format_version"]
+        self.fingerprint = info["fingerprint"]
+        self.num_frames = info["num_frames"]
+        self.episode_data_index = {k: torch.LongTensor(v) for k, v in info["episode_data_index"].items()}
+        self._timestamps = None
+
+    @classmethod
+    def build(
+        cls,
+        hf_dataset: datasets.Dataset,
+        episode_data_index: dict[str, torch.Tensor],
+        fps: int,
+        tolerance_s: float,
+        fingerprint: str,
+        cache_dir: str | Path,
+    ) -> "DatasetIndex":
+        """Checks the timestamps of `hf_dataset` and writes the index into `cache_dir`. Nothing is written if
+        the check fails. Files are written into a temporary directory of their own first which is then renamed
+        (see `install_cache_dir`), so that a partially written index is never picked up and that processes
+        building the same index concurrently don't get in each other's way.
+        """
+        # The numpy formatter converts whole arrow columns at once instead of going through python objects.
+        columns = hf_dataset.with_format("numpy", columns=["timestamp", "episode_index"])[:]
+        timestamps = np.asarray(columns["timestamp"])
+        ep_data_index_np = {k: t.numpy() for k, t in episode_data_index.items()}
+        check_timestamps_sync(timestamps, columns["episode_index"], ep_data_index_np, fps, tolerance_s)
+
+        cache_dir = Path(cache_dir)
+        tmp_dir = make_cache_tmp_dir(cache_dir)
+        try:
+            np.save(tmp_dir / "timestamp.npy", timestamps)
+            info = {
+                "format_version": INDEX_FORMAT_VERSION,
+                "fingerprint": fingerprint,
+                "num_frames": len(timestamps),
+                "episode_data_index": {k: v.tolist() for k, v in ep_data_index_np.items()},
+            }
+            write_json(info, tmp_dir / INDEX_CACHE_INFO)
+            install_cache_dir(
+                tmp_dir,
+                cache_dir,
+                lambda path: cls(path).is_valid(fingerprint, len(timestamps), episode_data_index),
+            )
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        logging.info(f"Built dataset index in {cache_dir}")
+        return cls(cache_dir)
+
+    @classmethod
+    def load_or_build(
+        cls,
+        hf_dataset: datasets.Dataset,
+        episode_data_index: dict[str, torch.Tensor],
+        data_files: list[Path],
+        fps: int,
+        tolerance_s: float,
+        cache_dir: str | Path,
+    ) -> "DatasetIndex | None":
+        """Loads the index in `cache_dir` if it matches the data files, or builds it. Returns None when the index
+        can't be written (e.g. the dataset is on a read-only filesystem), in which case the timestamps were
+        checked in memory and are read from the hf_dataset.
+        """
+        cache_dir = Path(cache_dir)
+        fingerprint = get_index_fingerprint(data_files, fps, tolerance_s)
+        if (cache_dir / INDEX_CACHE_INFO).is_file():
+            index = cls(cache_dir)
+            if index.is_valid(fingerprint, len(hf_dataset), episode_data_index):
+                return index
+            logging.info(f"Dataset index in {cache_dir} is out of sync with the dataset, rebuilding it.")
+        try:
+            return cls.build(hf_dataset, episode_data_index, fps, tolerance_s, fingerprint, cache_dir)
+        except OSError as e:
+            logging.warning(
+                f"Could not write the dataset index in {cache_dir}, the timestamps were only checked in memory: {e}"
+            )
+            return None
+
+    def is_valid(
+        self, fingerprint: str, num_frames: int, episode_data_index: dict[str, torch.Tensor]
+    ) -> bool:
+        return (
+            self.format_version == INDEX_FORMAT_VERSION
+            and self.fingerprint == fingerprint
+            and self.num_frames == num_frames
+            and all(torch.equal(self.episode_data_index[k], episode_data_index[k]) for k in ["from", "to"])
+        )
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        if self._timestamps is None:
+            self._timestamps = np.load(self.cache_dir / "timestamp.npy", mmap_mode="r")
+        return self._timestamps
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_timestamps"] = None
+        return state
@@ -13,9 +13,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import bisect
 import contextlib
 import logging
+import multiprocessing
 import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Callable
 
@@ -32,7 +37,11 @@ from huggingface_hub.errors import RevisionNotFoundError
 
 from lerobot.common.constants import HF_LEROBOT_HOME
 from lerobot.common.datasets.compute_stats import aggregate_stats, compute_episode_stats
+from lerobot.common.datasets.download import HubSource, ParallelDownloader
+from lerobot.common.datasets.frame_cache import FRAME_CACHE_DIR, FrameCacheConfig, VideoFrameCache
 from lerobot.common.datasets.image_writer import AsyncImageWriter, write_image
+from lerobot.common.datasets.index_cache import DatasetIndex, get_files_fingerprint, get_index_cache_dir
+from lerobot.common.datasets.memmap_cache import MemmapCache, get_memmap_cache_dir
 from lerobot.common.datasets.utils import (
     DEFAULT_FEATURES,
     DEFAULT_IMAGE_PATH,
@@ -66,12 +75,14 @@ from lerobot.common.datasets.utils import (
     write_json,
 )
 from lerobot.common.datasets.video_utils import (
+    VideoDecoderCache,
     VideoFrame,
     decode_video_frames,
     encode_video_frames,
     get_safe_default_codec,
     get_video_info,
 )
+from lerobot.common.datasets.video_writer import StreamingVideoEncoder
 
 CODEBASE_VERSION = "v2.1"
 
@@ -251,6 +262,11 @@ class LeRobotDatasetMetadata:
         episode_tasks: list[str],
         episode_stats: dict[str, dict],
     ) -> None:
+        """
+        Registers a new episode. Files are only appended to and the dataset stats are updated from the episode
+        stats alone, so that the cost doesn't depend on the number of episodes already recorded. Use
+        `lerobot/scripts/verify_dataset.py` to check the consistency of the metadata with the data offline.
+        """
         self.info["total_episodes"] += 1
         self.info["total_frames"] += episode_length
 
@@ -329,6 +345,48 @@ class LeRobotDatasetMetadata:
         return obj
 
 
+def finalize_episode(
+    episode_buffer: dict,
+    features: dict,
+    hf_features: datasets.Features,
+    fps: int,
+    data_path: Path,
+    video_files: dict[str, tuple[Path, Path]],
+    image_dirs: list[Path],
+    precomputed_stats: dict[str, dict] | None = None,
+) -> dict[str, dict]:
+    """Writes an episode recorded with `LeRobotDataset.add_frame` to disk: its parquet table (with the
+    images embedded), its videos encoded from the images in `video_files` ({video_key: (img_dir, video_path)}),
+    and finally removes its temporary `image_dirs`. This is the slow part of `LeRobotDataset.save_episode`,
+    which only depends on its arguments so that it can run in a background process. Features missing from
+    `episode_buffer` (e.g. videos encoded while recording) must have their stats in `precomputed_stats`.
+
+    Returns:
+        dict[str, dict]: The stats of the episode.
+    """
+    episode_dict = {key: episode_buffer[key] for key in hf_features}
+    ep_dataset = datasets.Dataset.from_dict(episode_dict, features=hf_features, split="train")
+    ep_dataset = embed_images(ep_dataset)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    ep_dataset.to_parquet(data_path)
+
+    ep_stats = compute_episode_stats(episode_buffer, features)
+    if precomputed_stats is not None:
+        ep_stats.update(precomputed_stats)
+
+    for img_dir, video_path in video_files.values():
+        if video_path.is_file():
+            # Skip if video is already encoded. Could be the case when resuming data recording.
+            continue
+        encode_video_frames(img_dir, video_path, fps, overwrite=True)
+
+    for img_dir in image_dirs:
+        if img_dir.is_dir():
+            shutil.rmtree(img_dir)
+
+    return ep_stats
+
+
 class LeRobotDataset(torch.utils.data.Dataset):
     def __init__(
         self,
@@ -342,6 +400,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         force_cache_sync: bool = False,
         download_videos: bool = True,
         video_backend: str | None = None,
+        use_memmap_cache: bool = False,
+        frame_cache_config: FrameCacheConfig | None = None,
+        return_uint8: bool = False,
+        download_workers: int = 0,
+        download_videos_in_background: bool = False,
     ):
         """
         2 modes are available for instantiating this class, depending on 2 different use cases:
@@ -443,6 +506,26 @@ class LeRobotDataset(torch.utils.data.Dataset):
                 True.
             video_backend (str | None, optional): Video backend to use for decoding videos. Defaults to torchcodec when available int the platform; otherwise, defaults to 'pyav'.
                 You can also use the 'pyav' decoder used by Torchvision, which used to be the default option, or 'video_reader' which is another decoder of Torchvision.
+            use_memmap_cache (bool, optional): Flag to read the numerical features (states, actions, timestamps,
+                indices...) from a memory-mapped cache stored in 'root/cache/memmap' instead of going through
+                the hf_dataset. The cache is built on first use for a given version and selection of episodes.
+                Defaults to False.
+            frame_cache_config (FrameCacheConfig | None, optional): When provided and enabled, decoded video
+                frames are kept in a cache shared by the DataLoader workers (see `VideoFrameCache`) so that
+                they are only decoded once across epochs. `frame_cache.stats()` reports its hit rate. Defaults
+                to None.
+            return_uint8 (bool, optional): Return camera frames (from images or videos) as uint8 tensors in
+                [0, 255] rather than float32 tensors in [0, 1], which divides by 4 the amount of data moved
+                from DataLoader workers to the training device. They are then expected to be converted on the
+                device with `uint8_images_to_float`. Note that `image_transforms` are applied to the uint8
+                frames. Defaults to False.
+            download_workers (int, optional): When greater than 0, missing episode files are downloaded by a
+                `ParallelDownloader` with this many concurrent downloads, checked against the size and sha256
+                reported by the hub, and resumed if interrupted, instead of going through snapshot_download.
+                Defaults to 0.
+            download_videos_in_background (bool, optional): With `download_workers`, only wait for the parquet
+                files before returning, and let the videos download in the background in episode order. Items
+                are then loaded as soon as the videos they need have landed. Defaults to False.
         """
         super().__init__()
         self.repo_id = repo_id
@@ -453,11 +536,22 @@ class LeRobotDataset(torch.utils.data.Dataset):
         self.tolerance_s = tolerance_s
         self.revision = revision if revision else CODEBASE_VERSION
         self.video_backend = video_backend if video_backend else get_safe_default_codec()
+        self.video_decoder_cache = VideoDecoderCache()
         self.delta_indices = None
+        self.memmap_cache = None
+        self.dataset_index = None
+        self.frame_cache = None
+        self.return_uint8 = return_uint8
+        self.downloader = None
 
         # Unused attributes
         self.image_writer = None
         self.episode_buffer = None
+        self.finalize_executor = None
+        self.max_pending_episodes = 0
+        self.pending_episodes = deque()
+        self.streaming_encoding = False
+        self.video_encoders = {}
 
         self.root.mkdir(exist_ok=True, parents=True)
 
@@ -477,22 +571,53 @@ class LeRobotDataset(torch.utils.data.Dataset):
             self.hf_dataset = self.load_hf_dataset()
         except (AssertionError, FileNotFoundError, NotADirectoryError):
             self.revision = get_safe_version(self.repo_id, self.revision)
-            self.download_episodes(download_videos)
+            self.download_episodes(download_videos, download_workers, download_videos_in_background)
             self.hf_dataset = self.load_hf_dataset()
 
+        episodes = self.episodes if self.episodes is not None else list(range(self.meta.total_episodes))
+        data_files = [self.root / self.meta.get_data_file_path(ep_idx) for ep_idx in episodes]
+        if use_memmap_cache:
+            cache_dir = get_memmap_cache_dir(self.root, self.meta.info["codebase_version"], self.episodes)
+            self.memmap_cache = MemmapCache.load_or_build(
+                self.hf_dataset, cache_dir, get_files_fingerprint(data_files)
+            )
+
         self.episode_data_index = get_episode_data_index(self.meta.episodes, self.episodes)
 
-        # Check timestamps
-        timestamps = torch.stack(self.hf_dataset["timestamp"]).numpy()
-        episode_indices = torch.stack(self.hf_dataset["episode_index"]).numpy()
-        ep_data_index_np = {k: t.numpy() for k, t in self.episode_data_index.items()}
-        check_timestamps_sync(timestamps, episode_indices, ep_data_index_np, self.fps, self.tolerance_s)
+        if frame_cache_config is not None and frame_cache_config.enable and len(self.meta.video_keys) > 0:
+            self.frame_cache = self._make_frame_cache(frame_cache_config)
+
+        # Check timestamps, unless they were already checked for the same data files
+        self.dataset_index = DatasetIndex.load_or_build(
+            self.hf_dataset,
+            self.episode_data_index,
+            data_files=data_files,
+            fps=self.fps,
+            tolerance_s=self.tolerance_s,
+            cache_dir=get_index_cache_dir(self.root, self.meta.info["codebase_version"], self.episodes),
+        )
 
         # Setup delta_indices
         if self.delta_timestamps is not None:
             check_delta_timestamps(self.delta_timestamps, self.fps, self.tolerance_s)
             self.delta_indices = get_delta_indices(self.delta_timestamps, self.fps)
 
+    def _make_frame_cache(self, cfg: FrameCacheConfig) -> VideoFrameCache:
+        episodes = self.episodes if self.episodes is not None else list(self.meta.episodes)
+        frame_shapes = {}
+        for key in self.meta.video_keys:
+            names = self.features[key]["names"] or ["height", "width", "channels"]
+            dims = dict(zip(names, self.features[key]["shape"], strict=True))
+            frame_shapes[key] = (dims["channels"], dims["height"], dims["width"])
+        return VideoFrameCache(
+            episode_lengths={ep_idx: self.meta.episodes[ep_idx]["length"] for ep_idx in episodes},
+            frame_shapes=frame_shapes,
+            max_bytes=cfg.max_bytes,
+            policy=cfg.policy,
+            storage_dir=self.root / FRAME_CACHE_DIR if cfg.on_disk else None,
+            resize=cfg.resize,
+        )
+
     def push_to_hub(
         self,
         branch: str | None = None,
@@ -505,7 +630,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
         upload_large_folder: bool = False,
         **card_kwargs,
     ) -> None:
-        ignore_patterns = ["images/"]
+        self.wait_for_pending_episodes()
+        ignore_patterns = ["images/", "cache/"]
         if not push_videos:
             ignore_patterns.append("videos/")
 
@@ -563,20 +689,55 @@ class LeRobotDataset(torch.utils.data.Dataset):
             ignore_patterns=ignore_patterns,
         )
 
-    def download_episodes(self, download_videos: bool = True) -> None:
+    def download_episodes(
+        self, download_videos: bool = True, num_workers: int = 0, videos_in_background: bool = False
+    ) -> None:
         """Downloads the dataset from the given 'repo_id' at the provided version. If 'episodes' is given, this
         will only download those episodes (selected by their episode_index). If 'episodes' is None, the whole
         dataset will be downloaded. Thanks to the behavior of snapshot_download, if the files are already present
         in 'local_dir', they won't be downloaded again.
+
+        With `num_workers > 0`, files are downloaded by a `ParallelDownloader` instead, parquet files first and
+        then videos, in the order of the episodes. With `videos_in_background`, this returns once the parquet
+        files are there and `_get_video_file_path` moves the videos ahead of the queue and waits for them when
+        they are needed.
         """
-        # TODO(rcadene, aliberts): implement faster transfer
-        # https://huggingface.co/docs/huggingface_hub/en/guides/download#faster-downloads
-        files = None
-        ignore_patterns = None if download_videos else "videos/"
-        if self.episodes is not None:
-            files = self.get_episodes_file_paths()
+        if num_workers == 0:
+            files = None
+            ignore_patterns = None if download_videos else "videos/"
+            if self.episodes is not None:
+                files = self.get_episodes_file_paths()
+
+            self.pull_from_repo(allow_patterns=files, ignore_patterns=ignore_patterns)
+            return
 
-        self.pull_from_repo(allow_patterns=files, ignore_patterns=ignore_patterns)
+        episodes = self.episodes if self.episodes is not None else list(range(self.meta.total_episodes))
+        data_files = [str(self.meta.get_data_file_path(ep_idx)) for ep_idx in episodes]
+        video_files = []
+        if download_videos:
+            video_files = [
+                str(self.meta.get_video_file_path(ep_idx, vid_key))
+                for ep_idx in episodes
+                for vid_key in self.meta.video_keys
+            ]
+
+        self.downloader = ParallelDownloader(HubSource(self.repo_id, self.revision), self.root, num_workers)
+        self.downloader.download(data_files)
+        self.downloader.submit(video_files)
+        if not videos_in_background:
+            self.downloader.wait(video_files)
+            self.downloader.close()
+            self.downloader = None
+
+    def _get_video_file_path(self, ep_idx: int, vid_key: str) -> Path:
+        """Absolute path of a video, waiting for it to be downloaded when downloading in the background. The
+        video is moved ahead of the download queue first, since samplers rarely follow the order of the episodes.
+        """
+        fpath = self.meta.get_video_file_path(ep_idx, vid_key)
+        if self.downloader is not None:
+            self.downloader.prioritize([str(fpath)])
+            self.downloader.wait([str(fpath)])
+        return self.root / fpath
 
     def get_episodes_file_paths(self) -> list[Path]:
         episodes = self.episodes if self.episodes is not None else list(range(self.meta.total_episodes))
@@ -601,7 +762,10 @@ class LeRobotDataset(torch.utils.data.Dataset):
             hf_dataset = load_dataset("parquet", data_files=files, split="train")
 
         # TODO(aliberts): hf_dataset.set_format("torch")
-        hf_dataset.set_transform(hf_transform_to_torch)
+        if self.return_uint8:
+            hf_dataset.set_transform(partial(hf_transform_to_torch, uint8_images=True))
+        else:
+            hf_dataset.set_transform(hf_transform_to_torch)
         return hf_dataset
 
     def create_hf_dataset(self) -> datasets.Dataset:
@@ -663,20 +827,105 @@ class LeRobotDataset(torch.utils.data.Dataset):
         query_timestamps = {}
         for key in self.meta.video_keys:
             if query_indices is not None and key in query_indices:
-                timestamps = self.hf_dataset.select(query_indices[key])["timestamp"]
-                query_timestamps[key] = torch.stack(timestamps).tolist()
+                if self.memmap_cache is not None:
+                    timestamps = self.memmap_cache.query("timestamp", query_indices[key])
+                elif self.dataset_index is not None:
+                    timestamps = torch.from_numpy(self.dataset_index.timestamps[query_indices[key]])
+                else:
+                    timestamps = torch.stack(self.hf_dataset.select(query_indices[key])["timestamp"])
+                query_timestamps[key] = timestamps.tolist()
             else:
                 query_timestamps[key] = [current_ts]
 
         return query_timestamps
 
+    def _get_query_timestamps_batch(
+        self,
+        current_ts: np.ndarray,
+        query_indices: dict[str, np.ndarray] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Batched counterpart of `_get_query_timestamps`, returning (batch_size, num_timestamps) arrays."""
+        query_timestamps = {}
+        timestamps = None
+        for key in self.meta.video_keys:
+            if query_indices is not None and key in query_indices:
+                q_idx = query_indices[key]
+                if self.memmap_cache is not None:
+                    query_timestamps[key] = self.memmap_cache.arrays["timestamp"][q_idx]
+                    continue
+                if self.dataset_index is not None:
+                    query_timestamps[key] = self.dataset_index.timestamps[q_idx]
+                    continue
+                if timestamps is None:
+                    timestamps = self.hf_dataset.with_format("numpy", columns=["timestamp"])
+                query_timestamps[key] = timestamps[q_idx.ravel().tolist()]["timestamp"].reshape(q_idx.shape)
+            else:
+                query_timestamps[key] = current_ts[:, None]
+
+        return query_timestamps
+
     def _query_hf_dataset(self, query_indices: dict[str, list[int]]) -> dict:
         return {
-            key: torch.stack(self.hf_dataset.select(q_idx)[key])
+            key: self.memmap_cache.query(key, q_idx)
+            if self.memmap_cache is not None and key in self.memmap_cache
+            else torch.stack(self.hf_dataset.select(q_idx)[key])
             for key, q_idx in query_indices.items()
             if key not in self.meta.video_keys
         }
 
+    def _get_query_indices_batch(
+        self, indices: np.ndarray, ep_indices: np.ndarray
+    ) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+        """Batched counterpart of `_get_query_indices`. Query indices and padding masks are computed for all
+        the samples at once by broadcasting the (batch_size, 1) indices against the (1, num_deltas) deltas.
+        """
+        ep_start = self.episode_data_index["from"].numpy()[ep_indices][:, None]
+        ep_end = self.episode_data_index["to"].numpy()[ep_indices][:, None]
+        query_indices, padding = {}, {}
+        for key, delta_idx in self.delta_indices.items():
+            target = indices[:, None] + np.asarray(delta_idx, dtype=np.int64)[None, :]
+            query_indices[key] = np.clip(target, ep_start, ep_end - 1)
+            padding[f"{key}_is_pad"] = (target < ep_start) | (target >= ep_end)
+        return query_indices, padding
+
+    def _query_hf_dataset_batch(self, query_indices: dict[str, np.ndarray]) -> dict[str, torch.Tensor]:
+        """Batched counterpart of `_query_hf_dataset`. Instead of one `select` per key and per sample, the rows
+        needed by all keys are gathered with a single take on the underlying arrow table, then scattered back
+        into (batch_size, num_deltas, *shape) tensors.
+        """
+        keys = [key for key in query_indices if key not in self.meta.video_keys]
+        result = {}
+        if self.memmap_cache is not None:
+            for key in [key for key in keys if key in self.memmap_cache]:
+                result[key] = self.memmap_cache.query(key, query_indices[key])
+                keys.remove(key)
+        if len(keys) == 0:
+            return result
+
+        flat_indices = np.concatenate([query_indices[key].ravel() for key in keys])
+        unique_indices, inverse = np.unique(flat_indices, return_inverse=True)
+        unique_indices = unique_indices.tolist()
+
+        # Numerical columns are converted in bulk by the torch formatter. Images still go through
+        # `hf_transform_to_torch` to get (c, h, w) tensors.
+        image_keys = [key for key in keys if key in self.meta.image_keys]
+        numeric_keys = [key for key in keys if key not in image_keys]
+        columns = {}
+        if len(numeric_keys) > 0:
+            columns.update(self.hf_dataset.with_format("torch", columns=numeric_keys)[unique_indices])
+        if len(image_keys) > 0:
+            rows = self.hf_dataset[unique_indices]
+            columns.update({key: torch.stack(rows[key]) for key in image_keys})
+
+        offset = 0
+        for key in keys:
+            size, shape = query_indices[key].size, query_indices[key].shape
+            key_inverse = torch.from_numpy(inverse[offset : offset + size].reshape(shape))
+            result[key] = columns[key][key_inverse]
+            offset += size
+
+        return result
+
     def _query_videos(self, query_timestamps: dict[str, list[float]], ep_idx: int) -> dict[str, torch.Tensor]:
         """Note: When using data workers (e.g. DataLoader with num_workers>0), do not call this function
         in the main process (e.g. by using a second Dataloader with num_workers=0). It will result in a
@@ -685,12 +934,78 @@ class LeRobotDataset(torch.utils.data.Dataset):
         """
         item = {}
         for vid_key, query_ts in query_timestamps.items():
-            video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
-            frames = decode_video_frames(video_path, query_ts, self.tolerance_s, self.video_backend)
+            video_path = self._get_video_file_path(ep_idx, vid_key)
+            frames = decode_video_frames(
+                video_path,
+                query_ts,
+                self.tolerance_s,
+                self.video_backend,
+                decoder_cache=self.video_decoder_cache,
+                return_uint8=self.return_uint8,
+            )
             item[vid_key] = frames.squeeze(0)
 
         return item
 
+    def _query_videos_batch(
+        self, query_timestamps: dict[str, np.ndarray], ep_indices: np.ndarray, max_gap_s: float = 1.0
+    ) -> list[dict[str, torch.Tensor]]:
+        """Batched counterpart of `_query_videos`. The frames requested by the samples of a same episode are
+        deduplicated and decoded together, one decoding call per run of timestamps which are less than
+        `max_gap_s` apart, so that samples close to each other in a video (see `EpisodeAwareSampler`'s
+        `window_size`) share their keyframe seek and decoded frames.
+        """
+        items = [{} for _ in range(len(ep_indices))]
+        for ep_idx in np.unique(ep_indices).tolist():
+            rows = np.flatnonzero(ep_indices == ep_idx)
+            for vid_key, ep_query_ts in query_timestamps.items():
+                video_path = self._get_video_file_path(ep_idx, vid_key)
+                ep_query_ts = ep_query_ts[rows]
+                unique_ts, inverse = np.unique(ep_query_ts, return_inverse=True)
+                if self.frame_cache is not None:
+                    frames = self._query_frame_cache(video_path, vid_key, ep_idx, unique_ts, max_gap_s)
+                else:
+                    frames = self._decode_video_runs(video_path, unique_ts, max_gap_s, self.return_uint8)
+                frames = frames[torch.from_numpy(inverse.reshape(ep_query_ts.shape))]
+                for row, row_frames in zip(rows.tolist(), frames, strict=True):
+                    items[row][vid_key] = row_frames.squeeze(0)
+
+        return items
+
+    def _decode_video_runs(
+        self, video_path: Path, timestamps: np.ndarray, max_gap_s: float, return_uint8: bool = False
+    ) -> torch.Tensor:
+        runs = np.split(timestamps, np.flatnonzero(np.diff(timestamps) > max_gap_s) + 1)
+        return torch.cat(
+            [
+                decode_video_frames(
+                    video_path,
+                    run.tolist(),
+                    self.tolerance_s,
+                    self.video_backend,
+                    decoder_cache=self.video_decoder_cache,
+                    return_uint8=return_uint8,
+                )
+                for run in runs
+            ]
+        )
+
+    def _query_frame_cache(
+        self, video_path: Path, vid_key: str, ep_idx: int, timestamps: np.ndarray, max_gap_s: float
+    ) -> torch.Tensor:
+        """Reads the frames at `timestamps` from the frame cache, decoding (and caching) the missing ones."""
+        frame_indices = np.round(timestamps * self.fps).astype(np.int64)
+        positions = self.frame_cache.positions(ep_idx, frame_indices)
+        frames, hits = self.frame_cache.get(vid_key, positions)
+        if not hits.all():
+            misses = ~hits
+            decoded = self.frame_cache.to_uint8(
+                self._decode_video_runs(video_path, timestamps[misses], max_gap_s)
+            )
+            self.frame_cache.put(vid_key, positions[misses], decoded)
+            frames[torch.from_numpy(misses)] = decoded
+        return frames if self.return_uint8 else frames.type(torch.float32) / 255
+
     def _add_padding_keys(self, item: dict, padding: dict[str, list[bool]]) -> dict:
         for key, val in padding.items():
             item[key] = torch.BoolTensor(val)
@@ -699,8 +1014,18 @@ class LeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
+    def _get_hf_item(self, idx: int) -> dict:
+        if self.memmap_cache is None:
+            return self.hf_dataset[idx]
+
+        item = self.memmap_cache.get_item(idx)
+        uncached_keys = [key for key in self.hf_features if key not in self.memmap_cache]
+        if len(uncached_keys) > 0:
+            item.update(self.hf_dataset.select_columns(uncached_keys)[idx])
+        return item
+
     def __getitem__(self, idx) -> dict:
-        item = self.hf_dataset[idx]
+        item = self._get_hf_item(idx)
         ep_idx = item["episode_index"].item()
 
         query_indices = None
@@ -714,7 +1039,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if len(self.meta.video_keys) > 0:
             current_ts = item["timestamp"].item()
             query_timestamps = self._get_query_timestamps(current_ts, query_indices)
-            video_frames = self._query_videos(query_timestamps, ep_idx)
+            if self.frame_cache is not None:
+                query_timestamps = {key: np.array([ts]) for key, ts in query_timestamps.items()}
+                video_frames = self._query_videos_batch(query_timestamps, np.array([ep_idx]))[0]
+            else:
+                video_frames = self._query_videos(query_timestamps, ep_idx)
             item = {**video_frames, **item}
 
         if self.image_transforms is not None:
@@ -728,6 +1057,46 @@ class LeRobotDataset(torch.utils.data.Dataset):
 
         return item
 
+    def __getitems__(self, indices: list[int]) -> list[dict]:
+        """Batched version of `__getitem__`, picked up automatically by `torch.utils.data.DataLoader` when
+        fetching a batch. The rows of the batch and the `delta_timestamps` queries of all its samples are
+        fetched with a handful of arrow takes instead of one `select` per key and per sample. The items
+        returned are identical to `[self[idx] for idx in indices]`, so the default collate function still
+        stacks them.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.memmap_cache is not None:
+            items = [self._get_hf_item(idx) for idx in indices.tolist()]
+        else:
+            rows = self.hf_dataset[indices.tolist()]
+            items = [{key: values[i] for key, values in rows.items()} for i in range(len(indices))]
+        ep_indices = np.array([item["episode_index"].item() for item in items], dtype=np.int64)
+
+        query_indices = None
+        if self.delta_indices is not None:
+            query_indices, padding = self._get_query_indices_batch(indices, ep_indices)
+            query_result = self._query_hf_dataset_batch(query_indices)
+            for i, item in enumerate(items):
+                for key, val in padding.items():
+                    item[key] = torch.from_numpy(val[i])
+                for key, val in query_result.items():
+                    item[key] = val[i]
+
+        if len(self.meta.video_keys) > 0:
+            current_ts = np.array([item["timestamp"].item() for item in items])
+            query_timestamps = self._get_query_timestamps_batch(current_ts, query_indices)
+            video_frames = self._query_videos_batch(query_timestamps, ep_indices)
+            items = [{**frames, **item} for frames, item in zip(video_frames, items, strict=True)]
+
+        for item in items:
+            if self.image_transforms is not None:
+                for cam in self.meta.camera_keys:
+                    item[cam] = self.image_transforms(item[cam])
+
+            item["task"] = self.meta.tasks[item["task_index"].item()]
+
+        return items
+
     def __repr__(self):
         feature_keys = list(self.features)
         return (
@@ -740,7 +1109,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         )
 
     def create_episode_buffer(self, episode_index: int | None = None) -> dict:
-        current_ep_idx = self.meta.total_episodes if episode_index is None else episode_index
+        current_ep_idx = self.num_recorded_episodes if episode_index is None else episode_index
         ep_buffer = {}
         # size and task are special cases that are not in self.features
         ep_buffer["size"] = 0
@@ -794,7 +1163,14 @@ class LeRobotDataset(torch.utils.data.Dataset):
                     f"An element of the frame is not in the features. '{key}' not in '{self.features.keys()}'."
                 )
 
-            if self.features[key]["dtype"] in ["image", "video"]:
+            if self.features[key]["dtype"] == "video" and self.streaming_encoding:
+                if frame_index == 0:
+                    video_path = self.root / self.meta.get_video_file_path(
+                        self.episode_buffer["episode_index"], key
+                    )
+                    self.video_encoders[key] = StreamingVideoEncoder(video_path, self.fps)
+                self.video_encoders[key].add_frame(frame[key])
+            elif self.features[key]["dtype"] in ["image", "video"]:
                 img_path = self._get_image_file_path(
                     episode_index=self.episode_buffer["episode_index"], image_key=key, frame_index=frame_index
                 )
@@ -819,7 +1195,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if not episode_data:
             episode_buffer = self.episode_buffer
 
-        validate_episode_buffer(episode_buffer, self.meta.total_episodes, self.features)
+        validate_episode_buffer(episode_buffer, self.num_recorded_episodes, self.features)
 
         # size and task are special cases that won't be added to hf_dataset
         episode_length = episode_buffer.pop("size")
@@ -827,7 +1203,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
         episode_tasks = list(set(tasks))
         episode_index = episode_buffer["episode_index"]
 
-        episode_buffer["index"] = np.arange(self.meta.total_frames, self.meta.total_frames + episode_length)
+        first_index = self.meta.total_frames + sum(ep[2] for ep in self.pending_episodes)
+        episode_buffer["index"] = np.arange(first_index, first_index + episode_length)
         episode_buffer["episode_index"] = np.full((episode_length,), episode_index)
 
         # Add new tasks to the tasks dictionary
@@ -846,54 +1223,138 @@ class LeRobotDataset(torch.utils.data.Dataset):
                 continue
             episode_buffer[key] = np.stack(episode_buffer[key])
 
-        self._wait_image_writer()
-        self._save_episode_table(episode_buffer, episode_index)
-        ep_stats = compute_episode_stats(episode_buffer, self.features)
-
-        if len(self.meta.video_keys) > 0:
-            video_paths = self.encode_episode_videos(episode_index)
-            for key in self.meta.video_keys:
-                episode_buffer[key] = video_paths[key]
-
-        # `meta.save_episode` be executed after encoding the videos
-        self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
-
-        ep_data_index = get_episode_data_index(self.meta.episodes, [episode_index])
-        ep_data_index_np = {k: t.numpy() for k, t in ep_data_index.items()}
         check_timestamps_sync(
             episode_buffer["timestamp"],
             episode_buffer["episode_index"],
-            ep_data_index_np,
+            {"from": np.array([0]), "to": np.array([episode_length])},
             self.fps,
             self.tolerance_s,
         )
 
-        video_files = list(self.root.rglob("*.mp4"))
-        assert len(video_files) == self.num_episodes * len(self.meta.video_keys)
+        # Videos encoded while recording only need to be flushed, and come with their stats.
+        streamed_stats = {key: encoder.finish() for key, encoder in self.video_encoders.items()}
+        self.video_encoders = {}
+        for key in streamed_stats:
+            episode_buffer.pop(key)
 
-        parquet_files = list(self.root.rglob("*.parquet"))
-        assert len(parquet_files) == self.num_episodes
+        image_dirs = [
+            self._get_image_file_path(episode_index=episode_index, image_key=key, frame_index=0).parent
+            for key in self.meta.camera_keys
+        ]
+        video_files = {
+            key: (img_dir, self.root / self.meta.get_video_file_path(episode_index, key))
+            for key, img_dir in zip(self.meta.camera_keys, image_dirs, strict=True)
+            if key in self.meta.video_keys
+        }
+        finalize_args = (
+            episode_buffer,
+            self.features,
+            self.hf_features,
+            self.fps,
+            self.root / self.meta.get_data_file_path(ep_index=episode_index),
+            video_files,
+            image_dirs,
+            streamed_stats,
+        )
 
-        # delete images
-        img_dir = self.root / "images"
-        if img_dir.is_dir():
-            shutil.rmtree(self.root / "images")
+        self._wait_image_writer()
+        if self.finalize_executor is None:
+            ep_stats = finalize_episode(*finalize_args)
+            self._complete_episode(episode_index, episode_length, episode_tasks, ep_stats)
+        else:
+            future = self.finalize_executor.submit(finalize_episode, *finalize_args)
+            self.pending_episodes.append((future, episode_index, episode_length, episode_tasks))
+            self._complete_pending_episodes(max_pending=self.max_pending_episodes)
 
         if not episode_data:  # Reset the buffer
             self.episode_buffer = self.create_episode_buffer()
 
-    def _save_episode_table(self, episode_buffer: dict, episode_index: int) -> None:
-        episode_dict = {key: episode_buffer[key] for key in self.hf_features}
-        ep_dataset = datasets.Dataset.from_dict(episode_dict, features=self.hf_features, split="train")
-        ep_dataset = embed_images(ep_dataset)
+    def _complete_episode(
+        self, episode_index: int, episode_length: int, episode_tasks: list[str], ep_stats: dict
+    ) -> None:
+        """Registers an episode written to disk by `finalize_episode`. Episodes must be completed in order."""
+        ep_data_path = self.root / self.meta.get_data_file_path(ep_index=episode_index)
+        for key in self.meta.video_keys:
+            video_path = self.root / self.meta.get_video_file_path(episode_index, key)
+            if not video_path.is_file():
+                raise FileNotFoundError(f"Video of episode {episode_index} not found: {video_path}")
+
+        # `meta.save_episode` must be executed after encoding the videos
+        self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
+
+        ep_dataset = datasets.Dataset.from_parquet(
+            str(ep_data_path), features=self.hf_features, keep_in_memory=True
+        )
         self.hf_dataset = concatenate_datasets([self.hf_dataset, ep_dataset])
         self.hf_dataset.set_transform(hf_transform_to_torch)
-        ep_data_path = self.root / self.meta.get_data_file_path(ep_index=episode_index)
-        ep_data_path.parent.mkdir(parents=True, exist_ok=True)
-        ep_dataset.to_parquet(ep_data_path)
+        # The index is rebuilt from the new data files on the next load
+        self.dataset_index = None
+
+        # Appended to rather than recomputed from `meta.episodes`, so that saving an episode doesn't get slower
+        # as the dataset grows.
+        ep_start = 0
+        if self.episode_data_index is not None and len(self.episode_data_index["to"]) > 0:
+            ep_start = self.episode_data_index["to"][-1].item()
+        ep_data_index = {
+            "from": torch.LongTensor([ep_start]),
+            "to": torch.LongTensor([ep_start + episode_length]),
+        }
+        if self.episode_data_index is None:
+            self.episode_data_index = ep_data_index
+        else:
+            self.episode_data_index = {
+                k: torch.cat([self.episode_data_index[k], ep_data_index[k]]) for k in ep_data_index
+            }
+
+    def _complete_pending_episodes(self, max_pending: int = 0) -> None:
+        """Completes, in order, the episodes finalized in the background. Blocks until at most `max_pending`
+        episodes are left pending; episodes which are already done are completed regardless.
+        """
+        while self.pending_episodes and (
+            len(self.pending_episodes) > max_pending or self.pending_episodes[0][0].done()
+        ):
+            future, episode_index, episode_length, episode_tasks = self.pending_episodes.popleft()
+            self._complete_episode(episode_index, episode_length, episode_tasks, future.result())
+
+    def wait_for_pending_episodes(self) -> None:
+        """Blocks until all the episodes saved with `save_episode` are written to disk and registered in the
+        metadata. Needs to be called before reading or uploading the dataset when using
+        `start_episode_finalizer`.
+        """
+        self._complete_pending_episodes(max_pending=0)
+
+    @property
+    def num_recorded_episodes(self) -> int:
+        """Number of episodes saved with `save_episode`, including those still being finalized."""
+        return self.meta.total_episodes + len(self.pending_episodes)
+
+    def start_episode_finalizer(self, num_processes: int = 1, max_pending_episodes: int = 2) -> None:
+        """Runs the slow part of `save_episode` (writing the parquet table, computing the stats, encoding the
+        videos) in background processes so that recording can resume right away. Episodes are still
+        registered in the metadata in order. `save_episode` blocks when more than `max_pending_episodes` are
+        being finalized.
+        """
+        if self.finalize_executor is not None:
+            logging.warning("You are starting a new episode finalizer that is replacing an existing one.")
+            self.stop_episode_finalizer()
+
+        # Spawn rather than fork the recording process, which holds camera and motor threads.
+        self.finalize_executor = ProcessPoolExecutor(
+            max_workers=num_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.max_pending_episodes = max_pending_episodes
+
+    def stop_episode_finalizer(self) -> None:
+        if self.finalize_executor is not None:
+            self.wait_for_pending_episodes()
+            self.finalize_executor.shutdown()
+            self.finalize_executor = None
 
     def clear_episode_buffer(self) -> None:
         episode_index = self.episode_buffer["episode_index"]
+        for encoder in self.video_encoders.values():
+            encoder.cancel()
+        self.video_encoders = {}
         if self.image_writer is not None:
             for cam_key in self.meta.camera_keys:
                 img_dir = self._get_image_file_path(
@@ -914,6 +1375,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         self.image_writer = AsyncImageWriter(
             num_processes=num_processes,
             num_threads=num_threads,
+            image_shapes=[self.features[key]["shape"] for key in self.meta.camera_keys],
         )
 
     def stop_image_writer(self) -> None:
@@ -934,7 +1396,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
         """
         Use ffmpeg to convert frames stored as png into mp4 videos.
         Note: `encode_video_frames` is a blocking call. Making it asynchronous shouldn't speedup encoding,
-        since video encoding with ffmpeg is already using multithreading.
+        since video encoding with ffmpeg is already using multithreading. See `start_episode_finalizer` to
+        encode them in the background while recording instead.
         """
         for ep_idx in range(self.meta.total_episodes):
             self.encode_episode_videos(ep_idx)
@@ -972,8 +1435,13 @@ class LeRobotDataset(torch.utils.data.Dataset):
         image_writer_processes: int = 0,
         image_writer_threads: int = 0,
         video_backend: str | None = None,
+        streaming_encoding: bool = False,
     ) -> "LeRobotDataset":
-        """Create a LeRobot Dataset from scratch in order to record data."""
+        """Create a LeRobot Dataset from scratch in order to record data.
+
+        With `streaming_encoding`, the frames of video features are encoded while they are recorded (see
+        `StreamingVideoEncoder`) instead of being written as png images and encoded in `save_episode`.
+        """
         obj = cls.__new__(cls)
         obj.meta = LeRobotDatasetMetadata.create(
             repo_id=repo_id,
@@ -988,6 +1456,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         obj.revision = None
         obj.tolerance_s = tolerance_s
         obj.image_writer = None
+        obj.finalize_executor = None
+        obj.max_pending_episodes = 0
+        obj.pending_episodes = deque()
+        obj.streaming_encoding = streaming_encoding and len(obj.meta.video_keys) > 0
+        obj.video_encoders = {}
 
         if image_writer_processes or image_writer_threads:
             obj.start_image_writer(image_writer_processes, image_writer_threads)
@@ -1001,7 +1474,13 @@ class LeRobotDataset(torch.utils.data.Dataset):
         obj.delta_timestamps = None
         obj.delta_indices = None
         obj.episode_data_index = None
+        obj.memmap_cache = None
+        obj.dataset_index = None
+        obj.downloader = None
+        obj.frame_cache = None
+        obj.return_uint8 = False
         obj.video_backend = video_backend if video_backend is not None else get_safe_default_codec()
+        obj.video_decoder_cache = VideoDecoderCache()
         return obj
 
 
@@ -1069,6 +1548,9 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
         # with multiple robots of different ranges. Instead we should have one normalization
         # per robot.
         self.stats = aggregate_stats([dataset.meta.stats for dataset in self._datasets])
+        # Index of the first frame of each dataset, followed by the total number of frames. Global indices are
+        # routed to their dataset by binary search.
+        self.cumulative_frames = np.cumsum([0] + [dataset.num_frames for dataset in self._datasets])
 
     @property
     def repo_id_to_index(self):
@@ -1134,7 +1616,12 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     @property
     def num_frames(self) -> int:
         """Number of samples/frames."""
-        return sum(d.num_frames for d in self._datasets)
+        return int(self.cumulative_frames[-1])
+
+    @property
+    def dataset_sizes(self) -> list[int]:
+        """Number of frames of each underlying dataset."""
+        return np.diff(self.cumulative_frames).tolist()
 
     @property
     def num_episodes(self) -> int:
@@ -1153,28 +1640,38 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
-    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
-        if idx >= len(self):
-            raise IndexError(f"Index {idx} out of bounds.")
-        # Determine which dataset to get an item from based on the index.
-        start_idx = 0
-        dataset_idx = 0
-        for dataset in self._datasets:
-            if idx >= start_idx + dataset.num_frames:
-                start_idx += dataset.num_frames
-                dataset_idx += 1
-                continue
-            break
-        else:
-            raise AssertionError("We expect the loop to break out as long as the index is within bounds.")
-        item = self._datasets[dataset_idx][idx - start_idx]
+    def _postprocess_item(self, item: dict, dataset_idx: int) -> dict:
         item["dataset_index"] = torch.tensor(dataset_idx)
         for data_key in self.disabled_features:
             if data_key in item:
                 del item[data_key]
-
         return item
 
+    def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
+        if idx >= len(self):
+            raise IndexError(f"Index {idx} out of bounds.")
+        # Determine which dataset to get an item from based on the index.
+        dataset_idx = bisect.bisect_right(self.cumulative_frames, idx) - 1
+        item = self._datasets[dataset_idx][idx - int(self.cumulative_frames[dataset_idx])]
+        return self._postprocess_item(item, dataset_idx)
+
+    def __getitems__(self, indices: list[int]) -> list[dict]:
+        """Batched counterpart of `__getitem__`: indices are routed to their dataset all at once, and each
+        dataset loads its share of the batch with its own `__getitems__`.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) > 0 and indices.max() >= len(self):
+            raise IndexError(f"Index {indices.max()} out of bounds.")
+        dataset_indices = np.searchsorted(self.cumulative_frames, indices, side="right") - 1
+        items = [None] * len(indices)
+        for dataset_idx in np.unique(dataset_indices).tolist():
+            positions = np.flatnonzero(dataset_indices == dataset_idx)
+            local_indices = (indices[positions] - self.cumulative_frames[dataset_idx]).tolist()
+            dataset_items = self._datasets[dataset_idx].__getitems__(local_indices)
+            for pos, item in zip(positions.tolist(), dataset_items, strict=True):
+                items[pos] = self._postprocess_item(item, dataset_idx)
+        return items
+
     def __repr__(self):
         return (
             f"{self.__class__.__name__}(\n"
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A memory-mapped columnar cache of the numerical features of a LeRobotDataset.
+
+Reading a row from the hf_dataset goes through arrow -> python -> torch conversions (see
+`hf_transform_to_torch`) for every sample. Here, each numerical feature is instead written once into a
+contiguous `.npy` file which is then memory-mapped, so that reading a sample is a simple slice and
+`torch.from_numpy` doesn't copy anything. Since the files are opened in copy-on-write mode, the pages are
+shared between all the processes reading the dataset (e.g. DataLoader workers).
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import datasets
+import numpy as np
+import torch
+
+from lerobot.common.datasets.utils import install_cache_dir, load_json, make_cache_tmp_dir, write_json
+
+MEMMAP_CACHE_DIR = "cache/memmap"
+MEMMAP_CACHE_INFO = "info.json"
+
+
+def get_memmap_cache_dir(root: Path, version: str, episodes: list[int] | None = None) -> Path:
+    """Returns the directory of the cache for a given dataset version and selection of episodes."""
+    episodes_id = (
+        "all" if episodes is None else hashlib.sha256(json.dumps(episodes).encode()).hexdigest()[:16]
+    )
+    return Path(root) / MEMMAP_CACHE_DIR / version / episodes_id
+
+
+def get_cacheable_keys(hf_features: datasets.Features) -> list[str]:
+    """Numerical features with a fixed shape can be cached (i.e. not images, videos or strings)."""
+    keys = []
+    for key, ft in hf_features.items():
+        if isinstance(ft, datasets.Value):
+            dtype = ft.dtype
+        elif isinstance(ft, datasets.Sequence) and isinstance(ft.feature, datasets.Value) and ft.length > 0:
+            dtype = ft.feature.dtype
+        elif isinstance(ft, (datasets.Array2D, datasets.Array3D, datasets.Array4D, datasets.Array5D)):
+            dtype = ft.dtype
+        else:
+            continue
+        if dtype == "bool" or np.issubdtype(np.dtype(dtype), np.number):
+            keys.append(key)
+    return keys
+
+
+def _cache_dtype(dtype: np.dtype) -> np.dtype:
+    """Match the dtypes of the tensors returned by `hf_transform_to_torch`, which goes through python
+    scalars and thus casts floats to float32 and integers to int64.
+    """
+    if np.issubdtype(dtype, np.floating):
+        return np.dtype("float32")
+    if np.issubdtype(dtype, np.integer):
+        return np.dtype("int64")
+    return dtype
+
+
+class MemmapCache:
+    """Read-only view over the memmap files of a cache directory. Arrays are opened lazily so that the object
+    stays cheap to pickle when sent to DataLoader workers.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        info = load_json(self.cache_dir / MEMMAP_CACHE_INFO)
+        self.num_frames = info["num_frames"]
+        self.keys = info["keys"]
+        self.fingerprint = info.get("fingerprint")
+        self._arrays = None
+
+    @classmethod
+    def build(
+        cls,
+        hf_dataset: datasets.Dataset,
+        cache_dir: str | Path,
+        fingerprint: str | None = None,
+        batch_size: int = 10_000,
+    ) -> "MemmapCache":
+        """Writes the cacheable features of `hf_dataset` into `cache_dir`, along with the `fingerprint` of the
+        data files they come from (see `get_files_fingerprint`). Files are written into a temporary directory of
+        their own first which is then renamed (see `install_cache_dir`), so that a partially written cache is
+        never picked up and that a valid cache another process has already mapped is never deleted.
+        """
+        cache_dir = Path(cache_dir)
+        tmp_dir = make_cache_tmp_dir(cache_dir)
+        try:
+            keys = get_cacheable_keys(hf_dataset.features)
+            num_frames = len(hf_dataset)
+            numpy_dataset = hf_dataset.with_format("numpy", columns=keys)
+            arrays = {}
+            for start in range(0, num_frames, batch_size):
+                batch = numpy_dataset[start : start + batch_size]
+                for key in keys:
+                    values = np.asarray(batch[key])
+                    if key not in arrays:
+                        arrays[key] = np.lib.format.open_memmap(
+                            tmp_dir / f"{key}.npy",
+                            mode="w+",
+                            dtype=_cache_dtype(values.dtype),
+                            shape=(num_frames, *values.shape[1:]),
+                        )
+                    arrays[key][start : start + len(values)] = values
+
+            for array in arrays.values():
+                array.flush()
+            del arrays
+
+            write_json(
+                {"num_frames": num_frames, "keys": keys, "fingerprint": fingerprint},
+                tmp_dir / MEMMAP_CACHE_INFO,
+            )
+            install_cache_dir(tmp_dir, cache_dir, lambda path: cls(path).is_valid(hf_dataset, fingerprint))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        logging.info(f"Built memmap cache for {keys} in {cache_dir}")
+        return cls(cache_dir)
+
+    @classmethod
+    def load_or_build(
+        cls, hf_dataset: datasets.Dataset, cache_dir: str | Path, fingerprint: str | None = None
+    ) -> "MemmapCache":
+        """Loads the cache in `cache_dir`, or builds it if it doesn't exist or if it was built from different
+        data, e.g. when the dataset was downloaded again or its data files were rewritten.
+        """
+        cache_dir = Path(cache_dir)
+        if (cache_dir / MEMMAP_CACHE_INFO).is_file():
+            cache = cls(cache_dir)
+            if cache.is_valid(hf_dataset, fingerprint):
+                return cache
+            logging.warning(f"Memmap cache in {cache_dir} is out of sync with the dataset, rebuilding it.")
+        return cls.build(hf_dataset, cache_dir, fingerprint)
+
+    def is_valid(self, hf_dataset: datasets.Dataset, fingerprint: str | None = None) -> bool:
+        return (
+            self.fingerprint == fingerprint
+            and self.num_frames == len(hf_dataset)
+            and self.keys == get_cacheable_keys(hf_dataset.features)
+        )
+
+    @property
+    def arrays(self) -> dict[str, np.ndarray]:
+        if self._arrays is None:
+            # Copy-on-write mode: pages are shared between processes and tensors created with
+            # `torch.from_numpy` are writable without touching the files on disk.
+            self._arrays = {key: np.load(self.cache_dir / f"{key}.npy", mmap_mode="c") for key in self.keys}
+        return self._arrays
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def get_item(self, idx: int) -> dict[str, torch.Tensor]:
+        return {key: torch.from_numpy(np.asarray(array[idx])) for key, array in self.arrays.items()}
+
+    def query(self, key: str, indices: list[int] | np.ndarray) -> torch.Tensor:
+        return torch.from_numpy(self.arrays[key][np.asarray(indices)])
@@ -22,13 +22,16 @@ supports in-place slicing and mutation which is very handy for a dynamic buffer.
 """
 
 import os
+import time
 from pathlib import Path
 from typing import Any
 
 import numpy as np
 import torch
+from filelock import FileLock
 
 from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.common.datasets.utils import concat_ranges
 
 
 def _make_memmap_safe(**kwargs) -> np.memmap:
@@ -50,6 +53,59 @@ def _make_memmap_safe(**kwargs) -> np.memmap:
     return np.memmap(**kwargs)
 
 
+class SumTree:
+    """Binary tree in which each node holds the sum of its two children, used to sample leaves proportionally
+    to their value in O(log n) and to update values in O(log n).
+
+    The tree is stored flat in `tree` (e.g. a memmap shared between processes): the root is at index 1 and the
+    children of node i are at 2i and 2i + 1. The number of leaves is a power of two so that all the leaves are
+    at the same depth, and leaf i is at index `num_leaves + i`. Queries and updates are vectorized over numpy
+    arrays of leaves.
+    """
+
+    def __init__(self, tree: np.ndarray):
+        self.tree = tree
+        self.num_leaves = len(tree) // 2
+
+    @staticmethod
+    def get_size(capacity: int) -> int:
+        """Size of the flat array holding a tree with at least `capacity` leaves."""
+        return 2 * (1 << max(capacity - 1, 0).bit_length())
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def __getitem__(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[self.num_leaves + np.asarray(indices)]
+
+    def update(self, indices: np.ndarray, values: np.ndarray | float) -> None:
+        nodes = self.num_leaves + np.asarray(indices, dtype=np.int64)
+        self.tree[nodes] = values
+        # Recompute the parents level by level, each of them only once
+        nodes = np.unique(nodes // 2)
+        while len(nodes) > 0 and nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            nodes = np.unique(nodes[nodes > 1] // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Returns, for each value in [0, total), the leaf at which the cumulative sum of the leaves exceeds it."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while self.num_leaves > 1 and nodes[0] < self.num_leaves:
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            # Never go towards an empty subtree, which rounding errors on the sums could otherwise lead to
+            go_right = (values >= left_sum) & (self.tree[left + 1] > 0)
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.num_leaves
+
+
+class _TornReadError(Exception):
+    """Raised when a slot was written to while it was being read."""
+
+
 class OnlineBuffer(torch.utils.data.Dataset):
     """FIFO data buffer for the online training loop in train.py.
 
@@ -57,18 +113,41 @@ class OnlineBuffer(torch.utils.data.Dataset):
     loop in the same way that a LeRobotDataset would be used.
 
     The underlying data structure will have data inserted in a circular fashion. Always insert after the
-    last index, and when you reach the end, wrap around to the start.
-
-    The data is stored in a numpy memmap.
+    last index, and when you reach the end, wrap around to the start. Frame `index` i is stored in slot
+    `i % buffer_capacity`.
+
+    The data is stored in a numpy memmap, along with everything needed to read it (episode boundaries, write
+    pointer...), so that several processes can open the same `write_dir` and use the buffer concurrently, e.g.
+    rollout processes adding episodes while DataLoader workers read frames:
+    - Writers are serialized by a lock file in `write_dir`, held while their frames are copied.
+    - Readers never take the lock. Each slot has a version number which is odd while the slot is being written
+      (sequence lock). Reads snapshot the versions of all the slots they touch before reading them, and start
+      over if one of them was odd or has changed by the end of the read, so that items are never made of
+      frames from different writes.
+    The buffer must be created (i.e. its files written) by one process before the others open it. It can also
+    be pickled to DataLoader workers, which then reopen the memmaps rather than getting a copy of the data.
+
+    With `prioritized`, the buffer also maintains a `SumTree` of sampling priorities (see `PrioritizedSampler`).
+    New frames get the highest priority seen so far, and priorities are updated with `update_priorities`.
     """
 
     NEXT_INDEX_KEY = "_next_index"
     OCCUPANCY_MASK_KEY = "_occupancy_mask"
+    NUM_ADDED_KEY = "_num_added"
+    VERSION_KEY = "_version"
+    EPISODE_START_KEY = "_episode_start"
+    EPISODE_LENGTH_KEY = "_episode_length"
+    EPISODE_ON_GRID_KEY = "_episode_on_grid"
+    PRIORITY_TREE_KEY = "_priority_tree"
+    MAX_PRIORITY_KEY = "_max_priority"
+    LOCK_FILE = ".lock"
     INDEX_KEY = "index"
     FRAME_INDEX_KEY = "frame_index"
     EPISODE_INDEX_KEY = "episode_index"
     TIMESTAMP_KEY = "timestamp"
     IS_PAD_POSTFIX = "_is_pad"
+    # Number of times a read is attempted while its slots keep being overwritten.
+    MAX_READ_ATTEMPTS = 1000
 
     def __init__(
         self,
@@ -77,6 +156,7 @@ class OnlineBuffer(torch.utils.data.Dataset):
         buffer_capacity: int | None,
         fps: float | None = None,
         delta_timestamps: dict[str, list[float]] | dict[str, np.ndarray] | None = None,
+        prioritized: bool = False,
     ):
         """
         The online buffer can be provided from scratch or you can load an existing online buffer by passing
@@ -85,7 +165,7 @@ class OnlineBuffer(torch.utils.data.Dataset):
         Args:
             write_dir: Where to keep the numpy memmap files. One memmap file will be stored for each data key.
                 Note that if the files already exist, they are opened in read-write mode (used for training
-                resumption.)
+                resumption, or to share the buffer with other processes.)
             data_spec: A mapping from data key to data specification, like {data_key: {"shape": tuple[int],
                 "dtype": np.dtype}}. This should include all the data that you wish to record into the buffer,
                 but note that "index", "frame_index" and "episode_index" are already accounted for by this
@@ -96,6 +176,7 @@ class OnlineBuffer(torch.utils.data.Dataset):
                  delta_timestamps logic. You can pass None if you are not using delta_timestamps.
             delta_timestamps: Same as the delta_timestamps concept in LeRobotDataset. This is internally
                 converted to dict[str, np.ndarray] for optimization purposes.
+            prioritized: Maintain sampling priorities for prioritized replay.
 
         """
         self.set_delta_timestamps(delta_timestamps)
@@ -105,16 +186,41 @@ class OnlineBuffer(torch.utils.data.Dataset):
         # minus 1e-4 to account for possible numerical error
         self.tolerance_s = 1 / self.fps - 1e-4 if fps is not None else None
         self._buffer_capacity = buffer_capacity
-        data_spec = self._make_data_spec(data_spec, buffer_capacity)
-        Path(write_dir).mkdir(parents=True, exist_ok=True)
+        self._write_dir = Path(write_dir)
+        self._data_spec = self._make_data_spec(data_spec, buffer_capacity, prioritized)
+        self._write_dir.mkdir(parents=True, exist_ok=True)
+        # Buffers written before the episode metadata was stored along with the data need it rebuilt.
+        needs_rebuild = (self._write_dir / OnlineBuffer.OCCUPANCY_MASK_KEY).exists() and not (
+            self._write_dir / OnlineBuffer.NUM_ADDED_KEY
+        ).exists()
+        self._open()
+        if needs_rebuild:
+            self._rebuild_episode_metadata()
+
+    def _open(self) -> None:
+        self._lock = FileLock(self._write_dir / OnlineBuffer.LOCK_FILE)
         self._data = {}
-        for k, v in data_spec.items():
+        for k, v in self._data_spec.items():
             self._data[k] = _make_memmap_safe(
-                filename=Path(write_dir) / k,
+                filename=self._write_dir / k,
                 dtype=v["dtype"] if v is not None else None,
-                mode="r+" if (Path(write_dir) / k).exists() else "w+",
+                mode="r+" if (self._write_dir / k).exists() else "w+",
                 shape=tuple(v["shape"]) if v is not None else None,
             )
+        self._priority_tree = None
+        if OnlineBuffer.PRIORITY_TREE_KEY in self._data:
+            self._priority_tree = SumTree(self._data[OnlineBuffer.PRIORITY_TREE_KEY])
+
+    def __getstate__(self) -> dict:
+        # The memmaps are reopened rather than pickled, which would copy their content.
+        state = self.__dict__.copy()
+        for key in ["_data", "_lock", "_priority_tree"]:
+            state[key] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._open()
 
     @property
     def delta_timestamps(self) -> dict[str, np.ndarray] | None:
@@ -131,7 +237,9 @@ class OnlineBuffer(torch.utils.data.Dataset):
         else:
             self._delta_timestamps = None
 
-    def _make_data_spec(self, data_spec: dict[str, Any], buffer_capacity: int) -> dict[str, dict[str, Any]]:
+    def _make_data_spec(
+        self, data_spec: dict[str, Any], buffer_capacity: int, prioritized: bool = False
+    ) -> dict[str, dict[str, Any]]:
         """Makes the data spec for np.memmap."""
         if any(k.startswith("_") for k in data_spec):
             raise ValueError(
@@ -152,14 +260,29 @@ class OnlineBuffer(torch.utils.data.Dataset):
             # _next_index will be a pointer to the next index that we should start filling from when we add
             # more data.
             OnlineBuffer.NEXT_INDEX_KEY: {"dtype": np.dtype("int64"), "shape": ()},
+            # Total number of frames added since the creation of the buffer, i.e. the index of the next frame.
+            OnlineBuffer.NUM_ADDED_KEY: {"dtype": np.dtype("int64"), "shape": ()},
             # Since the memmap is initialized with all-zeros, this keeps track of which indices are occupied
             # with real data rather than the dummy initialization.
             OnlineBuffer.OCCUPANCY_MASK_KEY: {"dtype": np.dtype("?"), "shape": (buffer_capacity,)},
+            # Incremented before and after a slot is written, so that it is odd during the write.
+            OnlineBuffer.VERSION_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
+            # Index of the first frame and number of frames of the episode each frame belongs to, and whether
+            # the timestamps of the episode are on the fps grid.
+            OnlineBuffer.EPISODE_START_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
+            OnlineBuffer.EPISODE_LENGTH_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
+            OnlineBuffer.EPISODE_ON_GRID_KEY: {"dtype": np.dtype("?"), "shape": (buffer_capacity,)},
             OnlineBuffer.INDEX_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
             OnlineBuffer.FRAME_INDEX_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
             OnlineBuffer.EPISODE_INDEX_KEY: {"dtype": np.dtype("int64"), "shape": (buffer_capacity,)},
             OnlineBuffer.TIMESTAMP_KEY: {"dtype": np.dtype("float64"), "shape": (buffer_capacity,)},
         }
+        if prioritized:
+            complete_data_spec[OnlineBuffer.PRIORITY_TREE_KEY] = {
+                "dtype": np.dtype("float64"),
+                "shape": (SumTree.get_size(buffer_capacity),),
+            }
+            complete_data_spec[OnlineBuffer.MAX_PRIORITY_KEY] = {"dtype": np.dtype("float64"), "shape": ()}
         for k, v in data_spec.items():
             complete_data_spec[k] = {"dtype": v["dtype"], "shape": (buffer_capacity, *v["shape"])}
         return complete_data_spec
@@ -173,48 +296,105 @@ class OnlineBuffer(torch.utils.data.Dataset):
 
         Shift the incoming data index and episode_index to continue on from the last frame. Note that this
         will be done in place!
+
+        This can be called concurrently from several processes sharing the buffer.
         """
         if len(missing_keys := (set(self.data_keys).difference(set(data)))) > 0:
             raise ValueError(f"Missing data keys: {missing_keys}")
         new_data_length = len(data[self.data_keys[0]])
         if not all(len(data[k]) == new_data_length for k in self.data_keys):
             raise ValueError("All data items should have the same length")
-
-        next_index = self._data[OnlineBuffer.NEXT_INDEX_KEY]
+        if new_data_length > self._buffer_capacity:
+            raise ValueError(f"Can't add {new_data_length} frames to a buffer of {self._buffer_capacity}.")
 
         # Sanity check to make sure that the new data indices start from 0.
         assert data[OnlineBuffer.EPISODE_INDEX_KEY][0].item() == 0
         assert data[OnlineBuffer.INDEX_KEY][0].item() == 0
 
-        # Shift the incoming indices if necessary.
-        if self.num_frames > 0:
-            last_episode_index = self._data[OnlineBuffer.EPISODE_INDEX_KEY][next_index - 1]
-            last_data_index = self._data[OnlineBuffer.INDEX_KEY][next_index - 1]
-            data[OnlineBuffer.EPISODE_INDEX_KEY] += last_episode_index + 1
-            data[OnlineBuffer.INDEX_KEY] += last_data_index + 1
-
-        # Insert the new data starting from next_index. It may be necessary to wrap around to the start.
-        n_surplus = max(0, new_data_length - (self._buffer_capacity - next_index))
-        for k in self.data_keys:
-            if n_surplus == 0:
-                slc = slice(next_index, next_index + new_data_length)
-                self._data[k][slc] = data[k]
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][slc] = True
-            else:
-                self._data[k][next_index:] = data[k][:-n_surplus]
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][next_index:] = True
-                self._data[k][:n_surplus] = data[k][-n_surplus:]
-        if n_surplus == 0:
-            self._data[OnlineBuffer.NEXT_INDEX_KEY] = next_index + new_data_length
-        else:
-            self._data[OnlineBuffer.NEXT_INDEX_KEY] = n_surplus
+        with self._lock:
+            next_index = int(self._data[OnlineBuffer.NEXT_INDEX_KEY])
+            num_added = int(self._data[OnlineBuffer.NUM_ADDED_KEY])
+
+            # Shift the incoming indices if necessary.
+            if num_added > 0:
+                last_episode_index = self._data[OnlineBuffer.EPISODE_INDEX_KEY][next_index - 1]
+                last_data_index = self._data[OnlineBuffer.INDEX_KEY][next_index - 1]
+                data[OnlineBuffer.EPISODE_INDEX_KEY] += last_episode_index + 1
+                data[OnlineBuffer.INDEX_KEY] += last_data_index + 1
+
+            slots = (next_index + np.arange(new_data_length)) % self._buffer_capacity
+            self._data[OnlineBuffer.VERSION_KEY][slots] += 1
+
+            # Insert the new data starting from next_index. It may be necessary to wrap around to the start.
+            n_surplus = max(0, new_data_length - (self._buffer_capacity - next_index))
+            for k, v in {**self._get_episode_metadata(data), **{k: data[k] for k in self.data_keys}}.items():
+                if n_surplus == 0:
+                    slc = slice(next_index, next_index + new_data_length)
+                    self._data[k][slc] = v
+                else:
+                    self._data[k][next_index:] = v[:-n_surplus]
+                    self._data[k][:n_surplus] = v[-n_surplus:]
+            if self._priority_tree is not None:
+                self._priority_tree.update(slots, max(float(self._data[OnlineBuffer.MAX_PRIORITY_KEY]), 1.0))
+
+            self._data[OnlineBuffer.VERSION_KEY][slots] += 1
+            self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][slots] = True
+            # Write through the memmaps so that the pointers are persisted along with the data.
+            self._data[OnlineBuffer.NEXT_INDEX_KEY][()] = (
+                next_index + new_data_length
+            ) % self._buffer_capacity
+            self._data[OnlineBuffer.NUM_ADDED_KEY][()] = num_added + new_data_length
+
+    def _is_on_fps_grid(self, timestamps: np.ndarray) -> bool:
+        """Whether the timestamps of an episode are `timestamps[0] + i / fps`, in which case the frame closest
+        to a query timestamp can be computed directly rather than searched for.
+        """
+        if self.fps is None:
+            return False
+        expected = timestamps[0] + np.arange(len(timestamps)) / self.fps
+        return bool(np.all(np.abs(timestamps - expected) < 1e-6))
+
+    def _get_episode_metadata(self, data: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Per-frame episode start, length and fps grid flag of frames holding entire episodes, in order."""
+        episode_indices = data[OnlineBuffer.EPISODE_INDEX_KEY]
+        bounds = [0, *(np.flatnonzero(np.diff(episode_indices)) + 1).tolist(), len(episode_indices)]
+        starts, lengths, on_grid = [], [], []
+        for ep_start, ep_end in zip(bounds[:-1], bounds[1:], strict=True):
+            length = ep_end - ep_start
+            starts.append(np.full(length, data[OnlineBuffer.INDEX_KEY][ep_start]))
+            lengths.append(np.full(length, length))
+            on_grid.append(
+                np.full(length, self._is_on_fps_grid(data[OnlineBuffer.TIMESTAMP_KEY][ep_start:ep_end]))
+            )
+        return {
+            OnlineBuffer.EPISODE_START_KEY: np.concatenate(starts),
+            OnlineBuffer.EPISODE_LENGTH_KEY: np.concatenate(lengths),
+            OnlineBuffer.EPISODE_ON_GRID_KEY: np.concatenate(on_grid),
+        }
+
+    def _rebuild_episode_metadata(self) -> None:
+        """Fills the episode metadata and the frame counter from the data of a buffer which was written
+        without them. The frames of the oldest episode may have been partially overwritten, in which case the
+        episode start and length computed here are those of its remaining frames.
+        """
+        with self._lock:
+            occupancy = self._data[OnlineBuffer.OCCUPANCY_MASK_KEY]
+            slots = np.flatnonzero(occupancy)
+            if len(slots) == 0:
+                return
+            slots = slots[np.argsort(self._data[OnlineBuffer.INDEX_KEY][slots])]
+            data = {
+                k: self._data[k][slots]
+                for k in [OnlineBuffer.INDEX_KEY, OnlineBuffer.EPISODE_INDEX_KEY, OnlineBuffer.TIMESTAMP_KEY]
+            }
+            for k, v in self._get_episode_metadata(data).items():
+                self._data[k][slots] = v
+            self._data[OnlineBuffer.NUM_ADDED_KEY][()] = data[OnlineBuffer.INDEX_KEY][-1] + 1
+            self._data[OnlineBuffer.NEXT_INDEX_KEY][()] = (slots[-1] + 1) % self._buffer_capacity
 
     @property
     def data_keys(self) -> list[str]:
-        keys = set(self._data)
-        keys.remove(OnlineBuffer.OCCUPANCY_MASK_KEY)
-        keys.remove(OnlineBuffer.NEXT_INDEX_KEY)
-        return sorted(keys)
+        return sorted(k for k in self._data if not k.startswith("_"))
 
     @property
     def fps(self) -> float | None:
@@ -228,68 +408,151 @@ class OnlineBuffer(torch.utils.data.Dataset):
 
     @property
     def num_frames(self) -> int:
-        return np.count_nonzero(self._data[OnlineBuffer.OCCUPANCY_MASK_KEY])
+        return min(int(self._data[OnlineBuffer.NUM_ADDED_KEY]), self._buffer_capacity)
 
     def __len__(self):
         return self.num_frames
 
-    def _item_to_tensors(self, item: dict) -> dict:
-        item_ = {}
-        for k, v in item.items():
-            if isinstance(v, torch.Tensor):
-                item_[k] = v
-            elif isinstance(v, np.ndarray):
-                item_[k] = torch.from_numpy(v)
-            else:
-                item_[k] = torch.tensor(v)
-        return item_
+    @property
+    def priority_tree(self) -> SumTree | None:
+        return self._priority_tree
+
+    def update_priorities(self, indices: np.ndarray | torch.Tensor, priorities: np.ndarray | torch.Tensor):
+        """Sets the sampling priorities of the frames at `indices`, e.g. to their latest TD errors."""
+        if self._priority_tree is None:
+            raise RuntimeError("The buffer was not created with `prioritized=True`.")
+        priorities = np.asarray(priorities, dtype=np.float64)
+        if (priorities < 0).any():
+            raise ValueError("Priorities should be non-negative.")
+        with self._lock:
+            self._priority_tree.update(np.asarray(indices), priorities)
+            max_priority = self._data[OnlineBuffer.MAX_PRIORITY_KEY]
+            max_priority[()] = max(float(max_priority), float(priorities.max(initial=0)))
+
+    def _snapshot_versions(
+        self, slots: np.ndarray, snapshots: list, expected_index: np.ndarray | None = None
+    ) -> None:
+        """Records the versions of `slots` before reading them. Slots being written are not read, nor slots
+        which don't hold the frames of `expected_index` anymore.
+        """
+        versions = self._data[OnlineBuffer.VERSION_KEY][slots]
+        if (versions % 2).any():
+            raise _TornReadError
+        snapshots.append((slots, versions))
+        if expected_index is not None and not np.array_equal(
+            self._data[OnlineBuffer.INDEX_KEY][slots], expected_index
+        ):
+            raise _TornReadError
+
+    def _check_versions(self, snapshots: list) -> None:
+        for slots, versions in snapshots:
+            if not np.array_equal(self._data[OnlineBuffer.VERSION_KEY][slots], versions):
+                raise _TornReadError
+
+    def _get_query_positions(
+        self,
+        query_ts: np.ndarray,
+        first: np.ndarray,
+        length: np.ndarray,
+        on_grid: np.ndarray,
+        snapshots: list,
+    ) -> np.ndarray:
+        """Finds, for each (batch_size, num_deltas) query timestamp, the position of the frame with the closest
+        timestamp among the `length` frames of its episode starting at frame index `first`.
+
+        Episodes on the fps grid are resolved by rounding the offset from their first timestamp, the others
+        with a binary search over their timestamps. Ties go to the earliest frame.
+        """
+        timestamps = self._data[OnlineBuffer.TIMESTAMP_KEY]
+        positions = np.empty(query_ts.shape, dtype=np.int64)
+        if on_grid.any():
+            first_ts = timestamps[first[on_grid] % self._buffer_capacity]
+            offsets = (query_ts[on_grid] - first_ts[:, None]) * self.fps
+            positions[on_grid] = np.clip(np.ceil(offsets - 0.5), 0, length[on_grid][:, None] - 1)
+        for i in np.flatnonzero(~on_grid).tolist():
+            ep_index = first[i] + np.arange(length[i])
+            ep_slots = ep_index % self._buffer_capacity
+            self._snapshot_versions(ep_slots, snapshots, expected_index=ep_index)
+            ep_timestamps = timestamps[ep_slots]
+            right = np.clip(np.searchsorted(ep_timestamps, query_ts[i]), 0, length[i] - 1)
+            left = np.maximum(right - 1, 0)
+            closer_right = np.abs(ep_timestamps[right] - query_ts[i]) < np.abs(
+                ep_timestamps[left] - query_ts[i]
+            )
+            positions[i] = np.where(closer_right, right, left)
+
+        return positions
 
     def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
         if idx >= len(self) or idx < -len(self):
             raise IndexError
+        return self.__getitems__([idx])[0]
 
-        item = {k: v[idx] for k, v in self._data.items() if not k.startswith("_")}
+    def __getitems__(self, indices: list[int]) -> list[dict[str, torch.Tensor]]:
+        """Batched version of `__getitem__`, picked up automatically by `torch.utils.data.DataLoader`. Each
+        data key is gathered from the memmap with a single fancy indexing for the whole batch, and the
+        `delta_timestamps` queries of all the samples are resolved at once.
 
-        if self.delta_timestamps is None:
-            return self._item_to_tensors(item)
-
-        episode_index = item[OnlineBuffer.EPISODE_INDEX_KEY]
-        current_ts = item[OnlineBuffer.TIMESTAMP_KEY]
-        episode_data_indices = np.where(
-            np.bitwise_and(
-                self._data[OnlineBuffer.EPISODE_INDEX_KEY] == episode_index,
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY],
-            )
-        )[0]
-        episode_timestamps = self._data[OnlineBuffer.TIMESTAMP_KEY][episode_data_indices]
+        The read is retried when a concurrent `add_data` overwrites some of the slots it touches.
+        """
+        slots = np.asarray(indices, dtype=np.int64) % self._buffer_capacity
+        for attempt in range(OnlineBuffer.MAX_READ_ATTEMPTS):
+            try:
+                batch = self._read_batch(slots)
+                break
+            except _TornReadError:
+                time.sleep(min(1e-3, 1e-5 * 2**attempt))
+        else:
+            raise RuntimeError(f"Slots kept being overwritten while reading them {attempt + 1} times.")
 
-        for data_key in self.delta_timestamps:
-            # Note: The logic in this loop is copied from `load_previous_and_future_frames`.
-            # Get timestamps used as query to retrieve data of previous/future frames.
-            query_ts = current_ts + self.delta_timestamps[data_key]
+        batch = {k: torch.from_numpy(np.asarray(v)) for k, v in batch.items()}
+        return [{k: v[i] for k, v in batch.items()} for i in range(len(slots))]
 
-            # Compute distances between each query timestamp and all timestamps of all the frames belonging to
-            # the episode.
-            dist = np.abs(query_ts[:, None] - episode_timestamps[None, :])
-            argmin_ = np.argmin(dist, axis=1)
-            min_ = dist[np.arange(dist.shape[0]), argmin_]
+    def _read_batch(self, slots: np.ndarray) -> dict[str, np.ndarray]:
+        snapshots = []
+        self._snapshot_versions(slots, snapshots)
+        batch = {k: v[slots] for k, v in self._data.items() if not k.startswith("_")}
 
-            is_pad = min_ > self.tolerance_s
+        if self.delta_timestamps is None:
+            self._check_versions(snapshots)
+            return batch
+
+        # Frames of the episode which haven't been overwritten yet
+        ep_start = self._data[OnlineBuffer.EPISODE_START_KEY][slots]
+        ep_end = ep_start + self._data[OnlineBuffer.EPISODE_LENGTH_KEY][slots]
+        on_grid = self._data[OnlineBuffer.EPISODE_ON_GRID_KEY][slots]
+        first = np.maximum(ep_start, int(self._data[OnlineBuffer.NUM_ADDED_KEY]) - self._buffer_capacity)
+        length = ep_end - first
+        if (length < 1).any():
+            raise _TornReadError
+        first_slot, last_slot = first % self._buffer_capacity, (ep_end - 1) % self._buffer_capacity
+        self._snapshot_versions(first_slot, snapshots, expected_index=first)
+        self._snapshot_versions(last_slot, snapshots, expected_index=ep_end - 1)
+        timestamps = self._data[OnlineBuffer.TIMESTAMP_KEY]
+        first_ts, last_ts = timestamps[first_slot][:, None], timestamps[last_slot][:, None]
+
+        dists = {}
+        for data_key, delta_ts in self.delta_timestamps.items():
+            query_ts = batch[OnlineBuffer.TIMESTAMP_KEY][:, None] + delta_ts[None, :]
+            query_index = first[:, None] + self._get_query_positions(
+                query_ts, first, length, on_grid, snapshots
+            )
+            query_slots = query_index % self._buffer_capacity
+            self._snapshot_versions(query_slots, snapshots, expected_index=query_index)
+            dists[data_key] = (query_ts, np.abs(query_ts - timestamps[query_slots]))
+            batch[data_key] = self._data[data_key][query_slots]
+        self._check_versions(snapshots)
 
+        for data_key, (query_ts, min_) in dists.items():
+            is_pad = min_ > self.tolerance_s
             # Check violated query timestamps are all outside the episode range.
-            assert (
-                (query_ts[is_pad] < episode_timestamps[0]) | (episode_timestamps[-1] < query_ts[is_pad])
-            ).all(), (
+            assert ((query_ts < first_ts) | (last_ts < query_ts))[is_pad].all(), (
                 f"One or several timestamps unexpectedly violate the tolerance ({min_} > {self.tolerance_s=}"
                 ") inside the episode range."
             )
+            batch[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"] = is_pad
 
-            # Load frames for this data key.
-            item[data_key] = self._data[data_key][episode_data_indices[argmin_]]
-
-            item[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"] = is_pad
-
-        return self._item_to_tensors(item)
+        return batch
 
     def get_data_by_key(self, key: str) -> torch.Tensor:
         """Returns all data for a given data key as a Tensor."""
@@ -302,16 +565,21 @@ def compute_sampler_weights(
     online_dataset: OnlineBuffer | None = None,
     online_sampling_ratio: float | None = None,
     online_drop_n_last_frames: int = 0,
+    offline_drop_n_first_frames: int = 0,
+    online_drop_n_first_frames: int = 0,
 ) -> torch.Tensor:
     """Compute the sampling weights for the online training dataloader in train.py.
 
     Args:
         offline_dataset: The LeRobotDataset used for offline pre-training.
-        online_drop_n_last_frames: Number of frames to drop from the end of each offline dataset episode.
+        offline_drop_n_last_frames: Number of frames to drop from the end of each offline dataset episode.
         online_dataset: The OnlineBuffer used in online training.
         online_sampling_ratio: The proportion of data that should be sampled from the online dataset. If an
             online dataset is provided, this value must also be provided.
-        online_drop_n_first_frames: See `offline_drop_n_last_frames`. This is the same, but for the online
+        online_drop_n_last_frames: See `offline_drop_n_last_frames`. This is the same, but for the online
+            dataset.
+        offline_drop_n_first_frames: Number of frames to drop from the start of each offline dataset episode.
+        online_drop_n_first_frames: See `offline_drop_n_first_frames`. This is the same, but for the online
             dataset.
     Returns:
         Tensor of weights for [offline_dataset; online_dataset], normalized to 1.
@@ -321,8 +589,8 @@ def compute_sampler_weights(
         - When used with `torch.utils.data.WeightedRandomSampler`, it could completely replace
           `EpisodeAwareSampler` as the online dataset related arguments are optional. The only missing feature
           is the ability to turn shuffling off.
-        - Options `drop_first_n_frames` and `episode_indices_to_use` can be added easily. They were not
-          included here to avoid adding complexity.
+        - Option `episode_indices_to_use` can be added easily. It was not included here to avoid adding
+          complexity.
     """
     if len(offline_dataset) == 0 and (online_dataset is None or len(online_dataset) == 0):
         raise ValueError("At least one of `offline_dataset` or `online_dataset` should be contain data.")
@@ -335,17 +603,13 @@ def compute_sampler_weights(
     weights = []
 
     if len(offline_dataset) > 0:
-        offline_data_mask_indices = []
-        for start_index, end_index in zip(
-            offline_dataset.episode_data_index["from"],
-            offline_dataset.episode_data_index["to"],
-            strict=True,
-        ):
-            offline_data_mask_indices.extend(
-                range(start_index.item(), end_index.item() - offline_drop_n_last_frames)
-            )
         offline_data_mask = torch.zeros(len(offline_dataset), dtype=torch.bool)
-        offline_data_mask[torch.tensor(offline_data_mask_indices)] = True
+        offline_data_mask[
+            concat_ranges(
+                offline_dataset.episode_data_index["from"] + offline_drop_n_first_frames,
+                offline_dataset.episode_data_index["to"] - offline_drop_n_last_frames,
+            )
+        ] = True
         weights.append(
             torch.full(
                 size=(len(offline_dataset),),
@@ -355,17 +619,15 @@ def compute_sampler_weights(
         )
 
     if online_dataset is not None and len(online_dataset) > 0:
-        online_data_mask_indices = []
-        episode_indices = online_dataset.get_data_by_key("episode_index")
-        for episode_idx in torch.unique(episode_indices):
-            where_episode = torch.where(episode_indices == episode_idx)
-            start_index = where_episode[0][0]
-            end_index = where_episode[0][-1] + 1
-            online_data_mask_indices.extend(
-                range(start_index.item(), end_index.item() - online_drop_n_last_frames)
-            )
-        online_data_mask = torch.zeros(len(online_dataset), dtype=torch.bool)
-        online_data_mask[torch.tensor(online_data_mask_indices)] = True
+        # Position of each frame in its episode, counted from the first frame that was added to the buffer
+        # even if it has since been overwritten.
+        positions = online_dataset.get_data_by_key(OnlineBuffer.INDEX_KEY) - online_dataset.get_data_by_key(
+            OnlineBuffer.EPISODE_START_KEY
+        )
+        episode_lengths = online_dataset.get_data_by_key(OnlineBuffer.EPISODE_LENGTH_KEY)
+        online_data_mask = (positions >= online_drop_n_first_frames) & (
+            positions < episode_lengths - online_drop_n_last_frames
+        )
         weights.append(
             torch.full(
                 size=(len(online_dataset),),
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Background preparation of the training batches.
+
+Fetching a batch from a DataLoader (which collates it in the main process when there are no workers), copying
+it to the device and converting its images are done by a background thread while the policy is being updated,
+so that the training loop only waits for data when the pipeline can't keep up.
+"""
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+import torch
+
+_END = object()
+
+
+class BatchPrefetcher:
+    """
+    Iterates over the batches of `iterable` moved to `device`, with up to `num_prefetch` batches prepared in
+    advance by a background thread.
+
+    On CUDA, tensors are staged into reusable pinned buffers, unless they are already pinned (e.g. by a
+    DataLoader with `pin_memory=True`), and copied on a side stream. `transform` is applied to the batch once
+    it is on the device, on that same stream.
+    """
+
+    def __init__(
+        self,
+        iterable: Iterable[dict[str, Any]],
+        device: torch.device,
+        num_prefetch: int = 2,
+        transform: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    ):
+        if num_prefetch < 1:
+            raise ValueError(f"{num_prefetch=} must be strictly positive.")
+        self.device = device
+        self.transform = transform
+        self._iterator = iter(iterable)
+        self._stream = torch.cuda.Stream(device) if device.type == "cuda" else None
+        self._staging_buffers: dict[str, torch.Tensor] = {}
+        self._queue = queue.Queue(maxsize=num_prefetch)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._thread.start()
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self
+
+    def __next__(self) -> dict[str, Any]:
+        if self._thread is None:
+            raise StopIteration
+        item = self._queue.get()
+        if item is _END:
+            self._thread = None
+            raise StopIteration
+        if isinstance(item, Exception):
+            self.close()
+            raise item
+        if self._stream is not None:
+            # Memory allocated on the side stream must not be reused before the main stream is done with it.
+            for val in item.values():
+                if isinstance(val, torch.Tensor) and val.is_cuda:
+                    val.record_stream(torch.cuda.current_stream(self.device))
+        return item
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        # Unblocks the background thread if it waits for room in the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                self._thread.join(timeout=0.01)
+        self._thread = None
+
+    def _put(self, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _worker_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                try:
+                    batch = next(self._iterator)
+                except StopIteration:
+                    self._put(_END)
+                    return
+                self._put(self._prepare(batch))
+        except Exception as e:
+            self._put(e)
+
+    def _prepare(self, batch: dict[str, Any]) -> dict[str, Any]:
+        if self._stream is None:
+            batch = {k: v.to(self.device) if isinstance(v, torch.Tensor) else v for k, v in batch.items()}
+            return self.transform(batch) if self.transform is not None else batch
+
+        with torch.cuda.stream(self._stream):
+            batch = {
+                k: self._stage(k, v).to(self.device, non_blocking=True) if isinstance(v, torch.Tensor) else v
+                for k, v in batch.items()
+            }
+            if self.transform is not None:
+                batch = self.transform(batch)
+        # The staging buffers are free to be refilled once the copies are done, and the batch is ready to be
+        # used by the main stream.
+        self._stream.synchronize()
+        return batch
+
+    def _stage(self, key: str, tensor: torch.Tensor) -> torch.Tensor:
+        if tensor.is_pinned() or tensor.device.type != "cpu":
+            return tensor
+        buffer = self._staging_buffers.get(key)
+        if buffer is None or buffer.shape != tensor.shape or buffer.dtype != tensor.dtype:
+            buffer = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+            self._staging_buffers[key] = buffer
+        buffer.copy_(tensor)
+        return buffer
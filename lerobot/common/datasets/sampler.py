@@ -13,10 +13,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import math
 from typing import Iterator, Union
 
+import numpy as np
 import torch
 
+from lerobot.common.datasets.online_buffer import OnlineBuffer
+from lerobot.common.datasets.utils import concat_ranges
+from lerobot.common.utils.distributed_utils import get_rank, get_world_size
+
 
 class EpisodeAwareSampler:
     def __init__(
@@ -26,9 +32,20 @@ class EpisodeAwareSampler:
         drop_n_first_frames: int = 0,
         drop_n_last_frames: int = 0,
         shuffle: bool = False,
+        window_size: int = 1,
+        num_open_windows: int = 1,
+        rank: int | None = None,
+        world_size: int | None = None,
+        seed: int | None = None,
     ):
         """Sampler that optionally incorporates episode boundary information.
 
+        In a distributed run, every process shuffles the indices in the same order, which is then split into
+        `world_size` contiguous shards (keeping the windows of frames together) of which each process iterates
+        over its own. The last shards are padded with indices from the start of the order so that all
+        processes run the same number of steps. The order is seeded by `seed` and the epoch set with
+        `set_epoch`.
+
         Args:
             episode_data_index: Dictionary with keys 'from' and 'to' containing the start and end indices of each episode.
             episode_indices_to_use: List of episode indices to use. If None, all episodes are used.
@@ -36,26 +53,183 @@ class EpisodeAwareSampler:
             drop_n_first_frames: Number of frames to drop from the start of each episode.
             drop_n_last_frames: Number of frames to drop from the end of each episode.
             shuffle: Whether to shuffle the indices.
+            window_size: When shuffling, split episodes into windows of `window_size` contiguous frames and
+                shuffle the windows instead of individual frames. Frames of a same window then end up close
+                to each other in the iteration order, so that a batch's video frames can be decoded together
+                (see `LeRobotDataset.__getitems__`) instead of seeking a keyframe for every frame.
+            num_open_windows: Number of windows whose frames are shuffled together, which trades back some of
+                the sample independence lost with `window_size > 1`.
+            rank: Rank of the current process. Defaults to its rank in the default process group, if any.
+            world_size: Number of processes. Defaults to the size of the default process group, if any.
+            seed: Seed of the shuffling order, offset by the epoch. If None, indices are shuffled with the global
+                torch random number generator, which is only possible with a single process.
         """
-        indices = []
-        for episode_idx, (start_index, end_index) in enumerate(
-            zip(episode_data_index["from"], episode_data_index["to"], strict=True)
-        ):
-            if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
-                indices.extend(
-                    range(start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames)
-                )
-
-        self.indices = indices
+        if window_size < 1 or num_open_windows < 1:
+            raise ValueError(f"{window_size=} and {num_open_windows=} must be strictly positive.")
+        self.rank = rank if rank is not None else get_rank()
+        self.world_size = world_size if world_size is not None else get_world_size()
+        if shuffle and self.world_size > 1 and seed is None:
+            raise ValueError("A `seed` is needed to shuffle the indices in the same order on all processes.")
+
+        starts = episode_data_index["from"].to(torch.int64) + drop_n_first_frames
+        ends = episode_data_index["to"].to(torch.int64) - drop_n_last_frames
+        if episode_indices_to_use is not None:
+            episode_indices_to_use = set(episode_indices_to_use)
+            keep = torch.tensor([ep_idx in episode_indices_to_use for ep_idx in range(len(starts))])
+            starts, ends = starts[keep], ends[keep]
+
+        # Windows of `window_size` frames tiling each episode, the last one of an episode being shorter.
+        lengths = (ends - starts).clamp(min=0)
+        num_windows = (lengths + window_size - 1) // window_size
+        window_offsets = torch.arange(int(num_windows.sum())) - torch.repeat_interleave(
+            torch.cumsum(num_windows, 0) - num_windows, num_windows
+        )
+        window_starts = torch.repeat_interleave(starts, num_windows) + window_offsets * window_size
+        window_ends = torch.minimum(window_starts + window_size, torch.repeat_interleave(ends, num_windows))
+
+        self.indices = concat_ranges(starts, ends)
+        self.windows = torch.stack([window_starts, window_ends], dim=1)
         self.shuffle = shuffle
+        self.window_size = window_size
+        self.num_open_windows = num_open_windows
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
 
     def __iter__(self) -> Iterator[int]:
-        if self.shuffle:
-            for i in torch.randperm(len(self.indices)):
-                yield self.indices[i]
+        generator = None if self.seed is None else torch.Generator().manual_seed(self.seed + self.epoch)
+        if self.shuffle and self.window_size > 1:
+            order = self._get_windows_order(generator)
+        elif self.shuffle:
+            order = self.indices[torch.randperm(len(self.indices), generator=generator)]
         else:
-            for i in self.indices:
-                yield i
+            order = self.indices
+        yield from self._get_shard(order).tolist()
+
+    def _get_windows_order(self, generator: torch.Generator | None) -> torch.Tensor:
+        """Shuffles the windows, then the frames of each group of `num_open_windows` consecutive windows."""
+        windows = self.windows[torch.randperm(len(self.windows), generator=generator)]
+        frames = concat_ranges(windows[:, 0], windows[:, 1])
+        groups = torch.repeat_interleave(
+            torch.arange(len(windows)) // self.num_open_windows, windows[:, 1] - windows[:, 0]
+        )
+        # Random keys in [0, 1) only reorder the frames within their group
+        keys = groups.to(torch.float64) + torch.rand(len(frames), dtype=torch.float64, generator=generator)
+        return frames[torch.argsort(keys)]
+
+    def _get_shard(self, order: torch.Tensor) -> torch.Tensor:
+        if self.world_size == 1 or len(order) == 0:
+            return order
+        num_samples = len(self)
+        padded_order = order.repeat(math.ceil(num_samples * self.world_size / len(order)))
+        return padded_order[self.rank * num_samples : (self.rank + 1) * num_samples]
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.indices) / self.world_size)
+
+
+class WeightedDatasetSampler:
+    def __init__(
+        self,
+        dataset_sizes: list[int],
+        weights: list[float] | None = None,
+        temperature: float = 1.0,
+        num_samples: int | None = None,
+        generator: torch.Generator | None = None,
+    ):
+        """Sampler drawing frames from a mixture of concatenated datasets, e.g. a `MultiLeRobotDataset`.
+
+        A dataset is picked for every sample with a probability proportional to
+        `(weight * dataset_size) ** (1 / temperature)`, then one of its frames is picked uniformly. With the
+        default weights and temperature, this is equivalent to uniformly sampling frames with replacement.
+        Increasing the temperature flattens the mixture towards picking all datasets equally often,
+        regardless of their size.
+
+        Args:
+            dataset_sizes: Number of frames of each dataset, in the order in which they are concatenated.
+            weights: Relative weight of each dataset. Defaults to 1 for all of them.
+            temperature: Strictly positive temperature of the mixture.
+            num_samples: Number of indices yielded per iteration. Defaults to the total number of frames.
+            generator: Optional random number generator.
+        """
+        if weights is None:
+            weights = [1.0] * len(dataset_sizes)
+        if len(weights) != len(dataset_sizes):
+            raise ValueError(f"Got {len(weights)} weights for {len(dataset_sizes)} datasets.")
+        if any(w < 0 for w in weights) or temperature <= 0:
+            raise ValueError(
+                f"Weights must be positive and temperature strictly positive, got {weights=}, {temperature=}."
+            )
+
+        self.dataset_sizes = torch.tensor(dataset_sizes, dtype=torch.int64)
+        self.offsets = torch.cumsum(self.dataset_sizes, dim=0) - self.dataset_sizes
+        mass = (torch.tensor(weights, dtype=torch.float64) * self.dataset_sizes) ** (1 / temperature)
+        if mass.sum() == 0:
+            raise ValueError("At least one non-empty dataset must have a non-zero weight.")
+        self.probabilities = mass / mass.sum()
+        self.num_samples = num_samples if num_samples is not None else int(self.dataset_sizes.sum())
+        self.generator = generator
+
+    def __iter__(self) -> Iterator[int]:
+        dataset_indices = torch.multinomial(
+            self.probabilities, self.num_samples, replacement=True, generator=self.generator
+        )
+        sizes = self.dataset_sizes[dataset_indices]
+        frame_indices = (
+            torch.rand(self.num_samples, generator=self.generator, dtype=torch.float64) * sizes
+        ).long()
+        yield from (self.offsets[dataset_indices] + torch.minimum(frame_indices, sizes - 1)).tolist()
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+
+class PrioritizedSampler:
+    def __init__(
+        self,
+        buffer: OnlineBuffer,
+        num_samples: int,
+        generator: torch.Generator | None = None,
+    ):
+        """Sampler drawing the frames of a prioritized `OnlineBuffer` with replacement, with probabilities
+        proportional to their priorities.
+
+        Samples are stratified: the total priority is split into `num_samples` equal segments and one frame is
+        drawn from each, using the sum tree of the buffer. The order of the samples is then shuffled. Since the
+        tree is read at every iteration, frames added and priorities updated by other processes are taken into
+        account from the next iteration on.
+
+        Args:
+            buffer: OnlineBuffer created with `prioritized=True`.
+            num_samples: Number of indices yielded per iteration.
+            generator: Optional random number generator.
+        """
+        if buffer.priority_tree is None:
+            raise ValueError("The buffer was not created with `prioritized=True`.")
+        self.buffer = buffer
+        self.num_samples = num_samples
+        self.generator = generator
+
+    def __iter__(self) -> Iterator[int]:
+        tree = self.buffer.priority_tree
+        total = tree.total
+        if total <= 0:
+            raise RuntimeError("Can't sample from a buffer whose priorities are all zero.")
+        offsets = torch.rand(self.num_samples, generator=self.generator, dtype=torch.float64)
+        values = (torch.arange(self.num_samples, dtype=torch.float64) + offsets) * (total / self.num_samples)
+        indices = torch.from_numpy(tree.find(values.numpy()))
+        yield from indices[torch.randperm(self.num_samples, generator=self.generator)].tolist()
+
+    def importance_weights(self, indices: list[int] | torch.Tensor, beta: float = 0.4) -> torch.Tensor:
+        """Importance sampling weights `(N * P(i)) ** -beta` correcting for the prioritized sampling of the
+        frames at `indices`, normalized by their maximum.
+        """
+        tree = self.buffer.priority_tree
+        probabilities = torch.from_numpy(tree[np.asarray(indices)] / tree.total)
+        weights = (len(self.buffer) * probabilities) ** -beta
+        return (weights / weights.max()).float()
 
     def __len__(self) -> int:
-        return len(self.indices)
+        return self.num_samples
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming variant of LeRobotDataset for datasets which don't fit on the local disk.
+
+Only the metadata is stored locally up front. Episodes are then downloaded one after the other while they are
+iterated over, a few episodes ahead of the one being read, and the files downloaded this way are deleted once
+they have been consumed and the local cache exceeds its budget.
+"""
+
+import os
+from collections import deque
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import datasets
+import numpy as np
+import torch
+import torch.distributed as dist
+
+from lerobot.common.constants import HF_LEROBOT_HOME
+from lerobot.common.datasets.download import FileSource, HubSource, ParallelDownloader
+from lerobot.common.datasets.lerobot_dataset import CODEBASE_VERSION, LeRobotDatasetMetadata
+from lerobot.common.datasets.utils import (
+    EPISODES_PATH,
+    EPISODES_STATS_PATH,
+    INFO_PATH,
+    TASKS_PATH,
+    check_delta_timestamps,
+    get_delta_indices,
+    get_hf_features_from_features,
+    hf_transform_to_torch,
+)
+from lerobot.common.datasets.video_utils import VideoDecoderCache, decode_video_frames, get_safe_default_codec
+
+
+class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
+    def __init__(
+        self,
+        repo_id: str,
+        root: str | Path | None = None,
+        episodes: list[int] | None = None,
+        image_transforms: Callable | None = None,
+        delta_timestamps: dict[list[float]] | None = None,
+        tolerance_s: float = 1e-4,
+        revision: str | None = None,
+        video_backend: str | None = None,
+        return_uint8: bool = False,
+        source: FileSource | None = None,
+        max_cache_bytes: int = 10 * 1024**3,
+        prefetch_episodes: int = 2,
+        download_workers: int = 4,
+        shuffle: bool = True,
+        shuffle_buffer_size: int = 1000,
+        seed: int = 0,
+        rank: int | None = None,
+        world_size: int | None = None,
+        local_world_size: int | None = None,
+    ):
+        """
+        Iterable counterpart of `LeRobotDataset`, yielding the same items but streaming the episodes from
+        `source` instead of requiring all of them to be on the local disk.
+
+        The selected episodes are split into shards, one per rank and per DataLoader worker, and each worker
+        downloads and reads its own episodes in turn. With `shuffle`, the order of the episodes is drawn anew
+        at each epoch (see `set_epoch`), with the same draw on every rank and worker so that shards don't
+        overlap, and frames go through a shuffle buffer of `shuffle_buffer_size` frames to mix frames of
+        consecutive episodes. The buffer only holds the (episode, frame) references: items are loaded, and
+        their video frames decoded, when they leave it. `delta_timestamps` are computed within each streamed episode, with the same
+        clamping and `{key}_is_pad` masks as `LeRobotDataset`.
+
+        Args:
+            repo_id (str): Repository id of the dataset. Locally, files are cached under root/repo_id.
+            root (Path | None, optional): Local directory for the metadata and the cached episodes. Defaults to
+                '~/.cache/huggingface/lerobot/repo_id'.
+            episodes (list[int] | None, optional): Episodes to stream. Defaults to all of them.
+            image_transforms, delta_timestamps, tolerance_s, revision, video_backend, return_uint8: Same as
+                `LeRobotDataset`.
+            source (FileSource | None, optional): Where episodes are streamed from, e.g. an `HttpSource` or a
+                `LocalDirSource` pointing at a network drive. Defaults to the repository on the hub.
+            max_cache_bytes (int, optional): Budget of the local cache, split between the processes of a node
+                and their DataLoader workers. Consumed episodes are deleted, oldest first, while the files
+                downloaded by a worker exceed its share. Files which were already on disk are never deleted.
+                Defaults to 10 GiB.
+            prefetch_episodes (int, optional): Number of episodes downloaded ahead of the one being read.
+                Defaults to 2.
+            download_workers (int, optional): Concurrent downloads per DataLoader worker. Defaults to 4.
+            shuffle (bool, optional): Shuffle the episodes and the items. Defaults to True.
+            shuffle_buffer_size (int, optional): Number of frames held in the shuffle buffer. Defaults to 1000.
+            seed (int, optional): Seed of the shuffling, combined with the epoch. Defaults to 0.
+            rank (int | None, optional): Rank of this process. Defaults to the rank of the default process
+                group when torch.distributed is initialized, 0 otherwise.
+            world_size (int | None, optional): Number of processes. Defaults to the size of the default process
+                group when torch.distributed is initialized, 1 otherwise.
+            local_world_size (int | None, optional): Number of processes on this node, which share its local
+                cache. Defaults to the `LOCAL_WORLD_SIZE` environment variable set by `torchrun`, or to
+                `world_size` when it isn't set.
+        """
+        super().__init__()
+        self.repo_id = repo_id
+        self.root = Path(root) if root else HF_LEROBOT_HOME / repo_id
+        self.image_transforms = image_transforms
+        self.delta_timestamps = delta_timestamps
+        self.tolerance_s = tolerance_s
+        self.revision = revision if revision else CODEBASE_VERSION
+        self.video_backend = video_backend if video_backend else get_safe_default_codec()
+        self.return_uint8 = return_uint8
+        self.max_cache_bytes = max_cache_bytes
+        self.prefetch_episodes = prefetch_episodes
+        self.download_workers = download_workers
+        self.shuffle = shuffle
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.epoch = 0
+        is_distributed = dist.is_available() and dist.is_initialized()
+        self.rank = rank if rank is not None else (dist.get_rank() if is_distributed else 0)
+        self.world_size = (
+            world_size if world_size is not None else (dist.get_world_size() if is_distributed else 1)
+        )
+        if local_world_size is None:
+            local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", self.world_size))
+        self.local_world_size = local_world_size
+        self.video_decoder_cache = VideoDecoderCache()
+        self.delta_indices = None
+
+        # Only the metadata is fetched up front
+        if source is not None and not (self.root / INFO_PATH).is_file():
+            downloader = ParallelDownloader(source, self.root, num_workers=1)
+            downloader.download([INFO_PATH, EPISODES_PATH, EPISODES_STATS_PATH, TASKS_PATH])
+            downloader.close()
+        self.meta = LeRobotDatasetMetadata(self.repo_id, self.root, self.revision)
+        self.source = source if source is not None else HubSource(self.repo_id, self.meta.revision)
+        self.episodes = episodes if episodes is not None else sorted(self.meta.episodes)
+
+        if self.delta_timestamps is not None:
+            check_delta_timestamps(self.delta_timestamps, self.fps, self.tolerance_s)
+            self.delta_indices = get_delta_indices(self.delta_timestamps, self.fps)
+
+    @property
+    def fps(self) -> int:
+        return self.meta.fps
+
+    @property
+    def features(self) -> dict[str, dict]:
+        return self.meta.features
+
+    @property
+    def num_frames(self) -> int:
+        """Number of frames in the selected episodes, across all shards."""
+        return sum(self.meta.episodes[ep_idx]["length"] for ep_idx in self.episodes)
+
+    @property
+    def num_episodes(self) -> int:
+        return len(self.episodes)
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch used to draw the order of the episodes and items. Call it before iterating over the
+        DataLoader at every epoch so that the order changes between epochs.
+        """
+        self.epoch = epoch
+
+    def get_shard_episodes(self, shard_id: int, num_shards: int) -> list[int]:
+        episodes = list(self.episodes)
+        if self.shuffle:
+            # Same permutation on every rank and worker, so that shards are disjoint
+            np.random.default_rng([self.seed, self.epoch]).shuffle(episodes)
+        return episodes[shard_id::num_shards]
+
+    def get_episode_file_paths(self, ep_idx: int) -> list[str]:
+        return [str(self.meta.get_data_file_path(ep_idx))] + [
+            str(self.meta.get_video_file_path(ep_idx, vid_key)) for vid_key in self.meta.video_keys
+        ]
+
+    def __iter__(self) -> Iterator[dict]:
+        worker_info = torch.utils.data.get_worker_info()
+        num_workers, worker_id = (worker_info.num_workers, worker_info.id) if worker_info else (1, 0)
+        shard_id = self.rank * num_workers + worker_id
+        episodes = self.get_shard_episodes(shard_id, self.world_size * num_workers)
+        rng = np.random.default_rng([self.seed, self.epoch, shard_id])
+        # Every process of the node and every DataLoader worker has its own share of the local cache
+        max_cache_bytes = self.max_cache_bytes // (max(self.local_world_size, 1) * num_workers)
+        yield from self._iter_items(episodes, max_cache_bytes, rng if self.shuffle else None)
+
+    def _iter_items(
+        self, episodes: list[int], max_cache_bytes: int, rng: np.random.Generator | None
+    ) -> Iterator[dict]:
+        downloader = ParallelDownloader(self.source, self.root, self.download_workers)
+        # Files downloaded by this iterator, which it is allowed to delete once consumed
+        owned_files = {}
+        consumed = deque()
+        # Columns of the episodes with frames not yielded yet, and their number of such frames
+        columns = {}
+        remaining = {}
+
+        def iter_frames() -> Iterator[tuple[int, int]]:
+            for i, ep_idx in enumerate(episodes):
+                for next_ep_idx in episodes[i : i + 1 + self.prefetch_episodes]:
+                    paths = self.get_episode_file_paths(next_ep_idx)
+                    owned_files.update(
+                        {
+                            path: next_ep_idx
+                            for path in paths
+                            if path not in downloader.status and not (self.root / path).is_file()
+                        }
+                    )
+                    downloader.submit(paths)
+                paths = self.get_episode_file_paths(ep_idx)
+                downloader.prioritize(paths)
+                downloader.wait(paths)
+
+                columns[ep_idx] = self._load_episode(ep_idx)
+                remaining[ep_idx] = len(columns[ep_idx]["index"])
+                for idx in range(remaining[ep_idx]):
+                    yield ep_idx, idx
+
+        try:
+            frames = iter_frames()
+            if rng is not None:
+                frames = self._shuffle_buffer(frames, rng)
+            for ep_idx, idx in frames:
+                yield self._get_episode_item(ep_idx, columns[ep_idx], idx)
+
+                remaining[ep_idx] -= 1
+                if remaining[ep_idx] == 0:
+                    # Files are only deleted once no frame of the episode is left in the shuffle buffer
+                    del columns[ep_idx], remaining[ep_idx]
+                    consumed.append(ep_idx)
+                    self._evict(owned_files, consumed, max_cache_bytes)
+        finally:
+            downloader.close()
+
+    def _evict(self, owned_files: dict[str, int], consumed: deque, max_cache_bytes: int) -> None:
+        """Deletes the files of the oldest consumed episodes while the downloaded files exceed the budget."""
+        sizes = {
+            path: (self.root / path).stat().st_size for path in owned_files if (self.root / path).is_file()
+        }
+        total = sum(sizes.values())
+        while total > max_cache_bytes and len(consumed) > 0:
+            ep_idx = consumed.popleft()
+            for path in self.get_episode_file_paths(ep_idx):
+                if owned_files.get(path) == ep_idx:
+                    del owned_files[path]
+                    total -= sizes.pop(path, 0)
+                    self.video_decoder_cache.discard(self.root / path, self.video_backend)
+                    (self.root / path).unlink(missing_ok=True)
+
+    def _load_episode(self, ep_idx: int) -> dict[str, torch.Tensor | list[torch.Tensor]]:
+        """Loads the columns of an episode. Numerical columns are stacked into tensors, images are kept as
+        lists of (c, h, w) tensors.
+        """
+        ep_dataset = datasets.Dataset.from_parquet(
+            str(self.root / self.meta.get_data_file_path(ep_idx)),
+            features=get_hf_features_from_features(self.features),
+            keep_in_memory=True,
+        )
+        ep_dataset.set_transform(partial(hf_transform_to_torch, uint8_images=self.return_uint8))
+        columns = ep_dataset[:]
+        return {
+            key: values if key in self.meta.image_keys else torch.stack(values)
+            for key, values in columns.items()
+        }
+
+    def _get_episode_item(self, ep_idx: int, columns: dict, idx: int) -> dict:
+        """Item of the `idx`-th frame of an episode, given the columns loaded by `_load_episode`."""
+        ep_length = len(columns["index"])
+        item = {key: values[idx] for key, values in columns.items()}
+
+        query_indices = {}
+        if self.delta_indices is not None:
+            for key, delta_idx in self.delta_indices.items():
+                target = idx + np.asarray(delta_idx, dtype=np.int64)
+                query_indices[key] = np.clip(target, 0, ep_length - 1)
+                item[f"{key}_is_pad"] = torch.from_numpy((target < 0) | (target >= ep_length))
+                if key in self.meta.image_keys:
+                    item[key] = torch.stack([columns[key][i] for i in query_indices[key].tolist()])
+                elif key not in self.meta.video_keys:
+                    item[key] = columns[key][torch.from_numpy(query_indices[key])]
+
+        if len(self.meta.video_keys) > 0:
+            video_frames = {}
+            for vid_key in self.meta.video_keys:
+                if vid_key in query_indices:
+                    query_ts = columns["timestamp"][torch.from_numpy(query_indices[vid_key])].tolist()
+                else:
+                    query_ts = [item["timestamp"].item()]
+                frames = decode_video_frames(
+                    self.root / self.meta.get_video_file_path(ep_idx, vid_key),
+                    query_ts,
+                    self.tolerance_s,
+                    self.video_backend,
+                    decoder_cache=self.video_decoder_cache,
+                    return_uint8=self.return_uint8,
+                )
+                video_frames[vid_key] = frames.squeeze(0)
+            item = {**video_frames, **item}
+
+        if self.image_transforms is not None:
+            for cam in self.meta.camera_keys:
+                item[cam] = self.image_transforms(item[cam])
+
+        item["task"] = self.meta.tasks[item["task_index"].item()]
+        return item
+
+    def _shuffle_buffer(
+        self, items: Iterator[tuple[int, int]], rng: np.random.Generator
+    ) -> Iterator[tuple[int, int]]:
+        buffer = []
+        for item in items:
+            if len(buffer) < self.shuffle_buffer_size:
+                buffer.append(item)
+                continue
+            i = rng.integers(len(buffer))
+            yield buffer[i]
+            buffer[i] = item
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({{\n"
+            f"    Repository ID: '{self.repo_id}',\n"
+            f"    Number of selected episodes: '{self.num_episodes}',\n"
+            f"    Number of selected samples: '{self.num_frames}',\n"
+            f"    Shuffle buffer size: '{self.shuffle_buffer_size if self.shuffle else 0}',\n"
+            f"    Max cache bytes: '{self.max_cache_bytes}',\n"
+            f"    Processes per node: '{self.local_world_size}',\n"
+            f"}})"
+        )
@@ -17,12 +17,16 @@ import contextlib
 import importlib.resources
 import json
 import logging
+import os
+import shutil
+import tempfile
+import uuid
 from collections.abc import Iterator
 from itertools import accumulate
 from pathlib import Path
 from pprint import pformat
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, Callable
 
 import datasets
 import jsonlines
@@ -170,6 +174,46 @@ def append_jsonlines(data: dict, fpath: Path) -> None:
         writer.write(data)
 
 
+def make_cache_tmp_dir(cache_dir: Path) -> Path:
+    """Creates a uniquely named directory next to `cache_dir` to build it into, so that processes building the
+    same cache concurrently don't write into each other's files.
+    """
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(dir=cache_dir.parent, prefix=f"{cache_dir.name}.", suffix=".tmp"))
+
+
+def install_cache_dir(tmp_dir: Path, cache_dir: Path, is_valid: Callable[[Path], bool]) -> None:
+    """Renames `tmp_dir`, a fully written cache, to `cache_dir`. When `cache_dir` already exists and
+    `is_valid`, e.g. because another process built the same cache in the meantime, it is kept and `tmp_dir` is
+    deleted. Otherwise the stale `cache_dir` is moved aside before being deleted, so that `cache_dir` always
+    holds a complete cache. A stale cache comes from data files which have changed since, so the processes
+    still reading it are out of date anyway, and on POSIX the files they have already mapped remain readable.
+    """
+    while True:
+        try:
+            os.rename(tmp_dir, cache_dir)
+            return
+        except OSError:
+            if not cache_dir.is_dir():
+                raise
+
+        try:
+            valid = is_valid(cache_dir)
+        except FileNotFoundError:
+            # Being moved aside by another process
+            continue
+        if valid:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        stale_dir = cache_dir.with_name(f"{cache_dir.name}.{uuid.uuid4().hex}.stale")
+        try:
+            os.rename(cache_dir, stale_dir)
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(stale_dir, ignore_errors=True)
+
+
 def write_info(info: dict, local_dir: Path):
     write_json(info, local_dir / INFO_PATH)
 
@@ -255,16 +299,16 @@ def load_image_as_numpy(
     return img_array
 
 
-def hf_transform_to_torch(items_dict: dict[torch.Tensor | None]):
+def hf_transform_to_torch(items_dict: dict[torch.Tensor | None], uint8_images: bool = False):
     """Get a transform function that convert items from Hugging Face dataset (pyarrow)
     to torch tensors. Importantly, images are converted from PIL, which corresponds to
     a channel last representation (h w c) of uint8 type, to a torch image representation
-    with channel first (c h w) of float32 type in range [0,1].
+    with channel first (c h w) of float32 type in range [0,1] (or of uint8 type if `uint8_images`).
     """
     for key in items_dict:
         first_item = items_dict[key][0]
         if isinstance(first_item, PILImage.Image):
-            to_tensor = transforms.ToTensor()
+            to_tensor = transforms.PILToTensor() if uint8_images else transforms.ToTensor()
             items_dict[key] = [to_tensor(img) for img in items_dict[key]]
         elif first_item is None:
             pass
@@ -273,6 +317,16 @@ def hf_transform_to_torch(items_dict: dict[torch.Tensor | None]):
     return items_dict
 
 
+def uint8_images_to_float(batch: dict, image_keys: list[str]) -> dict:
+    """Converts the uint8 frames returned by a dataset created with `return_uint8=True` to float32 in [0, 1].
+    Meant to be called once the batch is on the training device, so that only uint8 data is moved around.
+    """
+    for key in image_keys:
+        if key in batch and batch[key].dtype == torch.uint8:
+            batch[key] = batch[key].type(torch.float32) / 255
+    return batch
+
+
 def is_valid_version(version: str) -> bool:
     try:
         packaging.version.parse(version)
@@ -630,16 +684,36 @@ def get_delta_indices(delta_timestamps: dict[str, list[float]], fps: int) -> dic
     return delta_indices
 
 
-def cycle(iterable):
+def concat_ranges(starts: torch.Tensor, ends: torch.Tensor) -> torch.Tensor:
+    """Concatenation of `torch.arange(start, end)` for each pair of `starts` and `ends`, as an int64 tensor
+    computed without looping over the ranges. Empty ranges (`end <= start`) are skipped.
+    """
+    starts = torch.as_tensor(starts, dtype=torch.int64)
+    lengths = (torch.as_tensor(ends, dtype=torch.int64) - starts).clamp(min=0)
+    # Position of each element within its range
+    offsets = torch.arange(int(lengths.sum())) - torch.repeat_interleave(
+        torch.cumsum(lengths, 0) - lengths, lengths
+    )
+    return torch.repeat_interleave(starts, lengths) + offsets
+
+
+def cycle(iterable, set_epoch: Callable[[int], None] | None = None):
     """The equivalent of itertools.cycle, but safe for Pytorch dataloaders.
 
     See https://github.com/pytorch/pytorch/issues/23900 for information on why itertools.cycle is not safe.
+
+    `set_epoch`, when given, is called with the number of the next epoch before iterating again, e.g. to
+    reshuffle a `StreamingLeRobotDataset`.
     """
+    epoch = 0
     iterator = iter(iterable)
     while True:
         try:
             yield next(iterator)
         except StopIteration:
+            epoch += 1
+            if set_epoch is not None:
+                set_epoch(epoch)
             iterator = iter(iterable)
 
 
@@ -16,7 +16,9 @@
 import glob
 import importlib
 import logging
+import os
 import warnings
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, ClassVar
@@ -39,11 +41,124 @@ def get_safe_default_codec():
         return "pyav"
 
 
+class VideoDecoderCache:
+    """LRU cache of open video decoders, keyed by video path and backend.
+
+    Opening a video (parsing the container, probing the streams and building the frame index) can cost more
+    than decoding the few frames requested by a sample, so decoders are kept open across calls. The cache is
+    bounded both by the number of open decoders and by an estimate of their memory footprint (the size of the
+    video file, which is what the demuxer ends up buffering/indexing in the worst case).
+
+    Decoders can't be shared across processes. The cache is therefore emptied when it is pickled (e.g. sent to
+    DataLoader workers with the dataset) and when it is used from a different process than the one that
+    filled it (e.g. forked DataLoader workers), so that each worker lazily opens its own decoders.
+    """
+
+    def __init__(self, max_decoders: int = 16, max_bytes: int | None = 2 * 1024**3):
+        self.max_decoders = max_decoders
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self) -> None:
+        self._decoders = OrderedDict()
+        self._sizes = {}
+        self._mtimes = {}
+        self._pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict:
+        return {"max_decoders": self.max_decoders, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._decoders)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._decoders
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get_decoder(self, video_path: Path | str, backend: str):
+        if os.getpid() != self._pid:
+            # Decoders opened by the parent process must not be used (nor closed) in a forked child.
+            self._reset()
+
+        key = (str(video_path), backend)
+        stat = os.stat(video_path)
+        if key in self._decoders and self._mtimes[key] == stat.st_mtime_ns:
+            self.hits += 1
+            self._decoders.move_to_end(key)
+            return self._decoders[key]
+
+        if key in self._decoders:
+            # The file has been rewritten since it was opened.
+            self._pop(key)
+        self.misses += 1
+        decoder = _open_video_decoder(video_path, backend)
+        self._decoders[key] = decoder
+        self._sizes[key] = stat.st_size
+        self._mtimes[key] = stat.st_mtime_ns
+        self._evict()
+        return decoder
+
+    def _pop(self, key: tuple[str, str]) -> None:
+        decoder = self._decoders.pop(key)
+        del self._sizes[key]
+        del self._mtimes[key]
+        _close_video_decoder(decoder, backend=key[1])
+
+    def _evict(self) -> None:
+        # Always keep the most recently opened decoder, even if it's larger than the memory budget.
+        while len(self._decoders) > 1 and (
+            len(self._decoders) > self.max_decoders
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            self._pop(next(iter(self._decoders)))
+
+    def discard(self, video_path: Path | str, backend: str) -> None:
+        """Closes the decoder of a video if it is open, e.g. before the video gets deleted."""
+        key = (str(video_path), backend)
+        if key in self._decoders:
+            self._pop(key)
+
+    def clear(self) -> None:
+        for (_, backend), decoder in self._decoders.items():
+            _close_video_decoder(decoder, backend)
+        self._reset()
+
+
+def _open_video_decoder(video_path: Path | str, backend: str):
+    if backend == "torchcodec":
+        if importlib.util.find_spec("torchcodec"):
+            from torchcodec.decoders import VideoDecoder
+        else:
+            raise ImportError("torchcodec is required but not available.")
+        return VideoDecoder(str(video_path), seek_mode="approximate")
+    elif backend in ["pyav", "video_reader"]:
+        torchvision.set_video_backend(backend)
+        return torchvision.io.VideoReader(str(video_path), "video")
+    else:
+        raise ValueError(f"Unsupported video backend: {backend}")
+
+
+def _close_video_decoder(decoder, backend: str) -> None:
+    if backend == "pyav":
+        decoder.container.close()
+
+
 def decode_video_frames(
     video_path: Path | str,
     timestamps: list[float],
     tolerance_s: float,
     backend: str | None = None,
+    decoder_cache: VideoDecoderCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """
     Decodes video frames using the specified backend.
@@ -53,6 +168,10 @@ def decode_video_frames(
         timestamps (list[float]): List of timestamps to extract frames.
         tolerance_s (float): Allowed deviation in seconds for frame retrieval.
         backend (str, optional): Backend to use for decoding. Defaults to "torchcodec" when available in the platform; otherwise, defaults to "pyav"..
+        decoder_cache (VideoDecoderCache, optional): If provided, decoders are taken from (and kept open in)
+            this cache instead of being opened for every call.
+        return_uint8 (bool, optional): Return uint8 frames in [0, 255] instead of float32 frames in [0, 1].
+            Defaults to False.
 
     Returns:
         torch.Tensor: Decoded frames.
@@ -62,9 +181,18 @@ def decode_video_frames(
     if backend is None:
         backend = get_safe_default_codec()
     if backend == "torchcodec":
-        return decode_video_frames_torchcodec(video_path, timestamps, tolerance_s)
+        return decode_video_frames_torchcodec(
+            video_path, timestamps, tolerance_s, decoder_cache=decoder_cache, return_uint8=return_uint8
+        )
     elif backend in ["pyav", "video_reader"]:
-        return decode_video_frames_torchvision(video_path, timestamps, tolerance_s, backend)
+        return decode_video_frames_torchvision(
+            video_path,
+            timestamps,
+            tolerance_s,
+            backend,
+            decoder_cache=decoder_cache,
+            return_uint8=return_uint8,
+        )
     else:
         raise ValueError(f"Unsupported video backend: {backend}")
 
@@ -75,6 +203,8 @@ def decode_video_frames_torchvision(
     tolerance_s: float,
     backend: str = "pyav",
     log_loaded_timestamps: bool = False,
+    decoder_cache: VideoDecoderCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated to the requested timestamps of a video
 
@@ -105,7 +235,10 @@ def decode_video_frames_torchvision(
 
     # set a video stream reader
     # TODO(rcadene): also load audio stream at the same time
-    reader = torchvision.io.VideoReader(video_path, "video")
+    if decoder_cache is not None:
+        reader = decoder_cache.get_decoder(video_path, backend)
+    else:
+        reader = torchvision.io.VideoReader(video_path, "video")
 
     # set the first and last requested timestamps
     # Note: previous timestamps are usually loaded, since we need to access the previous key frame
@@ -129,7 +262,7 @@ def decode_video_frames_torchvision(
         if current_ts >= last_ts:
             break
 
-    if backend == "pyav":
+    if backend == "pyav" and decoder_cache is None:
         reader.container.close()
 
     reader = None
@@ -161,7 +294,8 @@ def decode_video_frames_torchvision(
         logging.info(f"{closest_ts=}")
 
     # convert to the pytorch format which is float32 in [0,1] range (and channel first)
-    closest_frames = closest_frames.type(torch.float32) / 255
+    if not return_uint8:
+        closest_frames = closest_frames.type(torch.float32) / 255
 
     assert len(timestamps) == len(closest_frames)
     return closest_frames
@@ -173,11 +307,15 @@ def decode_video_frames_torchcodec(
     tolerance_s: float,
     device: str = "cpu",
     log_loaded_timestamps: bool = False,
+    decoder_cache: VideoDecoderCache | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated with the requested timestamps of a video using torchcodec.
 
     Note: Setting device="cuda" outside the main process, e.g. in data loader workers, will lead to CUDA initialization errors.
 
+    Note: `decoder_cache` only holds cpu decoders, it is ignored when decoding on another device.
+
     Note: Video benefits from inter-frame compression. Instead of storing every frame individually,
     the encoder stores a reference frame (or a key frame) and subsequent frames as differences relative to
     that key frame. As a consequence, to access a requested frame, we need to load the preceding key frame,
@@ -191,7 +329,10 @@ def decode_video_frames_torchcodec(
         raise ImportError("torchcodec is required but not available.")
 
     # initialize video decoder
-    decoder = VideoDecoder(video_path, device=device, seek_mode="approximate")
+    if decoder_cache is not None and device == "cpu":
+        decoder = decoder_cache.get_decoder(video_path, "torchcodec")
+    else:
+        decoder = VideoDecoder(video_path, device=device, seek_mode="approximate")
     loaded_frames = []
     loaded_ts = []
     # get metadata for frame information
@@ -236,12 +377,32 @@ def decode_video_frames_torchcodec(
         logging.info(f"{closest_ts=}")
 
     # convert to float32 in [0,1] range (channel first)
-    closest_frames = closest_frames.type(torch.float32) / 255
+    if not return_uint8:
+        closest_frames = closest_frames.type(torch.float32) / 255
 
     assert len(timestamps) == len(closest_frames)
     return closest_frames
 
 
+def get_video_encoder_options(
+    vcodec: str, g: int | None, crf: int | None, fast_decode: int
+) -> dict[str, str]:
+    video_options = {}
+
+    if g is not None:
+        video_options["g"] = str(g)
+
+    if crf is not None:
+        video_options["crf"] = str(crf)
+
+    if fast_decode:
+        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
+        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
+        video_options[key] = value
+
+    return video_options
+
+
 def encode_video_frames(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -284,18 +445,7 @@ def encode_video_frames(
     width, height = dummy_image.size
 
     # Define video codec options
-    video_options = {}
-
-    if g is not None:
-        video_options["g"] = str(g)
-
-    if crf is not None:
-        video_options["crf"] = str(crf)
-
-    if fast_decode:
-        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
-        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
-        video_options[key] = value
+    video_options = get_video_encoder_options(vcodec, g, crf, fast_decode)
 
     # Set logging level
     if log_level is not None:
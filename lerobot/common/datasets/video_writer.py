@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import queue
+import threading
+from pathlib import Path
+
+import av
+import numpy as np
+import PIL.Image
+import torch
+
+from lerobot.common.datasets.compute_stats import auto_downsample_height_width
+from lerobot.common.datasets.image_writer import image_array_to_pil_image
+from lerobot.common.datasets.video_utils import get_video_encoder_options
+
+
+class StreamingVideoEncoder:
+    """
+    Encodes the frames of a camera into a mp4 file while they are being recorded, in a background thread,
+    instead of writing them as png images to be encoded with `encode_video_frames` at the end of the episode.
+    This saves the png compression and decompression as well as most of the disk I/O, and makes the end of
+    the episode encoding nearly free.
+
+    Since frames never go through the disk, the episode stats of the camera are also computed on the fly, over
+    all the frames rather than over a subsample of them like `compute_episode_stats` does.
+
+    Frames wait to be encoded in a queue of at most `max_queue_size` frames. When the encoding falls behind the
+    capture rate (high resolution, several cameras, slow CPU), `add_frame` blocks until there is room in the
+    queue, rather than piling up frames in memory until the process runs out of it, and a warning is logged.
+    Frames are never dropped, since the video must have as many frames as the episode.
+
+    Encoding options are the same as `encode_video_frames`.
+    """
+
+    def __init__(
+        self,
+        video_path: Path | str,
+        fps: int,
+        vcodec: str = "libsvtav1",
+        pix_fmt: str = "yuv420p",
+        g: int | None = 2,
+        crf: int | None = 30,
+        fast_decode: int = 0,
+        log_level: int | None = av.logging.ERROR,
+        max_queue_size: int = 64,
+    ):
+        if max_queue_size < 1:
+            raise ValueError(f"{max_queue_size=} must be strictly positive.")
+        if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
+            logging.warning(
+                f"Incompatible pixel format 'yuv444p' for codec {vcodec}, auto-selecting format 'yuv420p'"
+            )
+            pix_fmt = "yuv420p"
+        if log_level is not None:
+            logging.getLogger("libav").setLevel(log_level)
+
+        self.video_path = Path(video_path)
+        self.fps = fps
+        self.vcodec = vcodec
+        self.pix_fmt = pix_fmt
+        self.video_options = get_video_encoder_options(vcodec, g, crf, fast_decode)
+
+        self.num_frames = 0
+        self._min = self._max = self._sum = self._sum_sq = None
+        self._num_pixels = 0
+        self._error = None
+        self.num_blocked_frames = 0
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.thread.start()
+
+    def add_frame(self, image: torch.Tensor | np.ndarray | PIL.Image.Image) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding of {self.video_path} failed.") from self._error
+        if isinstance(image, torch.Tensor):
+            image = image.cpu().numpy()
+        if self.queue.full():
+            if self.num_blocked_frames == 0:
+                logging.warning(
+                    f"Video encoding of {self.video_path} is falling behind the capture rate, waiting for it "
+                    "to catch up. Consider lowering the resolution or the number of cameras."
+                )
+            self.num_blocked_frames += 1
+        if not self._put(image):
+            raise RuntimeError(f"Video encoding of {self.video_path} failed.") from self._error
+
+    def finish(self) -> dict[str, np.ndarray]:
+        """Encodes the remaining frames, closes the video file and returns the stats of the frames."""
+        self._put(None)
+        self.thread.join()
+        if self.num_blocked_frames > 0:
+            logging.warning(
+                f"{self.num_blocked_frames} frames of {self.video_path} had to wait for the encoding to catch up."
+            )
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding of {self.video_path} failed.") from self._error
+        if not self.video_path.exists():
+            raise OSError(f"Video encoding did not work. File not found: {self.video_path}.")
+        return self.get_stats()
+
+    def cancel(self) -> None:
+        """Stops the encoding and removes the video file."""
+        self._put(None)
+        self.thread.join()
+        self.video_path.unlink(missing_ok=True)
+
+    def _put(self, item: np.ndarray | PIL.Image.Image | None) -> bool:
+        """Puts `item` in the queue, waiting for room in it. Returns False if the encoding stopped before."""
+        while self.thread.is_alive():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get_stats(self) -> dict[str, np.ndarray]:
+        """Same format as the image stats of `compute_episode_stats`, i.e. (c, 1, 1) arrays in [0, 1]."""
+        mean = self._sum / self._num_pixels
+        std = np.sqrt(np.maximum(self._sum_sq / self._num_pixels - mean**2, 0))
+        return {
+            "min": self._min[:, None, None] / 255.0,
+            "max": self._max[:, None, None] / 255.0,
+            "mean": mean[:, None, None] / 255.0,
+            "std": std[:, None, None] / 255.0,
+            "count": np.array([self.num_frames]),
+        }
+
+    def _update_stats(self, image: PIL.Image.Image) -> None:
+        img = auto_downsample_height_width(np.asarray(image).transpose(2, 0, 1))
+        pixels = img.reshape(img.shape[0], -1)
+        if self._min is None:
+            self._min = pixels.min(axis=1)
+            self._max = pixels.max(axis=1)
+            self._sum = np.zeros(len(pixels), dtype=np.float64)
+            self._sum_sq = np.zeros(len(pixels), dtype=np.float64)
+        else:
+            self._min = np.minimum(self._min, pixels.min(axis=1))
+            self._max = np.maximum(self._max, pixels.max(axis=1))
+        pixels = pixels.astype(np.float64)
+        self._sum += pixels.sum(axis=1)
+        self._sum_sq += (pixels**2).sum(axis=1)
+        self._num_pixels += pixels.shape[1]
+
+    def _encode_loop(self) -> None:
+        output = None
+        output_stream = None
+        try:
+            while True:
+                image = self.queue.get()
+                if image is None:
+                    break
+                if not isinstance(image, PIL.Image.Image):
+                    image = image_array_to_pil_image(image)
+                image = image.convert("RGB")
+
+                if output is None:
+                    self.video_path.parent.mkdir(parents=True, exist_ok=True)
+                    output = av.open(str(self.video_path), "w")
+                    output_stream = output.add_stream(self.vcodec, self.fps, options=self.video_options)
+                    output_stream.pix_fmt = self.pix_fmt
+                    output_stream.width, output_stream.height = image.size
+
+                packet = output_stream.encode(av.VideoFrame.from_image(image))
+                if packet:
+                    output.mux(packet)
+                self._update_stats(image)
+                self.num_frames += 1
+
+            if output is not None:
+                # Flush the encoder
+                packet = output_stream.encode()
+                if packet:
+                    output.mux(packet)
+        except Exception as e:
+            logging.error(f"Error encoding video {self.video_path}: {e}")
+            self._error = e
+        finally:
+            if output is not None:
+                output.close()
@@ -1 +1,2 @@
+from .bus_worker import MotorsBusState, MotorsBusWorker
 from .motors_bus import Motor, MotorCalibration, MotorNormMode, MotorsBus
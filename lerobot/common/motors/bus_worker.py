@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+from dataclasses import dataclass
+from threading import Event, Thread
+
+from lerobot.common.errors import DeviceNotConnectedError
+
+from .motors_bus import MotorsBus, Value
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MotorsBusState:
+    """Values read from the motors at once, never modified after being published by `MotorsBusWorker`."""
+
+    values: dict[str, dict[str, Value]]  # register name → motor name → value
+    timestamp: float  # `time.perf_counter()` right after the values were received
+
+
+class MotorsBusWorker:
+    """
+    Performs the I/O of a `MotorsBus` in a background thread at a fixed rate, decoupled from the rate of the
+    control loop, so that the latter doesn't wait on the serial communication.
+
+    On each iteration, the thread writes the latest goal if a new one was set, then reads the `data_names`
+    registers of all motors. Both are exchanged with the control loop through references to snapshots that are
+    replaced, never modified: publishing or taking a snapshot is a single assignment, so no lock is needed.
+
+    While the worker is running, it is the only one allowed to communicate with the bus. Errors of the thread are
+    logged and the thread keeps going, but once the latest values are older than `max_age_ms` (5 periods and at
+    least 50ms by default), `read` and `write` raise a `ConnectionError` chained to the last error, so that the
+    control loop never runs on frozen values.
+
+    Example:
+        ```python
+        worker = MotorsBusWorker(bus, ["Present_Position", "Present_Velocity"], fps=200)
+        worker.start()
+        state = worker.read()
+        worker.write({"gripper": 50.0})
+        worker.stop()
+        ```
+    """
+
+    def __init__(
+        self,
+        bus: MotorsBus,
+        data_names: list[str] | None = None,
+        goal_data_name: str = "Goal_Position",
+        fps: float = 200,
+        max_age_ms: float | None = None,
+    ):
+        if fps <= 0:
+            raise ValueError(f"{fps=} must be strictly positive.")
+        self.bus = bus
+        self.data_names = data_names if data_names else ["Present_Position"]
+        self.goal_data_name = goal_data_name
+        self.fps = fps
+        # Leave room for the scheduling jitter of the thread at high rates
+        self.max_age_ms = max_age_ms if max_age_ms is not None else max(5 * 1000 / fps, 50)
+        self.last_error: Exception | None = None
+        self.num_consecutive_errors = 0
+
+        self.thread: Thread | None = None
+        self.stop_event: Event | None = None
+        self.new_state_event = Event()
+        self._state: MotorsBusState | None = None
+        self._goal: dict[str, Value] | None = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.bus.port})"
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self) -> None:
+        if not self.bus.is_connected:
+            raise DeviceNotConnectedError(f"{self.bus} is not connected.")
+        if self.is_running:
+            raise RuntimeError(f"{self} is already running.")
+
+        self._state = None
+        self._goal = None
+        self.last_error = None
+        self.num_consecutive_errors = 0
+        self.new_state_event.clear()
+        self.stop_event = Event()
+        self.thread = Thread(target=self._io_loop, args=(self.stop_event,), name=f"{self}_io_loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+        self.thread = None
+        self.stop_event = None
+
+    def read(self, timeout_ms: float = 200) -> MotorsBusState:
+        """
+        Returns the latest values read from the motors, waiting up to `timeout_ms` for the first ones.
+
+        Raises:
+            ConnectionError: If the latest values are older than `max_age_ms`, e.g. when the bus keeps failing.
+        """
+        if not self.is_running:
+            raise RuntimeError(f"{self} is not running.")
+
+        if not self.new_state_event.wait(timeout=timeout_ms / 1000.0):
+            raise TimeoutError(f"Timed out waiting for the state of {self} after {timeout_ms} ms.")
+
+        state = self._state
+        self._check_age(state)
+        return state
+
+    def write(self, goal: dict[str, Value]) -> None:
+        """
+        Sets the goal written to the motors on the next iteration, replacing any goal not written yet.
+
+        Raises:
+            ConnectionError: If the latest values are older than `max_age_ms`, e.g. when the bus keeps failing.
+        """
+        if not self.is_running:
+            raise RuntimeError(f"{self} is not running.")
+
+        state = self._state
+        if state is not None:
+            self._check_age(state)
+        self._goal = dict(goal)
+
+    def _check_age(self, state: MotorsBusState) -> None:
+        age_ms = (time.perf_counter() - state.timestamp) * 1e3
+        if age_ms > self.max_age_ms:
+            raise ConnectionError(
+                f"Latest state of {self} is {age_ms:.1f}ms old (more than {self.max_age_ms:.1f}ms), "
+                f"after {self.num_consecutive_errors} failed iterations."
+            ) from self.last_error
+
+    def _io_loop(self, stop_event: Event) -> None:
+        period = 1 / self.fps
+        next_iteration = time.perf_counter()
+        written_goal = None
+        while not stop_event.is_set():
+            try:
+                goal = self._goal
+                if goal is not None and goal is not written_goal:
+                    self.bus.sync_write(self.goal_data_name, goal)
+                    written_goal = goal
+
+                if len(self.data_names) == 1:
+                    values = {self.data_names[0]: self.bus.sync_read(self.data_names[0])}
+                else:
+                    values = self.bus.sync_read_many(self.data_names)
+                self._state = MotorsBusState(values, time.perf_counter())
+                self.new_state_event.set()
+                self.num_consecutive_errors = 0
+
+            except DeviceNotConnectedError:
+                break
+            except Exception as e:
+                if self.num_consecutive_errors == 0:
+                    logger.warning(
+                        f"Error communicating with the motors in background thread for {self}: {e}"
+                    )
+                self.last_error = e
+                self.num_consecutive_errors += 1
+
+            # Don't try to catch up on late iterations
+            next_iteration = max(next_iteration + period, time.perf_counter())
+            stop_event.wait(next_iteration - time.perf_counter())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Discovery of the motors connected to several ports at once.
+
+Each port is scanned by its own thread, probing the baud-rates from the most to the least likely one. The
+layout found on each port (baud-rate, ids and model numbers of the motors) is cached, so that the next discovery
+only has to check that the motors are still there, e.g. after a reboot.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from lerobot.common.constants import HF_LEROBOT_HOME
+
+from .motors_bus import MotorsBus
+
+DEFAULT_LAYOUTS_PATH = HF_LEROBOT_HOME / "motors_layouts.json"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PortLayout:
+    port: str
+    baudrate: int
+    ids_models: dict[int, int]  # id → model number
+
+
+def load_layouts(bus_cls: type[MotorsBus], path: Path = DEFAULT_LAYOUTS_PATH) -> dict[str, PortLayout]:
+    """Loads the cached layouts of the ports of `bus_cls` buses."""
+    if not path.is_file():
+        return {}
+    with open(path) as f:
+        layouts = json.load(f).get(bus_cls.__name__, {})
+    return {
+        port: PortLayout(port, layout["baudrate"], {int(id_): m for id_, m in layout["ids_models"].items()})
+        for port, layout in layouts.items()
+    }
+
+
+def save_layouts(
+    bus_cls: type[MotorsBus], layouts: dict[str, PortLayout], path: Path = DEFAULT_LAYOUTS_PATH
+) -> None:
+    """Adds `layouts` to the cached layouts, replacing the previous ones of the same ports. The file is replaced
+    atomically, so that concurrent readers never see it partially written.
+    """
+    all_layouts = {}
+    if path.is_file():
+        with open(path) as f:
+            all_layouts = json.load(f)
+    bus_layouts = all_layouts.setdefault(bus_cls.__name__, {})
+    for port, layout in layouts.items():
+        bus_layouts[port] = {"baudrate": layout.baudrate, "ids_models": layout.ids_models}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(all_layouts, f, indent=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def discover_port(
+    bus_cls: type[MotorsBus],
+    port: str,
+    baudrates: list[int] | None = None,
+    cached_layout: PortLayout | None = None,
+    stop_at_first: bool = True,
+    ids: list[int] | None = None,
+    **bus_kwargs,
+) -> list[PortLayout]:
+    """Finds the motors connected to `port`.
+
+    Args:
+        bus_cls (type[MotorsBus]): Class of the bus the motors are connected to.
+        port (str): Serial/USB port to scan.
+        baudrates (list[int] | None, optional): Baud-rates to probe. Defaults to all the available ones.
+        cached_layout (PortLayout | None, optional): Last known layout of the port, returned right away if the
+            same motors answer at the same baud-rate.
+        stop_at_first (bool, optional): Stop at the first baud-rate where motors answer. Defaults to `True`.
+        ids (list[int] | None, optional): IDs to look for on buses that can't broadcast pings and thus ping
+            each ID in turn, e.g. Feetech protocol 1. Restricting them shortens the scan. Defaults to all IDs.
+        **bus_kwargs: Forwarded to the bus constructor.
+
+    Returns:
+        list[PortLayout]: Layouts found for every baud-rate where motors answered.
+    """
+    bus = bus_cls(port, {}, **bus_kwargs)
+    bus._connect(handshake=False)
+    try:
+        if cached_layout is not None:
+            bus.set_baudrate(cached_layout.baudrate)
+            if bus._scan_ids_models(list(cached_layout.ids_models)) == cached_layout.ids_models:
+                return [cached_layout]
+            logger.info(f"Motors on '{port}' changed since they were cached, scanning the port.")
+
+        baudrates = bus._order_baudrates(
+            baudrates if baudrates is not None else bus.available_baudrates,
+            preferred=[cached_layout.baudrate] if cached_layout is not None else None,
+        )
+        layouts = []
+        for baudrate in baudrates:
+            bus.set_baudrate(baudrate)
+            ids_models = bus._scan_ids_models(ids)
+            if ids_models:
+                logger.info(f"Motors found on '{port}' for {baudrate=}: {ids_models}")
+                layouts.append(PortLayout(port, baudrate, ids_models))
+                if stop_at_first:
+                    break
+    finally:
+        bus.port_handler.closePort()
+
+    return layouts
+
+
+def discover_ports(
+    bus_cls: type[MotorsBus],
+    ports: list[str],
+    baudrates: list[int] | None = None,
+    stop_at_first: bool = True,
+    ids: list[int] | None = None,
+    use_cache: bool = True,
+    cache_path: Path = DEFAULT_LAYOUTS_PATH,
+    **bus_kwargs,
+) -> dict[str, list[PortLayout]]:
+    """Finds the motors connected to each of the `ports` concurrently, one thread per port.
+
+    See `discover_port` for the arguments. With `use_cache`, the layouts are checked against and saved to
+    `cache_path`. Ports that can't be opened are logged and have no layouts.
+
+    Returns:
+        dict[str, list[PortLayout]]: Mapping *port → layouts found*.
+    """
+    cached_layouts = load_layouts(bus_cls, cache_path) if use_cache else {}
+
+    def discover(port: str) -> list[PortLayout]:
+        try:
+            return discover_port(
+                bus_cls, port, baudrates, cached_layouts.get(port), stop_at_first, ids, **bus_kwargs
+            )
+        except ConnectionError as e:
+            logger.warning(f"Failed to scan '{port}': {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(len(ports), 1), thread_name_prefix="discover_port") as executor:
+        ports_layouts = dict(zip(ports, executor.map(discover, ports), strict=True))
+
+    if use_cache:
+        found_layouts = {port: layouts[0] for port, layouts in ports_layouts.items() if layouts}
+        if found_layouts:
+            save_layouts(bus_cls, found_layouts, cache_path)
+
+    return ports_layouts
@@ -143,7 +143,9 @@ class DynamixelMotorsBus(MotorsBus):
     def _find_single_motor(self, motor: str, initial_baudrate: int | None = None) -> tuple[int, int]:
         model = self.motors[motor].model
         search_baudrates = (
-            [initial_baudrate] if initial_baudrate is not None else self.model_baudrate_table[model]
+            [initial_baudrate]
+            if initial_baudrate is not None
+            else self._order_baudrates(self.model_baudrate_table[model])
         )
 
         for baudrate in search_baudrates:
@@ -247,6 +249,7 @@ class DynamixelMotorsBus(MotorsBus):
         return _split_into_byte_chunks(value, length)
 
     def broadcast_ping(self, num_retry: int = 0, raise_on_error: bool = False) -> dict[int, int] | None:
+        self._collect_pending_read()
         for n_try in range(1 + num_retry):
             data_list, comm = self.packet_handler.broadcastPing(self.port_handler)
             if self._is_comm_success(comm):
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import logging
+from contextlib import contextmanager
 from copy import deepcopy
 from enum import Enum
 from pprint import pformat
@@ -36,6 +37,10 @@ from .tables import (
 DEFAULT_PROTOCOL_VERSION = 0
 DEFAULT_BAUDRATE = 1_000_000
 DEFAULT_TIMEOUT_MS = 1000
+# Time allowed for a motor to start answering a packet, on top of the transmission time of the packet. It is
+# shortened while scanning IDs one by one, where most pings go unanswered and each of them costs this much.
+PACKET_TIMEOUT_MARGIN_MS = 50
+SCAN_PACKET_TIMEOUT_MARGIN_MS = 10
 
 NORMALIZED_DATA = ["Goal_Position", "Present_Position"]
 
@@ -92,8 +97,9 @@ def patch_setPacketTimeout(self, packet_length):  # noqa: N802
     but because that version is not published on PyPI, we rely on the (unofficial) on that is, which needs
     patching.
     """
+    margin_ms = getattr(self, "packet_timeout_margin_ms", PACKET_TIMEOUT_MARGIN_MS)
     self.packet_start_time = self.getCurrentTime()
-    self.packet_timeout = (self.tx_time_per_byte * packet_length) + (self.tx_time_per_byte * 3.0) + 50
+    self.packet_timeout = (self.tx_time_per_byte * packet_length) + (self.tx_time_per_byte * 3.0) + margin_ms
 
 
 class FeetechMotorsBus(MotorsBus):
@@ -176,7 +182,9 @@ class FeetechMotorsBus(MotorsBus):
     def _find_single_motor_p0(self, motor: str, initial_baudrate: int | None = None) -> tuple[int, int]:
         model = self.motors[motor].model
         search_baudrates = (
-            [initial_baudrate] if initial_baudrate is not None else self.model_baudrate_table[model]
+            [initial_baudrate]
+            if initial_baudrate is not None
+            else self._order_baudrates(self.model_baudrate_table[model])
         )
         expected_model_nb = self.model_number_table[model]
 
@@ -200,25 +208,53 @@ class FeetechMotorsBus(MotorsBus):
 
         model = self.motors[motor].model
         search_baudrates = (
-            [initial_baudrate] if initial_baudrate is not None else self.model_baudrate_table[model]
+            [initial_baudrate]
+            if initial_baudrate is not None
+            else self._order_baudrates(self.model_baudrate_table[model])
         )
         expected_model_nb = self.model_number_table[model]
 
-        for baudrate in search_baudrates:
-            self.set_baudrate(baudrate)
-            for id_ in range(scs.MAX_ID + 1):
-                found_model = self.ping(id_)
-                if found_model is not None:
-                    if found_model != expected_model_nb:
-                        raise RuntimeError(
-                            f"Found one motor on {baudrate=} with id={id_} but it has a "
-                            f"model number '{found_model}' different than the one expected: '{expected_model_nb}'. "
-                            f"Make sure you are connected only connected to the '{motor}' motor (model '{model}')."
-                        )
-                    return baudrate, id_
+        with self._scan_packet_timeout():
+            for baudrate in search_baudrates:
+                self.set_baudrate(baudrate)
+                for id_ in range(scs.MAX_ID + 1):
+                    found_model = self.ping(id_)
+                    if found_model is not None:
+                        if found_model != expected_model_nb:
+                            raise RuntimeError(
+                                f"Found one motor on {baudrate=} with id={id_} but it has a "
+                                f"model number '{found_model}' different than the one expected: '{expected_model_nb}'. "
+                                f"Make sure you are connected only connected to the '{motor}' motor (model '{model}')."
+                            )
+                        return baudrate, id_
 
         raise RuntimeError(f"Motor '{motor}' (model '{model}') was not found. Make sure it is connected.")
 
+    def _scan_ids_models(self, ids: list[int] | None = None) -> dict[int, int] | None:
+        if self.protocol_version == 0:
+            return self.broadcast_ping()
+
+        import scservo_sdk as scs
+
+        ids_models = {}
+        with self._scan_packet_timeout():
+            for id_ in ids if ids is not None else range(scs.MAX_ID + 1):
+                model_number = self.ping(id_)
+                if model_number is not None:
+                    ids_models[id_] = model_number
+        return ids_models
+
+    @contextmanager
+    def _scan_packet_timeout(self):
+        """Shortens the time waited for each answer while pinging IDs one by one: pings can't be sent
+        concurrently on the half-duplex bus, so the unanswered ones would otherwise make scans last minutes.
+        """
+        self.port_handler.packet_timeout_margin_ms = SCAN_PACKET_TIMEOUT_MARGIN_MS
+        try:
+            yield
+        finally:
+            self.port_handler.packet_timeout_margin_ms = PACKET_TIMEOUT_MARGIN_MS
+
     def configure_motors(self) -> None:
         for motor in self.motors:
             # By default, Feetech motors have a 500µs delay response time (corresponding to a value of 250 on
@@ -334,6 +370,7 @@ class FeetechMotorsBus(MotorsBus):
     def _broadcast_ping(self) -> tuple[dict[int, int], int]:
         import scservo_sdk as scs
 
+        self._collect_pending_read()
         data_list = {}
 
         status_length = 6
@@ -21,6 +21,8 @@
 
 import abc
 import logging
+import time
+from collections.abc import Iterable
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
@@ -28,6 +30,7 @@ from functools import cached_property
 from pprint import pformat
 from typing import Protocol, TypeAlias
 
+import numpy as np
 import serial
 from deepdiff import DeepDiff
 from tqdm import tqdm
@@ -99,6 +102,23 @@ class Motor:
     norm_mode: MotorNormMode
 
 
+@dataclass
+class CalibrationArrays:
+    """Calibration of the motors of a bus as arrays indexed by the position of the motors in `MotorsBus.motors`,
+    to normalize the values of several motors at once.
+    """
+
+    is_calibrated: np.ndarray  # bool, whether the motor has a calibration
+    range_min: np.ndarray
+    range_max: np.ndarray
+    drive_mode: np.ndarray  # bool, whether the direction is inverted (if the bus applies drive modes)
+    norm_mode: np.ndarray  # index of the MotorNormMode in NORM_MODES
+    max_res: np.ndarray  # highest encoder value
+
+
+NORM_MODES = list(MotorNormMode)
+
+
 class JointOutOfRangeError(Exception):
     def __init__(self, message="Joint is out of range"):
         self.message = message
@@ -279,6 +299,12 @@ class MotorsBus(abc.ABC):
 
         self._id_to_model_dict = {m.id: m.model for m in self.motors.values()}
         self._id_to_name_dict = {m.id: motor for motor, m in self.motors.items()}
+        self._id_to_index_dict = {m.id: i for i, m in enumerate(self.motors.values())}
+        self._motors_indices: dict[tuple[str, ...], np.ndarray] = {}
+        # Sync read packets are built once for each (address, length, ids) and reused
+        self._sync_read_plans: dict[tuple[int, int, tuple[int, ...]], GroupSyncRead] = {}
+        # Plan of the sync read requested by `async_read` whose response hasn't been received, and request time
+        self._pending_read: tuple[tuple[int, int, tuple[int, ...]], float] | None = None
         self._model_nb_to_model_dict = {v: k for k, v in self.model_number_table.items()}
 
         self._validate_motors()
@@ -294,6 +320,56 @@ class MotorsBus(abc.ABC):
             ")',\n"
         )
 
+    @property
+    def calibration(self) -> dict[str, MotorCalibration]:
+        """Calibration of the motors. A new dict must be assigned to change it, rather than modifying it in place,
+        so that its arrays are compiled again.
+        """
+        return self._calibration
+
+    @calibration.setter
+    def calibration(self, calibration: dict[str, MotorCalibration]) -> None:
+        self._calibration = calibration
+        self._calibration_arrays = None
+
+    @property
+    def calibration_arrays(self) -> CalibrationArrays:
+        """Calibration compiled into arrays, see `CalibrationArrays`."""
+        if self._calibration_arrays is None:
+            self._calibration_arrays = self._compile_calibration()
+        return self._calibration_arrays
+
+    def _compile_calibration(self) -> CalibrationArrays:
+        num_motors = len(self.motors)
+        arrays = CalibrationArrays(
+            is_calibrated=np.zeros(num_motors, dtype=bool),
+            range_min=np.zeros(num_motors, dtype=np.int64),
+            range_max=np.zeros(num_motors, dtype=np.int64),
+            drive_mode=np.zeros(num_motors, dtype=bool),
+            norm_mode=np.array([NORM_MODES.index(m.norm_mode) for m in self.motors.values()], dtype=np.int64),
+            max_res=np.array([self.model_resolution_table[m.model] - 1 for m in self.motors.values()]),
+        )
+        for i, motor in enumerate(self.motors):
+            if motor in self.calibration:
+                cal = self.calibration[motor]
+                arrays.is_calibrated[i] = True
+                arrays.range_min[i] = cal.range_min
+                arrays.range_max[i] = cal.range_max
+                arrays.drive_mode[i] = bool(self.apply_drive_mode and cal.drive_mode)
+        return arrays
+
+    def _get_motors_indices(self, motors: str | list[str] | None) -> np.ndarray:
+        """Positions of the motors in `self.motors`, cached for each selection of motors."""
+        key = (motors,) if isinstance(motors, str) else tuple(motors) if motors is not None else ()
+        indices = self._motors_indices.get(key)
+        if indices is None:
+            names = self._get_motors_list(motors)
+            indices = np.array(
+                [self._id_to_index_dict[self.motors[motor].id] for motor in names], dtype=np.int64
+            )
+            self._motors_indices[key] = indices
+        return indices
+
     @cached_property
     def _has_different_ctrl_tables(self) -> bool:
         if len(self.models) < 2:
@@ -435,6 +511,8 @@ class MotorsBus(abc.ABC):
 
         self._connect(handshake)
         self.set_timeout()
+        if self.calibration:
+            self._calibration_arrays = self._compile_calibration()
         logger.debug(f"{self.__class__.__name__} connected.")
 
     def _connect(self, handshake: bool = True) -> None:
@@ -466,6 +544,7 @@ class MotorsBus(abc.ABC):
                 f"{self.__class__.__name__}('{self.port}') is not connected. Try running `{self.__class__.__name__}.connect()` first."
             )
 
+        self._collect_pending_read()
         if disable_torque:
             self.port_handler.clearPort()
             self.port_handler.is_using = False
@@ -489,9 +568,9 @@ class MotorsBus(abc.ABC):
         bus = cls(port, {}, *args, **kwargs)
         bus._connect(handshake=False)
         baudrate_ids = {}
-        for baudrate in tqdm(bus.available_baudrates, desc="Scanning port"):
+        for baudrate in tqdm(bus._order_baudrates(bus.available_baudrates), desc="Scanning port"):
             bus.set_baudrate(baudrate)
-            ids_models = bus.broadcast_ping()
+            ids_models = bus._scan_ids_models()
             if ids_models:
                 tqdm.write(f"Motors found for {baudrate=}: {pformat(ids_models, indent=4)}")
                 baudrate_ids[baudrate] = list(ids_models)
@@ -499,6 +578,25 @@ class MotorsBus(abc.ABC):
         bus.port_handler.closePort()
         return baudrate_ids
 
+    def _order_baudrates(self, baudrates: Iterable[int], preferred: list[int] | None = None) -> list[int]:
+        """Orders `baudrates` by likelihood of being the one of the motors, so that searches can stop early:
+        the `preferred` ones first (e.g. the last known one), then the default baud-rate of the bus, and the
+        others from the fastest to the slowest, as probing at a high baud-rate takes less time.
+        """
+        baudrates = list(baudrates)
+        first = [b for b in [*(preferred or []), self.default_baudrate] if b in baudrates]
+        first = list(dict.fromkeys(first))
+        return first + sorted(set(baudrates) - set(first), reverse=True)
+
+    def _scan_ids_models(self, ids: list[int] | None = None) -> dict[int, int] | None:
+        """Finds the motors answering at the current baud-rate. Buses whose protocol doesn't support broadcast
+        pings ping the `ids` (every possible ID if `None`) one by one instead.
+
+        Returns:
+            dict[int, int] | None: Mapping *id → model number* or `None` if the call failed.
+        """
+        return self.broadcast_ping()
+
     def setup_motor(
         self, motor: str, initial_baudrate: int | None = None, initial_id: int | None = None
     ) -> None:
@@ -773,63 +871,68 @@ class MotorsBus(abc.ABC):
         return mins, maxes
 
     def _normalize(self, ids_values: dict[int, int]) -> dict[int, float]:
-        if not self.calibration:
-            raise RuntimeError(f"{self} has no calibration registered.")
-
-        normalized_values = {}
-        for id_, val in ids_values.items():
-            motor = self._id_to_name(id_)
-            min_ = self.calibration[motor].range_min
-            max_ = self.calibration[motor].range_max
-            drive_mode = self.apply_drive_mode and self.calibration[motor].drive_mode
-            if max_ == min_:
-                raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
-
-            bounded_val = min(max_, max(min_, val))
-            if self.motors[motor].norm_mode is MotorNormMode.RANGE_M100_100:
-                norm = (((bounded_val - min_) / (max_ - min_)) * 200) - 100
-                normalized_values[id_] = -norm if drive_mode else norm
-            elif self.motors[motor].norm_mode is MotorNormMode.RANGE_0_100:
-                norm = ((bounded_val - min_) / (max_ - min_)) * 100
-                normalized_values[id_] = 100 - norm if drive_mode else norm
-            elif self.motors[motor].norm_mode is MotorNormMode.DEGREES:
-                mid = (min_ + max_) / 2
-                max_res = self.model_resolution_table[self._id_to_model(id_)] - 1
-                normalized_values[id_] = (val - mid) * 360 / max_res
-            else:
-                raise NotImplementedError
-
-        return normalized_values
+        indices = np.array([self._id_to_index_dict[id_] for id_ in ids_values], dtype=np.int64)
+        values = np.fromiter(ids_values.values(), dtype=np.int64, count=len(ids_values))
+        return dict(zip(ids_values, self._normalize_array(indices, values).tolist(), strict=True))
 
     def _unnormalize(self, ids_values: dict[int, float]) -> dict[int, int]:
+        indices = np.array([self._id_to_index_dict[id_] for id_ in ids_values], dtype=np.int64)
+        values = np.fromiter(ids_values.values(), dtype=np.float64, count=len(ids_values))
+        return dict(zip(ids_values, self._unnormalize_array(indices, values).tolist(), strict=True))
+
+    def _get_calibration(self, indices: np.ndarray) -> tuple[np.ndarray, ...]:
         if not self.calibration:
             raise RuntimeError(f"{self} has no calibration registered.")
 
-        unnormalized_values = {}
-        for id_, val in ids_values.items():
-            motor = self._id_to_name(id_)
-            min_ = self.calibration[motor].range_min
-            max_ = self.calibration[motor].range_max
-            drive_mode = self.apply_drive_mode and self.calibration[motor].drive_mode
-            if max_ == min_:
-                raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
-
-            if self.motors[motor].norm_mode is MotorNormMode.RANGE_M100_100:
-                val = -val if drive_mode else val
-                bounded_val = min(100.0, max(-100.0, val))
-                unnormalized_values[id_] = int(((bounded_val + 100) / 200) * (max_ - min_) + min_)
-            elif self.motors[motor].norm_mode is MotorNormMode.RANGE_0_100:
-                val = 100 - val if drive_mode else val
-                bounded_val = min(100.0, max(0.0, val))
-                unnormalized_values[id_] = int((bounded_val / 100) * (max_ - min_) + min_)
-            elif self.motors[motor].norm_mode is MotorNormMode.DEGREES:
-                mid = (min_ + max_) / 2
-                max_res = self.model_resolution_table[self._id_to_model(id_)] - 1
-                unnormalized_values[id_] = int((val * max_res / 360) + mid)
-            else:
-                raise NotImplementedError
+        cal = self.calibration_arrays
+        min_, max_ = cal.range_min[indices], cal.range_max[indices]
+        invalid = ~cal.is_calibrated[indices] | (min_ == max_)
+        if invalid.any():
+            motor = list(self.motors)[indices[invalid.argmax()]]
+            if motor not in self.calibration:
+                raise KeyError(f"Motor '{motor}' has no calibration registered.")
+            raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
+
+        return min_, max_, cal.drive_mode[indices], cal.norm_mode[indices], cal.max_res[indices]
+
+    def _normalize_array(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Normalizes the raw `values` of the motors at `indices` in `self.motors`."""
+        min_, max_, drive_mode, norm_mode, max_res = self._get_calibration(indices)
+        ratio = (np.clip(values, min_, max_) - min_) / (max_ - min_)
+        range_m100_100 = ratio * 200 - 100
+        range_0_100 = ratio * 100
+        return np.select(
+            [
+                norm_mode == NORM_MODES.index(MotorNormMode.RANGE_M100_100),
+                norm_mode == NORM_MODES.index(MotorNormMode.RANGE_0_100),
+            ],
+            [
+                np.where(drive_mode, -range_m100_100, range_m100_100),
+                np.where(drive_mode, 100 - range_0_100, range_0_100),
+            ],
+            # Degrees
+            default=(values - (min_ + max_) / 2) * 360 / max_res,
+        )
 
-        return unnormalized_values
+    def _unnormalize_array(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Converts the normalized `values` of the motors at `indices` in `self.motors` to raw values."""
+        min_, max_, drive_mode, norm_mode, max_res = self._get_calibration(indices)
+        range_m100_100 = np.clip(np.where(drive_mode, -values, values), -100.0, 100.0)
+        range_0_100 = np.clip(np.where(drive_mode, 100 - values, values), 0.0, 100.0)
+        unnormalized = np.select(
+            [
+                norm_mode == NORM_MODES.index(MotorNormMode.RANGE_M100_100),
+                norm_mode == NORM_MODES.index(MotorNormMode.RANGE_0_100),
+            ],
+            [
+                ((range_m100_100 + 100) / 200) * (max_ - min_) + min_,
+                (range_0_100 / 100) * (max_ - min_) + min_,
+            ],
+            # Degrees
+            default=(values * max_res / 360) + (min_ + max_) / 2,
+        )
+        # Truncated towards zero like `int()`
+        return np.trunc(unnormalized).astype(np.int64)
 
     @abc.abstractmethod
     def _encode_sign(self, data_name: str, ids_values: dict[int, int]) -> dict[int, int]:
@@ -879,6 +982,7 @@ class MotorsBus(abc.ABC):
             int | None: Motor model number or `None` on failure.
         """
         id_ = self._get_motor_id(motor)
+        self._collect_pending_read()
         for n_try in range(1 + num_retry):
             model_number, comm, error = self.packet_handler.ping(self.port_handler, id_)
             if self._is_comm_success(comm):
@@ -970,6 +1074,7 @@ class MotorsBus(abc.ABC):
         else:
             raise ValueError(length)
 
+        self._collect_pending_read()
         for n_try in range(1 + num_retry):
             value, comm, error = read_fn(self.port_handler, motor_id, address)
             if self._is_comm_success(comm):
@@ -1033,6 +1138,7 @@ class MotorsBus(abc.ABC):
         err_msg: str = "",
     ) -> tuple[int, int]:
         data = self._serialize_data(value, length)
+        self._collect_pending_read()
         for n_try in range(1 + num_retry):
             comm, error = self.packet_handler.writeTxRx(self.port_handler, motor_id, addr, length, data)
             if self._is_comm_success(comm):
@@ -1097,6 +1203,102 @@ class MotorsBus(abc.ABC):
 
         return {self._id_to_name(id_): value for id_, value in ids_values.items()}
 
+    def sync_read_array(
+        self,
+        data_name: str,
+        motors: str | list[str] | None = None,
+        *,
+        normalize: bool = True,
+        num_retry: int = 0,
+    ) -> np.ndarray:
+        """Same as :pymeth:`sync_read` but returns the values as an array ordered like `motors` (or like
+        `self.motors` if `motors` is `None`), normalized for all motors at once with the compiled calibration.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
+
+        self._assert_protocol_is_compatible("sync_read")
+
+        names = self._get_motors_list(motors)
+        ids = [self.motors[motor].id for motor in names]
+        models = [self.motors[motor].model for motor in names]
+
+        if self._has_different_ctrl_tables:
+            assert_same_address(self.model_ctrl_table, models, data_name)
+
+        addr, length = get_address(self.model_ctrl_table, models[0], data_name)
+
+        err_msg = f"Failed to sync read '{data_name}' on {ids=} after {num_retry + 1} tries."
+        ids_values, _ = self._sync_read(
+            addr, length, ids, num_retry=num_retry, raise_on_error=True, err_msg=err_msg
+        )
+
+        ids_values = self._decode_sign(data_name, ids_values)
+        values = np.array([ids_values[id_] for id_ in ids], dtype=np.int64)
+
+        if normalize and data_name in self.normalized_data:
+            return self._normalize_array(self._get_motors_indices(motors), values)
+
+        return values
+
+    def sync_read_many(
+        self,
+        data_names: list[str],
+        motors: str | list[str] | None = None,
+        *,
+        normalize: bool = True,
+        num_retry: int = 0,
+    ) -> dict[str, dict[str, Value]]:
+        """Read several registers from several motors in a single transaction.
+
+        The span of addresses covering all the registers is read at once, which is meant for registers that are
+        close to each other in the control table (e.g. "Present_Position", "Present_Velocity" and
+        "Present_Load").
+
+        Args:
+            data_names (list[str]): Register names.
+            motors (str | list[str] | None, optional): Motors to query. `None` (default) reads every motor.
+            normalize (bool, optional): Normalisation flag.  Defaults to `True`.
+            num_retry (int, optional): Retry attempts.  Defaults to `0`.
+
+        Returns:
+            dict[str, dict[str, Value]]: Mapping *register name → motor name → value*.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
+
+        self._assert_protocol_is_compatible("sync_read")
+
+        names = self._get_motors_list(motors)
+        ids = [self.motors[motor].id for motor in names]
+        models = [self.motors[motor].model for motor in names]
+
+        if self._has_different_ctrl_tables:
+            for data_name in data_names:
+                assert_same_address(self.model_ctrl_table, models, data_name)
+
+        registers = [get_address(self.model_ctrl_table, models[0], data_name) for data_name in data_names]
+        addr = min(reg_addr for reg_addr, _ in registers)
+        length = max(reg_addr + reg_length for reg_addr, reg_length in registers) - addr
+
+        err_msg = f"Failed to sync read {data_names} on {ids=} after {num_retry + 1} tries."
+        registers_values, _ = self._sync_read_span(
+            addr, length, ids, registers, num_retry=num_retry, raise_on_error=True, err_msg=err_msg
+        )
+
+        values = {}
+        for data_name, ids_values in zip(data_names, registers_values, strict=True):
+            ids_values = self._decode_sign(data_name, ids_values)
+            if normalize and data_name in self.normalized_data:
+                ids_values = self._normalize(ids_values)
+            values[data_name] = {self._id_to_name(id_): value for id_, value in ids_values.items()}
+
+        return values
+
     def _sync_read(
         self,
         addr: int,
@@ -1107,9 +1309,35 @@ class MotorsBus(abc.ABC):
         raise_on_error: bool = True,
         err_msg: str = "",
     ) -> tuple[dict[int, int], int]:
-        self._setup_sync_reader(motor_ids, addr, length)
+        (values,), comm = self._sync_read_span(
+            addr,
+            length,
+            motor_ids,
+            [(addr, length)],
+            num_retry=num_retry,
+            raise_on_error=raise_on_error,
+            err_msg=err_msg,
+        )
+        return values, comm
+
+    def _sync_read_span(
+        self,
+        addr: int,
+        length: int,
+        motor_ids: list[int],
+        registers: list[tuple[int, int]],
+        *,
+        num_retry: int = 0,
+        raise_on_error: bool = True,
+        err_msg: str = "",
+    ) -> tuple[list[dict[int, int]], int]:
+        """Sync reads `length` bytes starting at `addr` and returns the values of each of the `registers`
+        (address, length) that lie within this span.
+        """
+        self._collect_pending_read()
+        sync_reader = self._get_sync_read_plan(addr, length, motor_ids)
         for n_try in range(1 + num_retry):
-            comm = self.sync_reader.txRxPacket()
+            comm = sync_reader.txRxPacket()
             if self._is_comm_success(comm):
                 break
             logger.debug(
@@ -1120,7 +1348,10 @@ class MotorsBus(abc.ABC):
         if not self._is_comm_success(comm) and raise_on_error:
             raise ConnectionError(f"{err_msg} {self.packet_handler.getTxRxResult(comm)}")
 
-        values = {id_: self.sync_reader.getData(id_, addr, length) for id_ in motor_ids}
+        values = [
+            {id_: sync_reader.getData(id_, reg_addr, reg_length) for id_ in motor_ids}
+            for reg_addr, reg_length in registers
+        ]
         return values, comm
 
     def _setup_sync_reader(self, motor_ids: list[int], addr: int, length: int) -> None:
@@ -1130,19 +1361,104 @@ class MotorsBus(abc.ABC):
         for id_ in motor_ids:
             self.sync_reader.addParam(id_)
 
-    # TODO(aliberts, pkooij): Implementing something like this could get even much faster read times if need be.
-    # Would have to handle the logic of checking if a packet has been sent previously though but doable.
-    # This could be at the cost of increase latency between the moment the data is produced by the motors and
-    # the moment it is used by a policy.
-    # def _async_read(self, motor_ids: list[int], address: int, length: int):
-    #     if self.sync_reader.start_address != address or self.sync_reader.data_length != length or ...:
-    #         self._setup_sync_reader(motor_ids, address, length)
-    #     else:
-    #         self.sync_reader.rxPacket()
-    #         self.sync_reader.txPacket()
+    def _get_sync_read_plan(self, addr: int, length: int, motor_ids: list[int]) -> GroupSyncRead:
+        """Returns a sync reader set up for `motor_ids`, whose instruction packet is only built the first time it
+        is sent.
+        """
+        key = (addr, length, tuple(motor_ids))
+        sync_reader = self._sync_read_plans.get(key)
+        if sync_reader is None:
+            sync_reader = type(self.sync_reader)(self.port_handler, self.packet_handler, addr, length)
+            for id_ in motor_ids:
+                sync_reader.addParam(id_)
+            self._sync_read_plans[key] = sync_reader
+        return sync_reader
+
+    def async_read(
+        self,
+        data_name: str,
+        motors: str | list[str] | None = None,
+        *,
+        normalize: bool = True,
+        num_retry: int = 0,
+    ) -> tuple[dict[str, Value], float]:
+        """Pipelined version of :pymeth:`sync_read`.
+
+        The request for the next values is sent right after receiving the current ones, so that the motors
+        answer while the caller is busy and the next call only has to collect the response. The values returned
+        are thus as old as the time elapsed between two calls. The first call (or a call after the pending
+        response was lost) reads synchronously. Any other communication on the bus collects the pending
+        response first.
+
+        Args:
+            data_name (str): Register name.
+            motors (str | list[str] | None, optional): Motors to query. `None` (default) reads every motor.
+            normalize (bool, optional): Normalisation flag.  Defaults to `True`.
+            num_retry (int, optional): Retry attempts of synchronous reads.  Defaults to `0`.
+
+        Returns:
+            tuple[dict[str, Value], float]: Mapping *motor name → value* and the age of the values in seconds,
+                i.e. the time elapsed since they were requested.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
 
-    #     for id_ in motor_ids:
-    #         value = self.sync_reader.getData(id_, address, length)
+        self._assert_protocol_is_compatible("sync_read")
+
+        names = self._get_motors_list(motors)
+        ids = [self.motors[motor].id for motor in names]
+        models = [self.motors[motor].model for motor in names]
+
+        if self._has_different_ctrl_tables:
+            assert_same_address(self.model_ctrl_table, models, data_name)
+
+        addr, length = get_address(self.model_ctrl_table, models[0], data_name)
+        sync_reader = self._get_sync_read_plan(addr, length, ids)
+
+        comm = None
+        if self._pending_read is not None and self._pending_read[0] == (addr, length, tuple(ids)):
+            requested_at = self._pending_read[1]
+            self._pending_read = None
+            comm = sync_reader.rxPacket()
+            if not self._is_comm_success(comm):
+                logger.debug(
+                    f"Failed to receive pipelined sync read @{addr=} ({length=}) on {ids=}: "
+                    + self.packet_handler.getTxRxResult(comm)
+                )
+
+        if comm is None or not self._is_comm_success(comm):
+            requested_at = time.perf_counter()
+            err_msg = f"Failed to sync read '{data_name}' on {ids=} after {num_retry + 1} tries."
+            ids_values, _ = self._sync_read(
+                addr, length, ids, num_retry=num_retry, raise_on_error=True, err_msg=err_msg
+            )
+        else:
+            ids_values = {id_: sync_reader.getData(id_, addr, length) for id_ in ids}
+
+        # Request the next values right away
+        if self._is_comm_success(sync_reader.txPacket()):
+            self._pending_read = ((addr, length, tuple(ids)), time.perf_counter())
+
+        age = time.perf_counter() - requested_at
+
+        ids_values = self._decode_sign(data_name, ids_values)
+
+        if normalize and data_name in self.normalized_data:
+            ids_values = self._normalize(ids_values)
+
+        return {self._id_to_name(id_): value for id_, value in ids_values.items()}, age
+
+    def _collect_pending_read(self) -> None:
+        """Receives the response to the request sent by :pymeth:`async_read`, if any, to free the bus."""
+        if self._pending_read is None:
+            return
+        key, _ = self._pending_read
+        self._pending_read = None
+        comm = self._sync_read_plans[key].rxPacket()
+        if not self._is_comm_success(comm):
+            logger.debug(f"Failed to receive pipelined sync read: {self.packet_handler.getTxRxResult(comm)}")
 
     def sync_write(
         self,
@@ -1186,6 +1502,45 @@ class MotorsBus(abc.ABC):
         err_msg = f"Failed to sync write '{data_name}' with {ids_values=} after {num_retry + 1} tries."
         self._sync_write(addr, length, ids_values, num_retry=num_retry, raise_on_error=True, err_msg=err_msg)
 
+    def sync_write_array(
+        self,
+        data_name: str,
+        values: np.ndarray,
+        motors: str | list[str] | None = None,
+        *,
+        normalize: bool = True,
+        num_retry: int = 0,
+    ) -> None:
+        """Same as :pymeth:`sync_write` but takes the values as an array ordered like `motors` (or like
+        `self.motors` if `motors` is `None`), unnormalized for all motors at once with the compiled calibration.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
+
+        names = self._get_motors_list(motors)
+        values = np.asarray(values)
+        if values.shape != (len(names),):
+            raise ValueError(f"Expected {len(names)} values for motors {names}, got shape {values.shape}.")
+
+        ids = [self.motors[motor].id for motor in names]
+        models = [self.motors[motor].model for motor in names]
+        if self._has_different_ctrl_tables:
+            assert_same_address(self.model_ctrl_table, models, data_name)
+
+        addr, length = get_address(self.model_ctrl_table, models[0], data_name)
+
+        if normalize and data_name in self.normalized_data:
+            values = self._unnormalize_array(self._get_motors_indices(motors), values.astype(np.float64))
+
+        ids_values = self._encode_sign(
+            data_name, dict(zip(ids, values.astype(np.int64).tolist(), strict=True))
+        )
+
+        err_msg = f"Failed to sync write '{data_name}' with {ids_values=} after {num_retry + 1} tries."
+        self._sync_write(addr, length, ids_values, num_retry=num_retry, raise_on_error=True, err_msg=err_msg)
+
     def _sync_write(
         self,
         addr: int,
@@ -1195,6 +1550,7 @@ class MotorsBus(abc.ABC):
         raise_on_error: bool = True,
         err_msg: str = "",
     ) -> int:
+        self._collect_pending_read()
         self._setup_sync_writer(ids_values, addr, length)
         for n_try in range(1 + num_retry):
             comm = self.sync_writer.txPacket()
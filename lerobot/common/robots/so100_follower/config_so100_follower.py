@@ -17,6 +17,7 @@ from dataclasses import dataclass, field
 from lerobot.common.cameras import CameraConfig
 
 from ..config import RobotConfig
+from ..utils import MOTOR_OBSERVATION_SUFFIXES
 
 
 @RobotConfig.register_subclass("so100_follower")
@@ -37,3 +38,20 @@ class SO100FollowerConfig(RobotConfig):
 
     # Set to `True` for backward compatibility with previous policies/dataset
     use_degrees: bool = False
+
+    # Registers of the motors read along with their positions, in the same bus transaction, and added to the
+    # observations (e.g. ["Present_Velocity", "Present_Load"]). See `MOTOR_OBSERVATION_SUFFIXES` for their names.
+    extra_motor_observations: list[str] = field(default_factory=list)
+
+    # Rate at which a background thread reads the state of the motors and writes their goal positions, decoupled
+    # from the rate of the control loop. `None` performs this I/O in `get_observation` and `send_action` instead.
+    bus_worker_fps: int | None = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        for data_name in self.extra_motor_observations:
+            if data_name not in MOTOR_OBSERVATION_SUFFIXES or data_name == "Present_Position":
+                raise ValueError(
+                    f"'{data_name}' can't be added to the observations. Choose among "
+                    f"{[name for name in MOTOR_OBSERVATION_SUFFIXES if name != 'Present_Position']}."
+                )
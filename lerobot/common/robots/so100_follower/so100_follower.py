@@ -21,14 +21,14 @@ from typing import Any
 
 from lerobot.common.cameras.utils import make_cameras_from_configs
 from lerobot.common.errors import DeviceAlreadyConnectedError, DeviceNotConnectedError
-from lerobot.common.motors import Motor, MotorCalibration, MotorNormMode
+from lerobot.common.motors import Motor, MotorCalibration, MotorNormMode, MotorsBusWorker
 from lerobot.common.motors.feetech import (
     FeetechMotorsBus,
     OperatingMode,
 )
 
 from ..robot import Robot
-from ..utils import ensure_safe_goal_position
+from ..utils import MOTOR_OBSERVATION_SUFFIXES, ensure_safe_goal_position
 from .config_so100_follower import SO100FollowerConfig
 
 logger = logging.getLogger(__name__)
@@ -59,6 +59,7 @@ class SO100Follower(Robot):
             calibration=self.calibration,
         )
         self.cameras = make_cameras_from_configs(config.cameras)
+        self.bus_worker: MotorsBusWorker | None = None
 
     @property
     def _motors_ft(self) -> dict[str, type]:
@@ -70,9 +71,21 @@ class SO100Follower(Robot):
             cam: (self.config.cameras[cam].height, self.config.cameras[cam].width, 3) for cam in self.cameras
         }
 
+    @property
+    def _motor_observations(self) -> list[str]:
+        return ["Present_Position", *self.config.extra_motor_observations]
+
+    @property
+    def _state_ft(self) -> dict[str, type]:
+        return {
+            f"{motor}.{MOTOR_OBSERVATION_SUFFIXES[data_name]}": float
+            for data_name in self._motor_observations
+            for motor in self.bus.motors
+        }
+
     @cached_property
     def observation_features(self) -> dict[str, type | tuple]:
-        return {**self._motors_ft, **self._cameras_ft}
+        return {**self._state_ft, **self._cameras_ft}
 
     @cached_property
     def action_features(self) -> dict[str, type]:
@@ -98,6 +111,11 @@ class SO100Follower(Robot):
             cam.connect()
 
         self.configure()
+        if self.config.bus_worker_fps is not None:
+            self.bus_worker = MotorsBusWorker(
+                self.bus, self._motor_observations, fps=self.config.bus_worker_fps
+            )
+            self.bus_worker.start()
         logger.info(f"{self} connected.")
 
     @property
@@ -158,10 +176,19 @@ class SO100Follower(Robot):
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
-        # Read arm position
+        # Read arm state
         start = time.perf_counter()
-        obs_dict = self.bus.sync_read("Present_Position")
-        obs_dict = {f"{motor}.pos": val for motor, val in obs_dict.items()}
+        if self.bus_worker is not None:
+            state = self.bus_worker.read().values
+        elif self.config.extra_motor_observations:
+            state = self.bus.sync_read_many(self._motor_observations)
+        else:
+            state = {"Present_Position": self.bus.sync_read("Present_Position")}
+        obs_dict = {
+            f"{motor}.{MOTOR_OBSERVATION_SUFFIXES[data_name]}": val
+            for data_name, values in state.items()
+            for motor, val in values.items()
+        }
         dt_ms = (time.perf_counter() - start) * 1e3
         logger.debug(f"{self} read state: {dt_ms:.1f}ms")
 
@@ -195,18 +222,27 @@ class SO100Follower(Robot):
         # Cap goal position when too far away from present position.
         # /!\ Slower fps expected due to reading from the follower.
         if self.config.max_relative_target is not None:
-            present_pos = self.bus.sync_read("Present_Position")
+            if self.bus_worker is not None:
+                present_pos = self.bus_worker.read().values["Present_Position"]
+            else:
+                present_pos = self.bus.sync_read("Present_Position")
             goal_present_pos = {key: (g_pos, present_pos[key]) for key, g_pos in goal_pos.items()}
             goal_pos = ensure_safe_goal_position(goal_present_pos, self.config.max_relative_target)
 
         # Send goal position to the arm
-        self.bus.sync_write("Goal_Position", goal_pos)
+        if self.bus_worker is not None:
+            self.bus_worker.write(goal_pos)
+        else:
+            self.bus.sync_write("Goal_Position", goal_pos)
         return {f"{motor}.pos": val for motor, val in goal_pos.items()}
 
     def disconnect(self):
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
+        if self.bus_worker is not None:
+            self.bus_worker.stop()
+            self.bus_worker = None
         self.bus.disconnect(self.config.disable_torque_on_disconnect)
         for cam in self.cameras.values():
             cam.disconnect()
@@ -19,6 +19,19 @@ from lerobot.common.robots import RobotConfig
 
 from .robot import Robot
 
+# Suffixes of the observation features of the motor registers that follower arms can read along with the
+# positions, e.g. "elbow_flex.vel" for the "Present_Velocity" of the "elbow_flex" motor.
+MOTOR_OBSERVATION_SUFFIXES = {
+    "Present_Position": "pos",
+    "Present_Velocity": "vel",
+    "Present_Load": "load",
+    "Present_Current": "current",
+    "Present_PWM": "pwm",
+    "Present_Voltage": "voltage",
+    "Present_Input_Voltage": "voltage",
+    "Present_Temperature": "temperature",
+}
+
 
 def make_robot_from_config(config: RobotConfig) -> Robot:
     if config.type == "koch_follower":
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers for distributed data parallel training.
+
+A run is distributed when it is launched with `torchrun`, which sets the `WORLD_SIZE`, `RANK` and `LOCAL_RANK`
+environment variables of each process, e.g.:
+```
+torchrun --nproc-per-node 4 lerobot/scripts/train.py --policy.type act --dataset.repo_id lerobot/aloha_sim_insertion_human
+```
+Every helper falls back to a single process behavior when the default process group isn't initialized.
+"""
+
+import os
+from contextlib import contextmanager
+
+import torch
+import torch.distributed as dist
+
+
+def is_distributed() -> bool:
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank() -> int:
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size() -> int:
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process() -> bool:
+    return get_rank() == 0
+
+
+def init_distributed(device: torch.device) -> torch.device:
+    """Initializes the default process group if the script was launched by `torchrun` with more than one
+    process. Returns the device of the current process: on CUDA, each process uses the GPU of its local rank.
+    """
+    if int(os.environ.get("WORLD_SIZE", 1)) <= 1 or is_distributed():
+        return device
+    if device.type == "cuda":
+        local_rank = int(os.environ["LOCAL_RANK"])
+        torch.cuda.set_device(local_rank)
+        device = torch.device("cuda", local_rank)
+    dist.init_process_group(backend="nccl" if device.type == "cuda" else "gloo")
+    return device
+
+
+def destroy_distributed() -> None:
+    if is_distributed():
+        dist.destroy_process_group()
+
+
+def barrier() -> None:
+    if is_distributed():
+        dist.barrier()
+
+
+@contextmanager
+def main_process_first():
+    """Lets the main process run the enclosed code before the others, e.g. to download a dataset or build its
+    caches once instead of having all processes write them concurrently.
+    """
+    if not is_main_process():
+        barrier()
+    yield
+    if is_main_process():
+        barrier()
+
+
+def all_reduce_sum(tensor: torch.Tensor) -> torch.Tensor:
+    """Sums `tensor` over all processes. The reduction happens on the current GPU with the NCCL backend, which
+    doesn't support CPU tensors, and the result is returned on the device of `tensor`.
+    """
+    if not is_distributed():
+        return tensor
+    if dist.get_backend() == "nccl":
+        reduced = tensor.to(torch.device("cuda", torch.cuda.current_device()))
+    else:
+        reduced = tensor.clone()
+    dist.all_reduce(reduced, op=dist.ReduceOp.SUM)
+    return reduced.to(tensor.device)
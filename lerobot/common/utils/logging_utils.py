@@ -15,6 +15,9 @@
 # limitations under the License.
 from typing import Any
 
+import torch
+
+from lerobot.common.utils.distributed_utils import all_reduce_sum
 from lerobot.common.utils.utils import format_big_number
 
 
@@ -157,6 +160,17 @@ class MetricsTracker:
             **{k: m.avg if use_avg else m.val for k, m in self.metrics.items()},
         }
 
+    def all_reduce(self) -> None:
+        """
+        Averages the metrics over all the processes of a distributed run, e.g. before logging them from the main
+        process. This is a collective operation which must be called by every process.
+        """
+        meters = list(self.metrics.values())
+        totals = all_reduce_sum(torch.tensor([[m.sum, m.count] for m in meters], dtype=torch.float64))
+        for m, (total, count) in zip(meters, totals.tolist(), strict=True):
+            m.sum, m.count = total, count
+            m.avg = total / count if count > 0 else 0.0
+
     def reset_averages(self) -> None:
         """Resets average meters."""
         for m in self.metrics.values():
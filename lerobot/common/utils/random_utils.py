@@ -126,8 +126,10 @@ def deserialize_rng_state(rng_state_dict: dict[str, torch.Tensor]) -> None:
     deserialize_torch_rng_state(torch_rng_state_dict)
 
 
-def save_rng_state(save_dir: Path) -> None:
-    rng_state_dict = serialize_rng_state()
+def save_rng_state(save_dir: Path, rng_state_dict: dict[str, torch.Tensor] | None = None) -> None:
+    """Saves the given rng state, as returned by `serialize_rng_state()`, or else the current one."""
+    if rng_state_dict is None:
+        rng_state_dict = serialize_rng_state()
     flat_rng_state_dict = flatten_dict(rng_state_dict)
     save_file(flat_rng_state_dict, save_dir / RNG_STATE)
 
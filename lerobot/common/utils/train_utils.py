@@ -13,9 +13,17 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import copy
 import logging
+import os
+import shutil
+import threading
 from pathlib import Path
+from typing import Any, Callable
 
+import torch
+from huggingface_hub.constants import SAFETENSORS_SINGLE_FILE
+from safetensors.torch import save_model as save_model_as_safetensor
 from termcolor import colored
 from torch.optim import Optimizer
 from torch.optim.lr_scheduler import LRScheduler
@@ -31,7 +39,8 @@ from lerobot.common.datasets.utils import load_json, write_json
 from lerobot.common.optim.optimizers import load_optimizer_state, save_optimizer_state
 from lerobot.common.optim.schedulers import load_scheduler_state, save_scheduler_state
 from lerobot.common.policies.pretrained import PreTrainedPolicy
-from lerobot.common.utils.random_utils import load_rng_state, save_rng_state
+from lerobot.common.utils.distributed_utils import is_main_process
+from lerobot.common.utils.random_utils import load_rng_state, save_rng_state, serialize_rng_state
 from lerobot.configs.train import TrainPipelineConfig
 
 
@@ -60,11 +69,16 @@ def load_training_step(save_dir: Path) -> int:
 
 
 def update_last_checkpoint(checkpoint_dir: Path) -> Path:
+    if not is_main_process():
+        return
     last_checkpoint_dir = checkpoint_dir.parent / LAST_CHECKPOINT_LINK
-    if last_checkpoint_dir.is_symlink():
-        last_checkpoint_dir.unlink()
     relative_target = checkpoint_dir.relative_to(checkpoint_dir.parent)
-    last_checkpoint_dir.symlink_to(relative_target)
+    # The link is swapped atomically so that it always points to a checkpoint, even if interrupted.
+    tmp_link = last_checkpoint_dir.with_name(f"{LAST_CHECKPOINT_LINK}.tmp")
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    tmp_link.symlink_to(relative_target)
+    os.replace(tmp_link, last_checkpoint_dir)
 
 
 def save_checkpoint(
@@ -95,7 +109,11 @@ def save_checkpoint(
         policy (PreTrainedPolicy): The policy to save.
         optimizer (Optimizer | None, optional): The optimizer to save the state from. Defaults to None.
         scheduler (LRScheduler | None, optional): The scheduler to save the state from. Defaults to None.
+
+    In a distributed run, the processes hold the same states and only the main process writes them.
     """
+    if not is_main_process():
+        return
     pretrained_dir = checkpoint_dir / PRETRAINED_MODEL_DIR
     policy.save_pretrained(pretrained_dir)
     cfg.save_pretrained(pretrained_dir)
@@ -107,6 +125,7 @@ def save_training_state(
     train_step: int,
     optimizer: Optimizer | None = None,
     scheduler: LRScheduler | None = None,
+    rng_state: dict[str, torch.Tensor] | None = None,
 ) -> None:
     """
     Saves the training step, optimizer state, scheduler state, and rng state.
@@ -118,11 +137,13 @@ def save_training_state(
             Defaults to None.
         scheduler (LRScheduler | None, optional): The scheduler from which to save the state_dict.
             Defaults to None.
+        rng_state (dict[str, torch.Tensor] | None, optional): The rng state to save, as returned by
+            `serialize_rng_state()`. Defaults to the current rng state.
     """
     save_dir = checkpoint_dir / TRAINING_STATE_DIR
     save_dir.mkdir(parents=True, exist_ok=True)
     save_training_step(train_step, save_dir)
-    save_rng_state(save_dir)
+    save_rng_state(save_dir, rng_state)
     if optimizer is not None:
         save_optimizer_state(optimizer, save_dir)
     if scheduler is not None:
@@ -159,3 +180,179 @@ def load_training_state(
         scheduler = load_scheduler_state(scheduler, training_state_dir)
 
     return step, optimizer, scheduler
+
+
+class _StateDictSnapshot:
+    """Stands for a policy, optimizer or scheduler whose state dict was copied, when saving it with the
+    functions which only call its `state_dict()` method.
+    """
+
+    def __init__(self, state_dict: dict):
+        self._state_dict = state_dict
+
+    def state_dict(self) -> dict:
+        # Callers may remove entries from the returned dict
+        return dict(self._state_dict)
+
+
+def _copy_to_cpu(obj: Any, memo: dict) -> Any:
+    """Copies the tensors nested in `obj` to the CPU, through pinned memory for CUDA tensors. The copies are
+    asynchronous and must be waited for with `torch.cuda.synchronize()`. Tensors which are views of a same
+    storage with the same layout, like tied weights, are copied once and keep on sharing their copy.
+    """
+    if isinstance(obj, torch.Tensor):
+        key = (obj.untyped_storage().data_ptr(), obj.storage_offset(), obj.shape, obj.stride(), obj.dtype)
+        if key not in memo:
+            if obj.is_cuda:
+                tensor_copy = torch.empty(obj.shape, dtype=obj.dtype, pin_memory=True)
+                memo[key] = tensor_copy.copy_(obj.detach(), non_blocking=True)
+            else:
+                memo[key] = obj.detach().to("cpu", copy=True)
+        return memo[key]
+    if isinstance(obj, dict):
+        return {k: _copy_to_cpu(v, memo) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_copy_to_cpu(v, memo) for v in obj)
+    return copy.deepcopy(obj)
+
+
+def _fsync(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories can't be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AsyncCheckpointer:
+    """
+    Saves the same checkpoints as `save_checkpoint` without blocking the training loop for the duration of the
+    write.
+
+    `save` copies the states of the policy, optimizer, scheduler and rng to the CPU and returns, the checkpoint
+    being written by a background thread into a temporary directory. Once its files are flushed to disk, the
+    directory is renamed to its final name, the 'last' link is pointed to it, and the oldest checkpoints are
+    removed to keep the last `keep_last_n` ones (all of them if 0). A checkpoint is only saved once the
+    previous one has been written. With `asynchronous=False`, `save` writes the checkpoint before returning.
+
+    In a distributed run, only the main process saves checkpoints.
+    """
+
+    def __init__(self, keep_last_n: int = 0, asynchronous: bool = True):
+        self.keep_last_n = keep_last_n
+        self.asynchronous = asynchronous
+        self._thread: threading.Thread | None = None
+        self._error: Exception | None = None
+
+    def save(
+        self,
+        checkpoint_dir: Path,
+        step: int,
+        cfg: TrainPipelineConfig,
+        policy: PreTrainedPolicy,
+        optimizer: Optimizer,
+        scheduler: LRScheduler | None = None,
+        on_saved: Callable[[Path], None] | None = None,
+    ) -> None:
+        """Saves a checkpoint into `checkpoint_dir`, then calls `on_saved` with it (e.g. to upload it)."""
+        if not is_main_process():
+            return
+        self.wait()
+
+        memo = {}
+        policy_state = _copy_to_cpu(policy.state_dict(), memo)
+        optimizer_state = _copy_to_cpu(optimizer.state_dict(), memo)
+        scheduler_state = _copy_to_cpu(scheduler.state_dict(), memo) if scheduler is not None else None
+        if any(tensor.is_pinned() for tensor in memo.values()):
+            torch.cuda.synchronize()
+        args = (
+            Path(checkpoint_dir),
+            step,
+            copy.deepcopy(cfg),
+            copy.deepcopy(policy.config),
+            _StateDictSnapshot(policy_state),
+            _StateDictSnapshot(optimizer_state),
+            _StateDictSnapshot(scheduler_state) if scheduler_state is not None else None,
+            serialize_rng_state(),
+            on_saved,
+        )
+        if self.asynchronous:
+            self._thread = threading.Thread(target=self._write_in_background, args=args, daemon=True)
+            self._thread.start()
+        else:
+            self._write(*args)
+
+    def wait(self) -> None:
+        """Waits for the checkpoint being written, and raises the error which interrupted it if any."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    close = wait
+
+    def _write_in_background(self, *args) -> None:
+        try:
+            self._write(*args)
+        except Exception as e:
+            logging.error(f"Error writing checkpoint {args[0]}: {e}")
+            self._error = e
+
+    def _write(
+        self,
+        checkpoint_dir: Path,
+        step: int,
+        cfg: TrainPipelineConfig,
+        policy_config: Any,
+        policy_state: _StateDictSnapshot,
+        optimizer_state: _StateDictSnapshot,
+        scheduler_state: _StateDictSnapshot | None,
+        rng_state: dict[str, torch.Tensor],
+        on_saved: Callable[[Path], None] | None,
+    ) -> None:
+        tmp_dir = checkpoint_dir.with_name(f"{checkpoint_dir.name}.tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        pretrained_dir = tmp_dir / PRETRAINED_MODEL_DIR
+        pretrained_dir.mkdir(parents=True)
+        # Same files as `PreTrainedPolicy.save_pretrained`
+        policy_config._save_pretrained(pretrained_dir)
+        save_model_as_safetensor(policy_state, str(pretrained_dir / SAFETENSORS_SINGLE_FILE))
+        cfg.save_pretrained(pretrained_dir)
+        save_training_state(tmp_dir, step, optimizer_state, scheduler_state, rng_state=rng_state)
+
+        for path in tmp_dir.rglob("*"):
+            _fsync(path)
+        _fsync(tmp_dir)
+        if checkpoint_dir.exists():
+            shutil.rmtree(checkpoint_dir)
+        os.replace(tmp_dir, checkpoint_dir)
+        _fsync(checkpoint_dir.parent)
+
+        update_last_checkpoint(checkpoint_dir)
+        self._remove_old_checkpoints(checkpoint_dir)
+        logging.info(f"Checkpoint saved in {checkpoint_dir}")
+        if on_saved is not None:
+            on_saved(checkpoint_dir)
+
+    def _remove_old_checkpoints(self, checkpoint_dir: Path) -> None:
+        if self.keep_last_n < 1:
+            return
+        step_dirs = sorted(
+            (
+                path
+                for path in checkpoint_dir.parent.iterdir()
+                if path.name.isdigit() and path.is_dir() and not path.is_symlink()
+            ),
+            key=lambda path: int(path.name),
+        )
+        for path in step_dirs[: -self.keep_last_n]:
+            # The checkpoint just saved is kept, even when resuming from an older one
+            if path != checkpoint_dir:
+                shutil.rmtree(path)
@@ -19,6 +19,7 @@ from dataclasses import dataclass, field
 from lerobot.common import (
     policies,  # noqa: F401
 )
+from lerobot.common.datasets.frame_cache import FrameCacheConfig
 from lerobot.common.datasets.transforms import ImageTransformsConfig
 from lerobot.common.datasets.video_utils import get_safe_default_codec
 
@@ -37,6 +38,29 @@ class DatasetConfig:
     revision: str | None = None
     use_imagenet_stats: bool = True
     video_backend: str = field(default_factory=get_safe_default_codec)
+    # Read numerical features from a memory-mapped cache built once under `root/cache/memmap` rather than
+    # converting them from the hf_dataset for every sample.
+    use_memmap_cache: bool = False
+    # Download missing episode files with this many concurrent downloads, with checksum verification and resume,
+    # instead of a single snapshot_download. Videos can be downloaded in the background while training starts.
+    download_workers: int = 0
+    download_videos_in_background: bool = False
+    frame_cache: FrameCacheConfig = field(default_factory=FrameCacheConfig)
+    # Load camera frames as uint8 and only convert them to float32 once on the training device, which divides
+    # by 4 the amount of image data going through the DataLoader queues, pinned memory and host-to-device copy.
+    return_uint8: bool = False
+    # Shuffle windows of `sampler_window_size` contiguous frames rather than individual frames, mixing
+    # `sampler_num_open_windows` windows at a time. Neighbouring video frames then land in the same batch and
+    # are decoded together, at the cost of less independent samples within a batch.
+    sampler_window_size: int = 1
+    sampler_num_open_windows: int = 1
+    # Stream the episodes while training instead of downloading the whole dataset first, keeping at most
+    # `streaming_cache_bytes` of episode files on the local disk of each node (see `StreamingLeRobotDataset`).
+    # Frames are then shuffled within a buffer of `streaming_shuffle_buffer_size` frames rather than across the
+    # whole dataset.
+    streaming: bool = False
+    streaming_cache_bytes: int = 10 * 1024**3
+    streaming_shuffle_buffer_size: int = 1000
 
 
 @dataclass
@@ -51,6 +51,9 @@ class TrainPipelineConfig(HubMixin):
     seed: int | None = 1000
     # Number of workers for the dataloader.
     num_workers: int = 4
+    # Number of batches prepared in advance (fetched from the dataloader and moved to the device) by a
+    # background thread while the policy is being updated.
+    prefetch_batches: int = 2
     batch_size: int = 8
     steps: int = 100_000
     eval_freq: int = 20_000
@@ -58,6 +61,13 @@ class TrainPipelineConfig(HubMixin):
     save_checkpoint: bool = True
     # Checkpoint is saved every `save_freq` training iterations and after the last training step.
     save_freq: int = 20_000
+    # Checkpoints are written in the background while training carries on.
+    async_checkpointing: bool = True
+    # Number of most recent checkpoints to keep on disk, or 0 to keep all of them.
+    keep_last_checkpoints: int = 0
+    # When training on several processes with `torchrun`, set to true for policies which don't use all their
+    # parameters in every forward pass. This adds some overhead to the gradients synchronization.
+    ddp_find_unused_parameters: bool = False
     use_policy_training_preset: bool = True
     optimizer: OptimizerConfig | None = None
     scheduler: LRSchedulerConfig | None = None
@@ -117,6 +117,15 @@ class DatasetRecordConfig:
     # Too many threads might cause unstable teleoperation fps due to main thread being blocked.
     # Not enough threads might cause low camera fps.
     num_image_writer_threads_per_camera: int = 4
+    # Encode the camera frames into videos while recording instead of writing them as PNG images to be encoded
+    # at the end of each episode. Only applies when `video` is true.
+    streaming_encoding: bool = False
+    # Number of subprocesses writing, computing the stats and encoding the videos of the recorded episodes in
+    # the background, so that the next episode can be recorded right away. Set to 0 to save episodes
+    # synchronously.
+    num_finalize_processes: int = 0
+    # Maximum number of episodes being saved in the background before saving an episode blocks.
+    max_pending_episodes: int = 2
 
     def __post_init__(self):
         if self.single_task is None:
@@ -254,6 +263,7 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
                 num_threads=cfg.dataset.num_image_writer_threads_per_camera * len(robot.cameras),
             )
         sanity_check_dataset_robot_compatibility(dataset, robot, cfg.dataset.fps, dataset_features)
+        dataset.streaming_encoding = cfg.dataset.streaming_encoding and len(dataset.meta.video_keys) > 0
     else:
         # Create empty dataset or load existing saved episodes
         sanity_check_dataset_name(cfg.dataset.repo_id, cfg.policy)
@@ -266,6 +276,13 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             use_videos=cfg.dataset.video,
             image_writer_processes=cfg.dataset.num_image_writer_processes,
             image_writer_threads=cfg.dataset.num_image_writer_threads_per_camera * len(robot.cameras),
+            streaming_encoding=cfg.dataset.streaming_encoding,
+        )
+
+    if cfg.dataset.num_finalize_processes > 0:
+        dataset.start_episode_finalizer(
+            num_processes=cfg.dataset.num_finalize_processes,
+            max_pending_episodes=cfg.dataset.max_pending_episodes,
         )
 
     # Load pretrained policy
@@ -278,7 +295,7 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
     listener, events = init_keyboard_listener()
 
     for recorded_episodes in range(cfg.dataset.num_episodes):
-        log_say(f"Recording episode {dataset.num_episodes}", cfg.play_sounds)
+        log_say(f"Recording episode {dataset.num_recorded_episodes}", cfg.play_sounds)
         record_loop(
             robot=robot,
             events=events,
@@ -315,6 +332,8 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             continue
 
         dataset.save_episode()
+        if dataset.image_writer is not None and dataset.image_writer.stats()["stalls"] > 0:
+            logging.info(f"Image writer stats: {dataset.image_writer.stats()}")
 
         if events["stop_recording"]:
             break
@@ -327,6 +346,8 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
     if not is_headless() and listener is not None:
         listener.stop()
 
+    dataset.stop_episode_finalizer()
+
     if cfg.dataset.push_to_hub:
         dataset.push_to_hub(tags=cfg.dataset.tags, private=cfg.dataset.private)
 
@@ -22,24 +22,35 @@ from typing import Any
 import torch
 from termcolor import colored
 from torch.amp import GradScaler
+from torch.nn.parallel import DistributedDataParallel
 from torch.optim import Optimizer
+from torch.utils.data.distributed import DistributedSampler
 
 from lerobot.common.datasets.factory import make_dataset
+from lerobot.common.datasets.prefetcher import BatchPrefetcher
 from lerobot.common.datasets.sampler import EpisodeAwareSampler
-from lerobot.common.datasets.utils import cycle
+from lerobot.common.datasets.streaming_dataset import StreamingLeRobotDataset
+from lerobot.common.datasets.utils import cycle, uint8_images_to_float
 from lerobot.common.envs.factory import make_env
 from lerobot.common.optim.factory import make_optimizer_and_scheduler
 from lerobot.common.policies.factory import make_policy
 from lerobot.common.policies.pretrained import PreTrainedPolicy
 from lerobot.common.policies.utils import get_device_from_parameters
+from lerobot.common.utils.distributed_utils import (
+    destroy_distributed,
+    get_world_size,
+    init_distributed,
+    is_distributed,
+    is_main_process,
+    main_process_first,
+)
 from lerobot.common.utils.logging_utils import AverageMeter, MetricsTracker
 from lerobot.common.utils.random_utils import set_seed
 from lerobot.common.utils.train_utils import (
+    AsyncCheckpointer,
     get_step_checkpoint_dir,
     get_step_identifier,
     load_training_state,
-    save_checkpoint,
-    update_last_checkpoint,
 )
 from lerobot.common.utils.utils import (
     format_big_number,
@@ -55,7 +66,7 @@ from lerobot.scripts.eval import eval_policy
 
 def update_policy(
     train_metrics: MetricsTracker,
-    policy: PreTrainedPolicy,
+    policy: PreTrainedPolicy | DistributedDataParallel,
     batch: Any,
     optimizer: Optimizer,
     grad_clip_norm: float,
@@ -66,6 +77,9 @@ def update_policy(
 ) -> tuple[MetricsTracker, dict]:
     start_time = time.perf_counter()
     device = get_device_from_parameters(policy)
+    # In a distributed run, the forward pass of the DistributedDataParallel wrapper makes the backward pass
+    # average the gradients over all processes.
+    module = policy.module if isinstance(policy, DistributedDataParallel) else policy
     policy.train()
     with torch.autocast(device_type=device.type) if use_amp else nullcontext():
         loss, output_dict = policy.forward(batch)
@@ -94,9 +108,9 @@ def update_policy(
     if lr_scheduler is not None:
         lr_scheduler.step()
 
-    if has_method(policy, "update"):
+    if has_method(module, "update"):
         # To possibly update an internal buffer (for instance an Exponential Moving Average like in TDMPC).
-        policy.update()
+        module.update()
 
     train_metrics.loss = loss.item()
     train_metrics.grad_norm = grad_norm.item()
@@ -108,9 +122,19 @@ def update_policy(
 @parser.wrap()
 def train(cfg: TrainPipelineConfig):
     cfg.validate()
+
+    # Check device is available
+    device = get_safe_torch_device(cfg.policy.device, log=True)
+    # When launched with `torchrun`, each process trains on its own shard of the data with its own device.
+    device = init_distributed(device)
+    world_size = get_world_size()
+    if not is_main_process():
+        logging.getLogger().setLevel(logging.WARNING)
+    if world_size > 1 and cfg.seed is None:
+        raise ValueError("A `seed` is needed for all processes to shuffle the dataset in the same order.")
     logging.info(pformat(cfg.to_dict()))
 
-    if cfg.wandb.enable and cfg.wandb.project:
+    if cfg.wandb.enable and cfg.wandb.project and is_main_process():
         wandb_logger = WandBLogger(cfg)
     else:
         wandb_logger = None
@@ -119,19 +143,18 @@ def train(cfg: TrainPipelineConfig):
     if cfg.seed is not None:
         set_seed(cfg.seed)
 
-    # Check device is available
-    device = get_safe_torch_device(cfg.policy.device, log=True)
     torch.backends.cudnn.benchmark = True
     torch.backends.cuda.matmul.allow_tf32 = True
 
     logging.info("Creating dataset")
-    dataset = make_dataset(cfg)
+    with main_process_first():
+        dataset = make_dataset(cfg)
 
     # Create environment used for evaluating checkpoints during training on simulation data.
     # On real-world data, no need to create an environment as evaluations are done outside train.py,
     # using the eval.py instead, with gym_dora environment and dora-rs.
     eval_env = None
-    if cfg.eval_freq > 0 and cfg.env is not None:
+    if cfg.eval_freq > 0 and cfg.env is not None and is_main_process():
         logging.info("Creating env")
         eval_env = make_env(cfg.env, n_envs=cfg.eval.batch_size, use_async_envs=cfg.eval.use_async_envs)
 
@@ -150,6 +173,15 @@ def train(cfg: TrainPipelineConfig):
     if cfg.resume:
         step, optimizer, lr_scheduler = load_training_state(cfg.checkpoint_path, optimizer, lr_scheduler)
 
+    # `policy` is kept unwrapped for evaluation and checkpointing, the wrapper only being used for training.
+    train_policy = policy
+    if is_distributed():
+        train_policy = DistributedDataParallel(
+            policy,
+            device_ids=[device.index] if device.type == "cuda" else None,
+            find_unused_parameters=cfg.ddp_find_unused_parameters,
+        )
+
     num_learnable_params = sum(p.numel() for p in policy.parameters() if p.requires_grad)
     num_total_params = sum(p.numel() for p in policy.parameters())
 
@@ -157,19 +189,31 @@ def train(cfg: TrainPipelineConfig):
     if cfg.env is not None:
         logging.info(f"{cfg.env.task=}")
     logging.info(f"{cfg.steps=} ({format_big_number(cfg.steps)})")
+    if world_size > 1:
+        logging.info(f"{world_size=} processes, {cfg.batch_size=} per process")
     logging.info(f"{dataset.num_frames=} ({format_big_number(dataset.num_frames)})")
     logging.info(f"{dataset.num_episodes=}")
     logging.info(f"{num_learnable_params=} ({format_big_number(num_learnable_params)})")
     logging.info(f"{num_total_params=} ({format_big_number(num_total_params)})")
 
     # create dataloader for offline training
-    if hasattr(cfg.policy, "drop_n_last_frames"):
+    if isinstance(dataset, StreamingLeRobotDataset):
+        # Episodes are sharded and shuffled by the dataset itself
+        shuffle = False
+        sampler = None
+    elif hasattr(cfg.policy, "drop_n_last_frames") or cfg.dataset.sampler_window_size > 1:
         shuffle = False
         sampler = EpisodeAwareSampler(
             dataset.episode_data_index,
-            drop_n_last_frames=cfg.policy.drop_n_last_frames,
+            drop_n_last_frames=getattr(cfg.policy, "drop_n_last_frames", 0),
             shuffle=True,
+            window_size=cfg.dataset.sampler_window_size,
+            num_open_windows=cfg.dataset.sampler_num_open_windows,
+            seed=cfg.seed,
         )
+    elif world_size > 1:
+        shuffle = False
+        sampler = DistributedSampler(dataset, shuffle=True, seed=cfg.seed)
     else:
         shuffle = True
         sampler = None
@@ -180,10 +224,24 @@ def train(cfg: TrainPipelineConfig):
         batch_size=cfg.batch_size,
         shuffle=shuffle,
         sampler=sampler,
-        pin_memory=device.type != "cpu",
+        # Batches are staged into pinned buffers by the prefetcher
+        pin_memory=False,
         drop_last=False,
     )
-    dl_iter = cycle(dataloader)
+    dl_iter = cycle(
+        dataloader, set_epoch=getattr(sampler, "set_epoch", None) or getattr(dataset, "set_epoch", None)
+    )
+    # Batches are fetched, moved to the device and converted in the background while the policy is updated.
+    dl_iter = BatchPrefetcher(
+        dl_iter,
+        device,
+        num_prefetch=cfg.prefetch_batches,
+        transform=(
+            (lambda batch: uint8_images_to_float(batch, dataset.meta.camera_keys))
+            if cfg.dataset.return_uint8
+            else None
+        ),
+    )
 
     policy.train()
 
@@ -195,23 +253,29 @@ def train(cfg: TrainPipelineConfig):
         "dataloading_s": AverageMeter("data_s", ":.3f"),
     }
 
+    # Samples are counted over all processes
     train_tracker = MetricsTracker(
-        cfg.batch_size, dataset.num_frames, dataset.num_episodes, train_metrics, initial_step=step
+        cfg.batch_size * world_size,
+        dataset.num_frames,
+        dataset.num_episodes,
+        train_metrics,
+        initial_step=step,
+    )
+
+    checkpointer = AsyncCheckpointer(
+        keep_last_n=cfg.keep_last_checkpoints, asynchronous=cfg.async_checkpointing
     )
 
     logging.info("Start offline training on a fixed dataset")
     for _ in range(step, cfg.steps):
+        # Only the time spent waiting for the prefetcher, i.e. when data loading can't keep up with training
         start_time = time.perf_counter()
         batch = next(dl_iter)
         train_tracker.dataloading_s = time.perf_counter() - start_time
 
-        for key in batch:
-            if isinstance(batch[key], torch.Tensor):
-                batch[key] = batch[key].to(device, non_blocking=True)
-
         train_tracker, output_dict = update_policy(
             train_tracker,
-            policy,
+            train_policy,
             batch,
             optimizer,
             cfg.optimizer.grad_clip_norm,
@@ -229,23 +293,33 @@ def train(cfg: TrainPipelineConfig):
         is_eval_step = cfg.eval_freq > 0 and step % cfg.eval_freq == 0
 
         if is_log_step:
+            train_tracker.all_reduce()
             logging.info(train_tracker)
+            if getattr(dataset, "frame_cache", None) is not None:
+                logging.info(dataset.frame_cache)
             if wandb_logger:
                 wandb_log_dict = train_tracker.to_dict()
                 if output_dict:
                     wandb_log_dict.update(output_dict)
+                if getattr(dataset, "frame_cache", None) is not None:
+                    wandb_log_dict["frame_cache_hit_rate"] = dataset.frame_cache.stats()["hit_rate"]
                 wandb_logger.log_dict(wandb_log_dict, step)
             train_tracker.reset_averages()
 
         if cfg.save_checkpoint and is_saving_step:
             logging.info(f"Checkpoint policy after step {step}")
             checkpoint_dir = get_step_checkpoint_dir(cfg.output_dir, cfg.steps, step)
-            save_checkpoint(checkpoint_dir, step, cfg, policy, optimizer, lr_scheduler)
-            update_last_checkpoint(checkpoint_dir)
-            if wandb_logger:
-                wandb_logger.log_policy(checkpoint_dir)
+            checkpointer.save(
+                checkpoint_dir,
+                step,
+                cfg,
+                policy,
+                optimizer,
+                lr_scheduler,
+                on_saved=wandb_logger.log_policy if wandb_logger else None,
+            )
 
-        if cfg.env and is_eval_step:
+        if cfg.env and is_eval_step and is_main_process():
             step_id = get_step_identifier(step, cfg.steps)
             logging.info(f"Eval policy at step {step}")
             with (
@@ -267,7 +341,11 @@ def train(cfg: TrainPipelineConfig):
                 "eval_s": AverageMeter("eval_s", ":.3f"),
             }
             eval_tracker = MetricsTracker(
-                cfg.batch_size, dataset.num_frames, dataset.num_episodes, eval_metrics, initial_step=step
+                cfg.batch_size * world_size,
+                dataset.num_frames,
+                dataset.num_episodes,
+                eval_metrics,
+                initial_step=step,
             )
             eval_tracker.eval_s = eval_info["aggregated"].pop("eval_s")
             eval_tracker.avg_sum_reward = eval_info["aggregated"].pop("avg_sum_reward")
@@ -278,8 +356,11 @@ def train(cfg: TrainPipelineConfig):
                 wandb_logger.log_dict(wandb_log_dict, step, mode="eval")
                 wandb_logger.log_video(eval_info["video_paths"][0], step, mode="eval")
 
+    dl_iter.close()
+    checkpointer.close()
     if eval_env:
         eval_env.close()
+    destroy_distributed()
     logging.info("End of training")
 
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Check the consistency of the metadata of a LeRobotDataset with its data files.
+
+Saving an episode only updates the metadata incrementally (see `LeRobotDatasetMetadata.save_episode`), without
+rescanning the whole dataset. This script performs the full checks offline, e.g. after a recording session:
+- the totals in `meta/info.json` match the episodes in `meta/episodes.jsonl`,
+- there is exactly one parquet file and one video per camera for each episode,
+- frame indices and episode indices are contiguous, and timestamps are in sync with the fps,
+- the dataset stats are the aggregation of the episodes stats,
+- optionally (`--check-episodes-stats 1`), the episodes stats of non-visual features match their data.
+
+Example:
+```
+python lerobot/scripts/verify_dataset.py \
+    --repo-id lerobot/pusht \
+    --root data/lerobot/pusht
+```
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from lerobot.common.datasets.compute_stats import aggregate_stats, compute_episode_stats
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.common.datasets.utils import check_timestamps_sync, get_episode_data_index
+from lerobot.common.utils.utils import init_logging
+
+
+def _stats_mismatches(stats: dict, reference_stats: dict, name: str, rtol: float, atol: float) -> list[str]:
+    errors = []
+    for key in sorted(set(stats) | set(reference_stats)):
+        if key not in stats or key not in reference_stats:
+            errors.append(f"{name}: feature '{key}' is missing from one of the stats.")
+            continue
+        for stat, val in reference_stats[key].items():
+            if not np.allclose(stats[key][stat], val, rtol=rtol, atol=atol):
+                errors.append(f"{name}: '{stat}' of feature '{key}' doesn't match.")
+    return errors
+
+
+def verify_dataset(
+    dataset: LeRobotDataset,
+    check_episodes_stats: bool = False,
+    rtol: float = 1e-5,
+    atol: float = 1e-6,
+) -> list[str]:
+    """Returns the list of inconsistencies found in the dataset, which is expected to hold all its episodes."""
+    if dataset.episodes is not None:
+        raise ValueError("The dataset must be loaded with all its episodes to be verified.")
+    meta = dataset.meta
+    errors = []
+
+    episode_indices = sorted(meta.episodes)
+    if episode_indices != list(range(meta.total_episodes)):
+        errors.append(f"Episodes are not numbered from 0 to {meta.total_episodes - 1}.")
+    if sorted(meta.episodes_stats) != episode_indices:
+        errors.append("Episodes stats don't match the episodes.")
+    total_frames = sum(ep["length"] for ep in meta.episodes.values())
+    if total_frames != meta.total_frames:
+        errors.append(f"Total frames is {meta.total_frames} but the episodes hold {total_frames} frames.")
+    if len(dataset.hf_dataset) != meta.total_frames:
+        errors.append(f"Total frames is {meta.total_frames} but the data has {len(dataset.hf_dataset)} rows.")
+    if meta.info["total_videos"] != meta.total_episodes * len(meta.video_keys):
+        errors.append(f"Total videos is {meta.info['total_videos']}, expected one per episode and video key.")
+
+    expected_files = set(dataset.get_episodes_file_paths())
+    found_files = {
+        str(path.relative_to(dataset.root))
+        for pattern in ["data/**/*.parquet", "videos/**/*.mp4"]
+        for path in dataset.root.glob(pattern)
+    }
+    for fpath in sorted(expected_files - found_files):
+        errors.append(f"Missing file: {fpath}")
+    for fpath in sorted(found_files - expected_files):
+        errors.append(f"Unexpected file: {fpath}")
+
+    expected_data_index = get_episode_data_index(meta.episodes)
+    if any(
+        not np.array_equal(dataset.episode_data_index[k].numpy(), expected_data_index[k].numpy())
+        for k in ["from", "to"]
+    ):
+        errors.append("Episode data index doesn't match the episodes lengths.")
+
+    hf_dataset = dataset.hf_dataset.with_format("numpy")
+    if not np.array_equal(hf_dataset["index"], np.arange(len(hf_dataset))):
+        errors.append("Frame indices are not contiguous.")
+    lengths = [meta.episodes[ep_idx]["length"] for ep_idx in episode_indices]
+    if not np.array_equal(hf_dataset["episode_index"], np.repeat(episode_indices, lengths)):
+        errors.append("Episode indices of the frames don't match the episodes lengths.")
+    elif not check_timestamps_sync(
+        hf_dataset["timestamp"],
+        hf_dataset["episode_index"],
+        {k: t.numpy() for k, t in expected_data_index.items()},
+        meta.fps,
+        dataset.tolerance_s,
+        raise_value_error=False,
+    ):
+        errors.append("Timestamps are not in sync with the fps.")
+
+    if len(meta.episodes_stats) > 0:
+        aggregated_stats = aggregate_stats(list(meta.episodes_stats.values()))
+        errors += _stats_mismatches(meta.stats, aggregated_stats, "Dataset stats", rtol, atol)
+
+    if check_episodes_stats and not errors:
+        features = {
+            key: ft for key, ft in meta.features.items() if ft["dtype"] not in ["image", "video", "string"]
+        }
+        for ep_idx, start, end in zip(
+            episode_indices, expected_data_index["from"], expected_data_index["to"], strict=True
+        ):
+            ep_data = {key: hf_dataset[key][start:end] for key in features}
+            ep_stats = compute_episode_stats(ep_data, features)
+            reference_stats = {key: meta.episodes_stats[ep_idx][key] for key in ep_stats}
+            errors += _stats_mismatches(ep_stats, reference_stats, f"Episode {ep_idx} stats", rtol, atol)
+
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--repo-id",
+        type=str,
+        required=True,
+        help="Name of hugging face repository containing a LeRobotDataset dataset (e.g. `lerobot/pusht`).",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=None,
+        help="Root directory for the dataset stored locally (e.g. `--root data`). By default, the dataset will be loaded from hugging face cache folder, or downloaded from the hub if available.",
+    )
+    parser.add_argument(
+        "--check-episodes-stats",
+        type=int,
+        default=0,
+        help="Recompute the episodes stats of non-visual features from the data and compare them.",
+    )
+    args = parser.parse_args()
+
+    init_logging()
+    dataset = LeRobotDataset(args.repo_id, root=args.root)
+    errors = verify_dataset(dataset, check_episodes_stats=bool(args.check_episodes_stats))
+    for error in errors:
+        logging.error(error)
+    if errors:
+        raise SystemExit(f"Found {len(errors)} inconsistencies in {args.repo_id}.")
+    logging.info(f"{args.repo_id} is consistent.")
+
+
+if __name__ == "__main__":
+    main()
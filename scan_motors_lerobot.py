@@ -1,52 +1,54 @@
 #!/usr/bin/env python3
 
+import argparse
+import logging
+
+from lerobot.common.motors.discovery import discover_ports
 from lerobot.common.motors.feetech import FeetechMotorsBus
-from lerobot.common.motors import Motor, MotorNormMode
-
-# 더미 모터 설정 (스캔용)
-dummy_motors = {
-    "dummy": Motor(1, "sts3215", MotorNormMode.RANGE_M100_100)
-}
-
-# 포트 설정
-#PORT = '/dev/ttyACM_follower'
-PORT = '/dev/ttyACM_leader'
-
-# FeetechMotorsBus 생성
-bus = FeetechMotorsBus(
-    port=PORT,
-    motors=dummy_motors,
-    protocol_version=0  # SO101은 protocol 0 사용
+
+# 포트 설정 (각 포트는 별도의 스레드에서 동시에 스캔)
+PORTS = ["/dev/ttyACM_follower", "/dev/ttyACM_leader"]
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--ports", type=str, nargs="*", default=PORTS, help="Ports to scan.")
+parser.add_argument(
+    "--baudrates",
+    type=int,
+    nargs="*",
+    default=None,
+    help="Baud-rates to probe, by default all of them (the default and cached ones first).",
+)
+parser.add_argument(
+    "--ids",
+    type=int,
+    nargs="*",
+    default=None,
+    help="IDs to ping one by one with protocol 1 (ignored with protocol 0, which pings all IDs at once).",
+)
+parser.add_argument("--all-baudrates", action="store_true", help="Keep scanning after motors are found.")
+parser.add_argument("--no-cache", action="store_true", help="Ignore the layouts found by previous scans.")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO)
+
+# 모든 포트를 동시에 스캔 (SO101은 protocol 0 사용)
+ports_layouts = discover_ports(
+    FeetechMotorsBus,
+    args.ports,
+    baudrates=args.baudrates,
+    stop_at_first=not args.all_baudrates,
+    ids=args.ids,
+    use_cache=not args.no_cache,
+    protocol_version=0,
 )
 
-try:
-    # 포트 연결
-    bus.port_handler.openPort()
-    print(f"Successfully opened port: {PORT}")
-    
-    # 가능한 baudrate들로 스캔
-    baudrates = [
-        #38400, 57600, 115200, 
-        1000000]
-    
-    for baudrate in baudrates:
-        print(f"\nScanning at {baudrate} bps...")
-        bus.set_baudrate(baudrate)
-        
-        # broadcast ping 시도
-        try:
-            found_motors = bus.broadcast_ping()
-            if found_motors:
-                print(f"Found motors at {baudrate} bps:")
-                for motor_id, model_number in found_motors.items():
-                    print(f"  ID: {motor_id}, Model: {model_number}")
-        except Exception as e:
-            print(f"  Error during scan: {e}")
-    
-    # 포트 닫기
-    bus.port_handler.closePort()
-    
-except Exception as e:
-    print(f"Error: {e}")
+for port, layouts in ports_layouts.items():
+    print(f"\n{port}:")
+    if not layouts:
+        print("  No motors found")
+    for layout in layouts:
+        print(f"  Found motors at {layout.baudrate} bps:")
+        for motor_id, model_number in layout.ids_models.items():
+            print(f"    ID: {motor_id}, Model: {model_number}")
 
 print("\nScan complete!")
@@ -15,10 +15,14 @@
 # limitations under the License.
 import json
 import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from functools import partial
 from itertools import chain
 from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -29,16 +33,20 @@ from safetensors.torch import load_file
 
 import lerobot
 from lerobot.common.datasets.factory import make_dataset
+from lerobot.common.datasets.frame_cache import FrameCacheConfig
 from lerobot.common.datasets.image_writer import image_array_to_pil_image
+from lerobot.common.datasets.index_cache import DatasetIndex
 from lerobot.common.datasets.lerobot_dataset import (
     LeRobotDataset,
     MultiLeRobotDataset,
 )
+from lerobot.common.datasets.memmap_cache import MemmapCache
 from lerobot.common.datasets.utils import (
     create_branch,
     flatten_dict,
     unflatten_dict,
 )
+from lerobot.common.datasets.video_utils import encode_video_frames
 from lerobot.common.envs.factory import make_env_config
 from lerobot.common.policies.factory import make_policy_config
 from lerobot.configs.default import DatasetConfig
@@ -99,6 +107,239 @@ def test_dataset_initialization(tmp_path, lerobot_dataset_factory):
     assert dataset.num_frames == len(dataset)
 
 
+def test_getitems_matches_getitem(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    delta_timestamps = {
+        "action": [i / info["fps"] for i in range(-2, 10)],
+        "state": [-1 / info["fps"], 0.0],
+    }
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info, delta_timestamps=delta_timestamps)
+
+    # Cover the first and last frames of each episode so that padding is exercised.
+    indices = [0, 1, 49, 50, 99, 100, 148, 149, 10, 10]
+    indices = [idx for idx in indices if idx < len(dataset)]
+    batch_items = dataset.__getitems__(indices)
+
+    assert len(batch_items) == len(indices)
+    for idx, batch_item in zip(indices, batch_items, strict=True):
+        item = dataset[idx]
+        assert item.keys() == batch_item.keys()
+        for key, val in item.items():
+            if isinstance(val, torch.Tensor):
+                assert val.dtype == batch_item[key].dtype, key
+                assert torch.equal(val, batch_item[key]), key
+            else:
+                assert val == batch_item[key], key
+
+
+def test_memmap_cache(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    delta_timestamps = {"action": [i / info["fps"] for i in range(-2, 5)]}
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info, delta_timestamps=delta_timestamps)
+    cached_dataset = lerobot_dataset_factory(
+        root=tmp_path / "test", info=info, delta_timestamps=delta_timestamps, use_memmap_cache=True
+    )
+
+    assert cached_dataset.memmap_cache is not None
+    assert set(cached_dataset.memmap_cache.keys) == set(dataset.hf_features)
+    assert (cached_dataset.memmap_cache.cache_dir / "info.json").is_file()
+
+    indices = [0, 1, 49, 50, 148, 149]
+    for idx, batch_item in zip(indices, cached_dataset.__getitems__(indices), strict=True):
+        item = dataset[idx]
+        for cached_item in [cached_dataset[idx], batch_item]:
+            assert item.keys() == cached_item.keys()
+            for key, val in item.items():
+                if isinstance(val, torch.Tensor):
+                    assert val.dtype == cached_item[key].dtype, key
+                    assert torch.equal(val, cached_item[key]), key
+                else:
+                    assert val == cached_item[key], key
+
+    # The cache is rebuilt when the data files are rewritten, even with the same number of frames, but not
+    # when only the parameters of the timestamps check change
+    cache = cached_dataset.memmap_cache
+    with patch.object(MemmapCache, "build", wraps=MemmapCache.build) as mock_build:
+        lerobot_dataset_factory(root=tmp_path / "test", info=info, use_memmap_cache=True, tolerance_s=1e-3)
+        mock_build.assert_not_called()
+        data_file = tmp_path / "test" / dataset.meta.get_data_file_path(0)
+        os.utime(data_file, ns=(data_file.stat().st_atime_ns, data_file.stat().st_mtime_ns + 1))
+        cached_dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info, use_memmap_cache=True)
+        mock_build.assert_called_once()
+    assert cached_dataset.memmap_cache.fingerprint != cache.fingerprint
+
+
+def test_memmap_cache_concurrent_builds(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info, use_memmap_cache=True)
+    cache = dataset.memmap_cache
+    action = cache.arrays["action"]
+    action_file = cache.cache_dir / "action.npy"
+    inode = action_file.stat().st_ino
+
+    # Processes which started building the same cache keep the one already in place, which may be mapped
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        caches = list(
+            executor.map(
+                lambda _: MemmapCache.build(dataset.hf_dataset, cache.cache_dir, cache.fingerprint), range(8)
+            )
+        )
+    assert all(built.fingerprint == cache.fingerprint for built in caches)
+    assert action_file.stat().st_ino == inode
+
+    # A stale cache is replaced, and the arrays already mapped stay readable
+    expected = np.array(action)
+    assert MemmapCache.build(dataset.hf_dataset, cache.cache_dir, "other").fingerprint == "other"
+    assert action_file.stat().st_ino != inode
+    np.testing.assert_array_equal(action, expected)
+    assert [path.name for path in cache.cache_dir.parent.iterdir()] == [cache.cache_dir.name]
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_frame_cache(tmp_path, empty_lerobot_dataset_factory, on_disk):
+    features = {
+        "observation.image": {
+            "dtype": "video",
+            "shape": (32, 32, 3),
+            "names": ["height", "width", "channels"],
+        }
+    }
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    for i in range(10):
+        dataset.add_frame(
+            {"observation.image": np.full((32, 32, 3), 20 * i, dtype=np.uint8)}, task="Dummy task"
+        )
+    # libsvtav1 leaves worker threads behind which slow down the other tests
+    with patch(
+        "lerobot.common.datasets.lerobot_dataset.encode_video_frames",
+        side_effect=partial(encode_video_frames, vcodec="h264"),
+    ):
+        dataset.save_episode()
+
+    cached_dataset = LeRobotDataset(
+        DUMMY_REPO_ID,
+        root=tmp_path / "test",
+        video_backend="pyav",
+        frame_cache_config=FrameCacheConfig(enable=True, on_disk=on_disk),
+    )
+    items = [cached_dataset[idx] for idx in [2, 5]]
+    assert cached_dataset.frame_cache.stats()["misses"] == 2
+
+    # Frames read again are served from the cache without being decoded
+    with patch.object(cached_dataset, "_decode_video_runs") as mock_decode:
+        cached_items = [cached_dataset[idx] for idx in [2, 5]]
+    mock_decode.assert_not_called()
+    assert cached_dataset.frame_cache.stats()["hits"] == 2
+    for item, cached_item in zip(items, cached_items, strict=True):
+        torch.testing.assert_close(item["observation.image"], cached_item["observation.image"])
+
+    # The file storing the frames doesn't outlive the cache
+    storage_path = cached_dataset.frame_cache.storage_path
+    assert (storage_path is not None) == on_disk
+    cached_dataset.frame_cache.close()
+    assert storage_path is None or not storage_path.exists()
+
+
+def test_dataset_index(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info)
+    index = dataset.dataset_index
+    assert (index.cache_dir / "info.json").is_file()
+    np.testing.assert_array_equal(index.timestamps, torch.stack(dataset.hf_dataset["timestamp"]).numpy())
+
+    # Timestamps are not checked again when loading the same data
+    with patch.object(DatasetIndex, "build") as mock_build:
+        dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info)
+    mock_build.assert_not_called()
+    assert dataset.dataset_index.fingerprint == index.fingerprint
+
+    # Nor when loading a subset of the episodes, which has its own index
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info, episodes=[1])
+    assert dataset.dataset_index.cache_dir != index.cache_dir
+
+    # But they are when the data files change
+    data_file = tmp_path / "test" / dataset.meta.get_data_file_path(0)
+    os.utime(data_file, ns=(data_file.stat().st_atime_ns, data_file.stat().st_mtime_ns + 1))
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info)
+    assert dataset.dataset_index.fingerprint != index.fingerprint
+
+
+def test_dataset_index_concurrent_builds(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info)
+    index = dataset.dataset_index
+    timestamps_file = index.cache_dir / "timestamp.npy"
+    inode = timestamps_file.stat().st_ino
+
+    def build(fingerprint):
+        return DatasetIndex.build(
+            dataset.hf_dataset,
+            dataset.episode_data_index,
+            dataset.fps,
+            dataset.tolerance_s,
+            fingerprint,
+            index.cache_dir,
+        )
+
+    # Processes which started building the same index keep the one already in place
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        indices = list(executor.map(build, [index.fingerprint] * 8))
+    assert all(built.fingerprint == index.fingerprint for built in indices)
+    assert timestamps_file.stat().st_ino == inode
+
+    # A stale index is replaced
+    assert build("other").fingerprint == "other"
+    assert timestamps_file.stat().st_ino != inode
+    assert [path.name for path in index.cache_dir.parent.iterdir()] == [index.cache_dir.name]
+
+
+def test_dataset_index_read_only(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=3, total_frames=150, total_tasks=1, camera_features={}, use_videos=False
+    )
+    with patch(
+        "lerobot.common.datasets.index_cache.make_cache_tmp_dir",
+        side_effect=PermissionError("Read-only file system"),
+    ):
+        dataset = lerobot_dataset_factory(root=tmp_path / "test", info=info)
+    assert dataset.dataset_index is None
+    assert dataset[149]["index"].item() == 149
+
+
+def test_multidataset_routing(tmp_path, lerobot_dataset_factory, info_factory):
+    repo_ids = ["dummy/repo_a", "dummy/repo_b", "dummy/repo_c"]
+    for repo_id, total_frames in zip(repo_ids, [150, 30, 90], strict=True):
+        info = info_factory(
+            total_episodes=3, total_frames=total_frames, total_tasks=1, camera_features={}, use_videos=False
+        )
+        lerobot_dataset_factory(root=tmp_path / repo_id, repo_id=repo_id, info=info)
+
+    dataset = MultiLeRobotDataset(repo_ids, root=tmp_path)
+    assert dataset.num_frames == 270
+    assert dataset.dataset_sizes == [150, 30, 90]
+
+    indices = [0, 149, 150, 179, 180, 269, 160]
+    expected = [(0, 0), (0, 149), (1, 0), (1, 29), (2, 0), (2, 89), (1, 10)]
+    for idx, batch_item, (dataset_idx, frame_idx) in zip(
+        indices, dataset.__getitems__(indices), expected, strict=True
+    ):
+        for item in [dataset[idx], batch_item]:
+            assert item["dataset_index"].item() == dataset_idx
+            assert item["index"].item() == frame_idx
+    with pytest.raises(IndexError):
+        dataset[270]
+
+
 def test_add_frame_missing_feature(tmp_path, empty_lerobot_dataset_factory):
     features = {"state": {"dtype": "float32", "shape": (1,), "names": None}}
     dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
@@ -306,6 +547,32 @@ def test_add_frame_image_pil(image_dataset):
     assert dataset[0]["image"].shape == torch.Size(DUMMY_CHW)
 
 
+def test_save_episode_async(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "state": {"dtype": "float32", "shape": (2,), "names": None},
+        "image": {"dtype": "image", "shape": DUMMY_CHW, "names": ["channels", "height", "width"]},
+    }
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    dataset.start_episode_finalizer(num_processes=1, max_pending_episodes=2)
+    for ep_idx in range(3):
+        assert dataset.episode_buffer["episode_index"] == ep_idx
+        for _ in range(ep_idx + 2):
+            dataset.add_frame(
+                {"state": torch.randn(2), "image": np.random.rand(*DUMMY_CHW)}, task="Dummy task"
+            )
+        dataset.save_episode()
+    assert dataset.num_recorded_episodes == 3
+
+    dataset.stop_episode_finalizer()
+    assert dataset.num_episodes == 3
+    assert list(dataset.meta.episodes) == [0, 1, 2]
+    assert len(dataset) == 2 + 3 + 4
+    assert dataset.hf_dataset["index"] == list(range(9))
+    assert dataset[8]["episode_index"] == 2
+    assert dataset[8]["image"].shape == torch.Size(DUMMY_CHW)
+    assert not any((dataset.root / "images").rglob("*.png"))
+
+
 def test_image_array_to_pil_image_wrong_range_float_0_255():
     image = np.random.rand(*DUMMY_HWC) * 255
     with pytest.raises(ValueError):
@@ -0,0 +1,192 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from lerobot.common.datasets.download import (
+    FAILED_SUFFIX,
+    INCOMPLETE_SUFFIX,
+    REQUESTS_DIR,
+    FileInfo,
+    HttpSource,
+    LocalDirSource,
+    ParallelDownloader,
+)
+
+FILES = [f"data/chunk-000/episode_{i:06d}.parquet" for i in range(5)]
+
+
+class RecordingSource(LocalDirSource):
+    def __init__(self, source_dir, wrong_checksums=False):
+        super().__init__(source_dir)
+        self.opened = []
+        self.wrong_checksums = wrong_checksums
+        self.first_open = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_files_info(self, paths):
+        infos = super().get_files_info(paths)
+        if self.wrong_checksums:
+            infos = {path: FileInfo(info.size, "0" * 64) for path, info in infos.items()}
+        return infos
+
+    def open(self, path, offset=0):
+        self.opened.append((path, offset))
+        self.first_open.set()
+        self.release.wait()
+        return super().open(path, offset)
+
+    def __getstate__(self):
+        # Pickled copies of the downloader never open files
+        return {"source_dir": self.source_dir, "wrong_checksums": self.wrong_checksums}
+
+
+class WrongChecksumSource(LocalDirSource):
+    def get_files_info(self, paths):
+        return {path: FileInfo(3000, "0" * 64) for path in paths}
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source_dir = tmp_path / "source"
+    rng = np.random.default_rng(0)
+    for path in FILES:
+        (source_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (source_dir / path).write_bytes(rng.bytes(3000))
+    return source_dir
+
+
+def assert_downloaded(root, source_dir, paths):
+    for path in paths:
+        assert (root / path).read_bytes() == (source_dir / path).read_bytes()
+        assert not (root / (path + INCOMPLETE_SUFFIX)).exists()
+
+
+def test_download(tmp_path, source_dir):
+    downloader = ParallelDownloader(LocalDirSource(source_dir), tmp_path / "root", num_workers=3)
+    downloader.download(FILES)
+    downloader.close()
+    assert_downloaded(tmp_path / "root", source_dir, FILES)
+    assert set(downloader.status.values()) == {"done"}
+
+
+@pytest.mark.parametrize("corrupted", [False, True])
+def test_resume(tmp_path, source_dir, corrupted):
+    root = tmp_path / "root"
+    partial_path = root / (FILES[0] + INCOMPLETE_SUFFIX)
+    partial_path.parent.mkdir(parents=True)
+    content = (source_dir / FILES[0]).read_bytes()[:1000]
+    partial_path.write_bytes(content[::-1] if corrupted else content)
+
+    source = RecordingSource(source_dir)
+    downloader = ParallelDownloader(source, root, num_workers=1)
+    downloader.download(FILES[:1])
+    downloader.close()
+
+    assert_downloaded(root, source_dir, FILES[:1])
+    # A corrupted partial file is detected by the checksum and downloaded again from scratch
+    assert source.opened == ([(FILES[0], 1000), (FILES[0], 0)] if corrupted else [(FILES[0], 1000)])
+
+
+def test_checksum_mismatch(tmp_path, source_dir):
+    downloader = ParallelDownloader(
+        RecordingSource(source_dir, wrong_checksums=True), tmp_path, num_workers=1
+    )
+    with pytest.raises(OSError):
+        downloader.download(FILES[:1])
+    downloader.close()
+    assert downloader.status[FILES[0]] == "failed"
+    assert not (tmp_path / FILES[0]).exists()
+
+
+def test_prioritize(tmp_path, source_dir):
+    source = RecordingSource(source_dir)
+    source.release.clear()
+    downloader = ParallelDownloader(source, tmp_path, num_workers=1)
+    downloader.submit(FILES)
+    source.first_open.wait()
+    downloader.prioritize([FILES[4], FILES[3]])
+    source.release.set()
+    downloader.wait()
+    downloader.close()
+    assert [path for path, _ in source.opened] == [FILES[0], FILES[4], FILES[3], FILES[1], FILES[2]]
+
+
+def test_pickled_downloader_prioritizes(tmp_path, source_dir):
+    source = RecordingSource(source_dir)
+    source.release.clear()
+    downloader = ParallelDownloader(source, tmp_path, num_workers=1)
+    downloader.submit(FILES)
+    source.first_open.wait()
+    # A DataLoader worker asks for the last episode while the first one is downloading
+    unpickled = pickle.loads(pickle.dumps(downloader))
+    unpickled.prioritize([FILES[4]])
+    source.release.set()
+    unpickled.wait([FILES[4]], timeout=5)
+    downloader.wait()
+    downloader.close()
+    assert [path for path, _ in source.opened] == [FILES[0], FILES[4], FILES[1], FILES[2], FILES[3]]
+    assert not any((tmp_path / REQUESTS_DIR).iterdir())
+
+
+def test_http_source_without_range_support(tmp_path, source_dir):
+    handler = partial(SimpleHTTPRequestHandler, directory=str(source_dir))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        root = tmp_path / "root"
+        partial_path = root / (FILES[0] + INCOMPLETE_SUFFIX)
+        partial_path.parent.mkdir(parents=True)
+        partial_path.write_bytes((source_dir / FILES[0]).read_bytes()[:1000])
+
+        source = HttpSource(f"http://127.0.0.1:{server.server_port}")
+        downloader = ParallelDownloader(source, root, num_workers=2)
+        downloader.download(FILES)
+        downloader.close()
+        assert_downloaded(root, source_dir, FILES)
+    finally:
+        server.shutdown()
+
+
+def test_pickled_downloader_waits_on_disk(tmp_path, source_dir):
+    downloader = ParallelDownloader(LocalDirSource(source_dir), tmp_path, num_workers=1)
+    downloader.download(FILES[:1])
+    unpickled = pickle.loads(pickle.dumps(downloader))
+    unpickled.wait(FILES[:1])
+    with pytest.raises(TimeoutError):
+        unpickled.wait(FILES[1:2], timeout=0.2)
+    downloader.close()
+
+
+def test_pickled_downloader_learns_about_failures(tmp_path, source_dir):
+    downloader = ParallelDownloader(WrongChecksumSource(source_dir), tmp_path, num_workers=1)
+    downloader.submit(FILES[:1])
+    unpickled = pickle.loads(pickle.dumps(downloader))
+    with pytest.raises(OSError, match="main process"):
+        unpickled.wait(FILES[:1], timeout=5)
+    downloader.close()
+
+    # The marker is cleared when the file is downloaded again
+    downloader = ParallelDownloader(LocalDirSource(source_dir), tmp_path, num_workers=1)
+    downloader.download(FILES[:1])
+    downloader.close()
+    assert not (tmp_path / (FILES[0] + FAILED_SUFFIX)).exists()
+    assert_downloaded(tmp_path, source_dir, FILES[:1])
@@ -0,0 +1,130 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from lerobot.common.datasets.frame_cache import FrameCacheConfig, VideoFrameCache
+
+SHAPE = (3, 4, 5)
+FRAME_BYTES = int(np.prod(SHAPE))
+
+
+def _frames(positions):
+    return torch.stack([torch.full(SHAPE, p, dtype=torch.uint8) for p in positions])
+
+
+def make_cache(capacity: int, **kwargs) -> VideoFrameCache:
+    return VideoFrameCache(
+        episode_lengths={0: 6, 1: 4},
+        frame_shapes={"cam": SHAPE},
+        max_bytes=capacity * FRAME_BYTES,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_get_put(tmp_path, on_disk):
+    cache = make_cache(capacity=10, storage_dir=tmp_path if on_disk else None)
+    positions = cache.positions(1, np.array([0, 2]))
+    np.testing.assert_array_equal(positions, [6, 8])
+
+    _, hits = cache.get("cam", positions)
+    assert not hits.any()
+    cache.put("cam", positions, _frames(positions))
+    frames, hits = cache.get("cam", np.array([8, 3, 6]))
+
+    np.testing.assert_array_equal(hits, [True, False, True])
+    torch.testing.assert_close(frames[hits], _frames([8, 6]))
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["cached_frames"] == 2
+
+
+def test_lru_eviction():
+    cache = make_cache(capacity=2, policy="lru")
+    cache.put("cam", np.array([0, 1]), _frames([0, 1]))
+    cache.get("cam", np.array([0]))
+    cache.put("cam", np.array([2]), _frames([2]))
+
+    _, hits = cache.get("cam", np.array([0, 1, 2]))
+    np.testing.assert_array_equal(hits, [True, False, True])
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lfu_eviction():
+    cache = make_cache(capacity=2, policy="lfu")
+    cache.put("cam", np.array([0, 1]), _frames([0, 1]))
+    for _ in range(3):
+        cache.get("cam", np.array([1]))
+    cache.get("cam", np.array([0]))
+    cache.put("cam", np.array([2]), _frames([2]))
+
+    _, hits = cache.get("cam", np.array([0, 1, 2]))
+    np.testing.assert_array_equal(hits, [False, True, True])
+
+
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_heap_tracks_lowest_score(policy):
+    cache = make_cache(capacity=4, policy=policy)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        positions = np.unique(rng.integers(0, 10, size=3))
+        if rng.random() < 0.5:
+            cache.put("cam", positions, _frames(positions))
+        else:
+            cache.get("cam", positions)
+
+        score, heap = cache.slot_score["cam"], cache.heap["cam"]
+        assert score[heap[0]] == score.min()
+        assert all(score[heap[i]] >= score[heap[(i - 1) // 2]] for i in range(1, len(heap)))
+        assert torch.equal(cache.heap_index["cam"][heap], torch.arange(len(heap)))
+
+
+def test_close_removes_file(tmp_path):
+    cache = make_cache(capacity=2, storage_dir=tmp_path)
+    storage_path = cache.storage_path
+    assert storage_path.is_file()
+
+    # Copies in other processes (e.g. DataLoader workers) don't remove the file
+    cache._owner_pid = -1
+    cache.close()
+    assert storage_path.is_file()
+
+    cache._owner_pid = os.getpid()
+    del cache
+    assert not storage_path.exists()
+
+
+def test_resize():
+    cache = VideoFrameCache({0: 2}, {"cam": (3, 8, 8)}, max_bytes=10_000, resize=[4, 4])
+    frames = cache.to_uint8(torch.rand(2, 3, 8, 8))
+    assert frames.shape == (2, 3, 4, 4)
+    assert frames.dtype == torch.uint8
+    cache.put("cam", np.array([0, 1]), frames)
+
+
+def test_budget_too_small():
+    cache = make_cache(capacity=0)
+    cache.put("cam", np.array([0]), _frames([0]))
+    _, hits = cache.get("cam", np.array([0]))
+    assert not hits.any()
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        FrameCacheConfig(policy="fifo")
@@ -57,6 +57,15 @@ def test_init_multiprocessing():
         writer.stop()
 
 
+def test_init_shared_memory():
+    writer = AsyncImageWriter(num_processes=2, num_threads=2, image_shapes=[DUMMY_HWC, (4, 4, 3)])
+    try:
+        assert writer.ring.num_slots == 8
+        assert writer.ring.slot_nbytes == int(np.prod(DUMMY_HWC))
+    finally:
+        writer.stop()
+
+
 def test_zero_threads():
     with pytest.raises(ValueError):
         AsyncImageWriter(num_processes=0, num_threads=0)
@@ -177,6 +186,46 @@ def test_save_image_numpy_multiprocessing(tmp_path, img_array_factory):
         writer.stop()
 
 
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_save_image_shared_memory(tmp_path, img_array_factory, dtype):
+    writer = AsyncImageWriter(num_processes=1, num_threads=2, image_shapes=[DUMMY_HWC], num_slots=2)
+    try:
+        image_arrays = [img_array_factory(*DUMMY_HWC[:2], dtype=dtype) for _ in range(10)]
+        fpaths = [tmp_path / f"frame_{i:06d}.png" for i in range(len(image_arrays))]
+        for image_array, fpath in zip(image_arrays, fpaths, strict=True):
+            writer.save_image(image_array, fpath)
+        writer.wait_until_done()
+        for image_array, fpath in zip(image_arrays, fpaths, strict=True):
+            expected = image_array if dtype == np.uint8 else (image_array * 255).astype(np.uint8)
+            assert np.array_equal(np.array(Image.open(fpath)), expected)
+
+        stats = writer.stats()
+        if dtype == np.uint8:
+            assert stats["shared"] == 10
+            assert stats["pickled"] == 0
+        else:
+            # Too large for the slots
+            assert stats["shared"] == 0
+            assert stats["pickled"] == 10
+    finally:
+        writer.stop()
+
+
+def test_shared_memory_backpressure(tmp_path, img_array_factory):
+    writer = AsyncImageWriter(num_processes=1, num_threads=1, image_shapes=[DUMMY_HWC], num_slots=1)
+    try:
+        with patch("lerobot.common.datasets.image_writer.logging.warning") as mock_warning:
+            for i in range(5):
+                writer.save_image(img_array_factory(*DUMMY_HWC[:2]), tmp_path / f"frame_{i:06d}.png")
+            writer.wait_until_done()
+        stats = writer.stats()
+        assert stats["stalls"] > 0
+        assert stats["stall_time_s"] >= stats["max_stall_s"] > 0
+        mock_warning.assert_called_once()
+    finally:
+        writer.stop()
+
+
 def test_save_image_torch(tmp_path, img_tensor_factory):
     writer = AsyncImageWriter()
     try:
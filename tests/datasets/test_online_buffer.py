@@ -13,14 +13,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.d
+import multiprocessing
+import pickle
 from copy import deepcopy
+from pathlib import Path
 from uuid import uuid4
 
 import numpy as np
 import pytest
 import torch
 
-from lerobot.common.datasets.online_buffer import OnlineBuffer, compute_sampler_weights
+from lerobot.common.datasets.online_buffer import OnlineBuffer, SumTree, compute_sampler_weights
+from lerobot.common.datasets.sampler import PrioritizedSampler
 
 # Some constants for OnlineBuffer tests.
 data_key = "data"
@@ -30,7 +34,9 @@ fps = 10
 
 
 def make_new_buffer(
-    write_dir: str | None = None, delta_timestamps: dict[str, list[float]] | None = None
+    write_dir: str | None = None,
+    delta_timestamps: dict[str, list[float]] | None = None,
+    prioritized: bool = False,
 ) -> tuple[OnlineBuffer, str]:
     if write_dir is None:
         write_dir = f"/tmp/online_buffer_{uuid4().hex}"
@@ -40,6 +46,7 @@ def make_new_buffer(
         buffer_capacity=buffer_capacity,
         fps=fps,
         delta_timestamps=delta_timestamps,
+        prioritized=prioritized,
     )
     return buffer, write_dir
 
@@ -208,6 +215,166 @@ def test_delta_timestamps_outside_tolerance_outside_episode_range():
     )
 
 
+def reference_delta_item(buffer: OnlineBuffer, idx: int) -> dict[str, np.ndarray]:
+    """Brute-force lookup of the closest frames across the whole buffer."""
+    data = buffer._data
+    item = {k: v[idx] for k, v in data.items() if not k.startswith("_")}
+    episode_data_indices = np.where(
+        (data[OnlineBuffer.EPISODE_INDEX_KEY] == item[OnlineBuffer.EPISODE_INDEX_KEY])
+        & data[OnlineBuffer.OCCUPANCY_MASK_KEY]
+    )[0]
+    # Sort the frames of the episode chronologically, as it may wrap around the end of the buffer.
+    episode_data_indices = episode_data_indices[
+        np.argsort(data[OnlineBuffer.INDEX_KEY][episode_data_indices])
+    ]
+    episode_timestamps = data[OnlineBuffer.TIMESTAMP_KEY][episode_data_indices]
+    for data_key, delta_ts in buffer.delta_timestamps.items():
+        dist = np.abs(item[OnlineBuffer.TIMESTAMP_KEY] + delta_ts[:, None] - episode_timestamps[None, :])
+        argmin_ = np.argmin(dist, axis=1)
+        item[data_key] = data[data_key][episode_data_indices[argmin_]]
+        item[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"] = dist.min(axis=1) > buffer.tolerance_s
+    return item
+
+
+def assert_items_match_reference(buffer: OnlineBuffer):
+    indices = list(range(len(buffer)))
+    for idx, batch_item in zip(indices, buffer.__getitems__(indices), strict=True):
+        item = buffer[idx]
+        expected_item = reference_delta_item(buffer, idx)
+        assert item.keys() == batch_item.keys() == expected_item.keys()
+        for key, val in expected_item.items():
+            assert np.array_equal(item[key].numpy(), val), key
+            assert torch.equal(item[key], batch_item[key]), key
+
+
+@pytest.mark.parametrize("off_grid", [False, True])
+def test_delta_timestamps_episode_index(off_grid: bool):
+    """Checks the episode index based lookup against a brute-force one, with episodes wrapping around the end
+    of the buffer and partially overwritten ones, both on and off the fps grid.
+    """
+    delta_timestamps = {data_key: [-0.3, -0.1, 0, 0.04, 0.2, 1.0], OnlineBuffer.INDEX_KEY: [-0.2, 0, 0.2]}
+    buffer, write_dir = make_new_buffer(delta_timestamps=delta_timestamps)
+    rng = np.random.default_rng(0)
+    for n_frames_per_episode in [15, 30, 12, 18]:
+        new_data = make_spoof_data_frames(n_episodes=2, n_frames_per_episode=n_frames_per_episode)
+        if off_grid:
+            new_data[OnlineBuffer.TIMESTAMP_KEY] += rng.uniform(-0.02, 0.02, size=len(new_data[data_key]))
+        buffer.add_data(new_data)
+    assert len(buffer) == buffer_capacity
+    assert buffer.num_episodes == 6
+    assert (buffer._data[OnlineBuffer.EPISODE_ON_GRID_KEY] != off_grid).all()
+
+    assert_items_match_reference(buffer)
+
+    # Buffers written without the episode metadata get it rebuilt when loaded from disk.
+    del buffer
+    for key in [
+        OnlineBuffer.NUM_ADDED_KEY,
+        OnlineBuffer.EPISODE_START_KEY,
+        OnlineBuffer.EPISODE_LENGTH_KEY,
+        OnlineBuffer.EPISODE_ON_GRID_KEY,
+    ]:
+        Path(write_dir, key).unlink()
+    buffer, _ = make_new_buffer(write_dir, delta_timestamps=delta_timestamps)
+    assert len(buffer) == buffer_capacity
+    assert_items_match_reference(buffer)
+
+
+CONCURRENT_DELTA_TIMESTAMPS = {data_key: [-0.2, -0.1, 0, 0.1, 0.3]}
+
+
+def add_episodes_concurrently(write_dir: str, writer_id: int, n_episodes: int):
+    buffer, _ = make_new_buffer(write_dir, delta_timestamps=CONCURRENT_DELTA_TIMESTAMPS)
+    rng = np.random.default_rng(writer_id)
+    for episode in range(n_episodes):
+        n_frames = int(rng.integers(3, 20))
+        new_data = make_spoof_data_frames(n_episodes=1, n_frames_per_episode=n_frames)
+        # Each frame holds the id of its episode and its frame index, which readers check for consistency.
+        new_data[data_key] = np.zeros((n_frames, *data_shape), dtype=np.float32)
+        new_data[data_key][:, 0, 0] = writer_id * 10000 + episode
+        new_data[data_key][:, 0, 1] = np.arange(n_frames)
+        buffer.add_data(new_data)
+
+
+def test_concurrent_writers_and_readers():
+    """Checks that items read while other processes add episodes are never made of frames from different
+    writes, with the buffer wrapping around many times.
+    """
+    buffer, write_dir = make_new_buffer(delta_timestamps=CONCURRENT_DELTA_TIMESTAMPS)
+    writers = [
+        multiprocessing.Process(target=add_episodes_concurrently, args=(write_dir, writer_id, 150))
+        for writer_id in range(1, 3)
+    ]
+    for writer in writers:
+        writer.start()
+
+    offsets = np.round(CONCURRENT_DELTA_TIMESTAMPS[data_key] * np.array(fps)).astype(int)
+    rng = np.random.default_rng(0)
+    n_reads = 0
+    while any(writer.is_alive() for writer in writers) or n_reads == 0:
+        if len(buffer) == 0:
+            continue
+        for item in buffer.__getitems__(rng.integers(0, len(buffer), size=16).tolist()):
+            frames, is_pad = item[data_key].numpy(), item[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"].numpy()
+            # All the frames come from the episode of the item
+            assert (frames[:, 0, 0] == frames[offsets == 0, 0, 0]).all()
+            assert frames[offsets == 0, 0, 1] == item[OnlineBuffer.FRAME_INDEX_KEY].item()
+            expected_frame_indices = item[OnlineBuffer.FRAME_INDEX_KEY].item() + offsets
+            assert (frames[~is_pad, 0, 1] == expected_frame_indices[~is_pad]).all()
+        n_reads += 1
+
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+    assert buffer.num_episodes > 0
+    assert int(buffer._data[OnlineBuffer.NUM_ADDED_KEY]) > buffer_capacity
+
+
+def test_pickle_reopens_memmaps():
+    buffer, _ = make_new_buffer()
+    buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=10))
+    unpickled_buffer = pickle.loads(pickle.dumps(buffer))
+    # Frames added afterwards are seen through the unpickled buffer
+    buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=5))
+    assert len(unpickled_buffer) == 15
+    assert torch.equal(unpickled_buffer[12][data_key], buffer[12][data_key])
+
+
+def test_sum_tree():
+    rng = np.random.default_rng(0)
+    tree = SumTree(np.zeros(SumTree.get_size(10)))
+    assert tree.num_leaves == 16
+    values = rng.uniform(size=10)
+    values[3] = 0
+    tree.update(np.arange(10), values)
+    assert tree.total == pytest.approx(values.sum())
+    np.testing.assert_array_equal(tree[[1, 3]], values[[1, 3]])
+
+    queries = rng.uniform(0, tree.total, size=1000)
+    np.testing.assert_array_equal(
+        tree.find(queries), np.searchsorted(np.cumsum(values), queries, side="right")
+    )
+    assert 3 not in tree.find(queries)
+
+
+def test_prioritized_sampler():
+    buffer, _ = make_new_buffer(prioritized=True)
+    buffer.add_data(make_spoof_data_frames(n_episodes=2, n_frames_per_episode=10))
+    sampler = PrioritizedSampler(buffer, num_samples=20000, generator=torch.Generator().manual_seed(0))
+
+    # New frames all get the same priority
+    np.testing.assert_array_equal(np.bincount(list(sampler), minlength=20), np.full(20, 1000))
+
+    buffer.update_priorities(np.arange(20), np.arange(20))
+    frequencies = np.bincount(list(sampler), minlength=20) / len(sampler)
+    np.testing.assert_allclose(frequencies, np.arange(20) / np.arange(20).sum(), atol=1e-3)
+    torch.testing.assert_close(sampler.importance_weights([1, 19], beta=1.0), torch.tensor([1.0, 1 / 19]))
+
+    # Then the highest priority seen so far
+    buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=5))
+    np.testing.assert_array_equal(buffer.priority_tree[np.arange(20, 25)], np.full(5, 19.0))
+
+
 # Arbitrarily set small dataset sizes, making sure to have uneven sizes.
 @pytest.mark.parametrize("offline_dataset_size", [1, 6])
 @pytest.mark.parametrize("online_dataset_size", [0, 4])
@@ -280,3 +447,28 @@ def test_compute_sampler_weights_drop_n_last_frames(lerobot_dataset_factory, tmp
         online_drop_n_last_frames=1,
     )
     torch.testing.assert_close(weights, torch.tensor([0.5, 0, 0.125, 0, 0.125, 0, 0.125, 0, 0.125, 0]))
+
+
+def test_compute_sampler_weights_drop_n_first_frames(lerobot_dataset_factory, tmp_path):
+    offline_dataset = lerobot_dataset_factory(tmp_path, total_episodes=1, total_frames=2)
+    online_dataset, _ = make_new_buffer()
+    # Wrap around the buffer so that the first episode has lost its first frames and the last episode spans
+    # both ends of the buffer.
+    online_dataset.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=buffer_capacity - 2))
+    online_dataset.add_data(make_spoof_data_frames(n_episodes=2, n_frames_per_episode=3))
+
+    weights = compute_sampler_weights(
+        offline_dataset,
+        offline_drop_n_first_frames=1,
+        online_dataset=online_dataset,
+        online_sampling_ratio=0.5,
+        online_drop_n_first_frames=1,
+        online_drop_n_last_frames=1,
+    )
+    # Slots hold [2 | 0, 1, 2 | 4, ..., 97 | 0, 1] of the episodes [1 | 2 | 0 | 1].
+    expected_online_mask = torch.zeros(buffer_capacity, dtype=torch.bool)
+    expected_online_mask[[2, 99]] = True
+    expected_online_mask[4:-3] = True
+    torch.testing.assert_close(weights[:2], torch.tensor([0.0, 0.5]))
+    torch.testing.assert_close(weights[2:] > 0, expected_online_mask)
+    torch.testing.assert_close(weights[2:].sum(), torch.tensor(0.5))
@@ -0,0 +1,101 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+
+import pytest
+import torch
+
+from lerobot.common.datasets.prefetcher import BatchPrefetcher
+from lerobot.common.datasets.utils import uint8_images_to_float
+from tests.utils import require_cuda
+
+
+def make_batches(num_batches: int) -> list[dict]:
+    return [
+        {
+            "index": torch.arange(4) + 4 * i,
+            "observation.image": torch.full((4, 3, 2, 2), i, dtype=torch.uint8),
+            "task": ["task"] * 4,
+        }
+        for i in range(num_batches)
+    ]
+
+
+def assert_batches_equal(batches: list[dict], expected_batches: list[dict]):
+    assert len(batches) == len(expected_batches)
+    for batch, expected_batch in zip(batches, expected_batches, strict=True):
+        assert batch.keys() == expected_batch.keys()
+        for key, val in expected_batch.items():
+            if isinstance(val, torch.Tensor):
+                torch.testing.assert_close(batch[key].cpu(), val)
+            else:
+                assert batch[key] == val
+
+
+def test_prefetcher_cpu():
+    batches = make_batches(5)
+    prefetcher = BatchPrefetcher(
+        batches,
+        torch.device("cpu"),
+        transform=lambda batch: uint8_images_to_float(batch, ["observation.image"]),
+    )
+    expected_batches = [uint8_images_to_float(dict(batch), ["observation.image"]) for batch in batches]
+    assert_batches_equal(list(prefetcher), expected_batches)
+    with pytest.raises(StopIteration):
+        next(prefetcher)
+
+
+@require_cuda
+def test_prefetcher_cuda():
+    batches = make_batches(5)
+    batches[1]["index"] = batches[1]["index"].pin_memory()
+    prefetcher = BatchPrefetcher(batches, torch.device("cuda"), num_prefetch=3)
+    prefetched_batches = list(prefetcher)
+    assert all(batch["index"].is_cuda for batch in prefetched_batches)
+    # Staging buffers are reused without corrupting the batches already on the device
+    assert_batches_equal(prefetched_batches, batches)
+
+
+def test_prefetcher_runs_ahead():
+    num_fetched = 0
+
+    def iterate():
+        nonlocal num_fetched
+        for batch in make_batches(10):
+            num_fetched += 1
+            yield batch
+
+    prefetcher = BatchPrefetcher(iterate(), torch.device("cpu"), num_prefetch=2)
+    next(prefetcher)
+    deadline = time.perf_counter() + 5
+    while num_fetched < 3 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    # Batches are fetched while the training loop is busy, up to `num_prefetch` of them
+    time.sleep(0.1)
+    assert 3 <= num_fetched <= 4
+    prefetcher.close()
+    with pytest.raises(StopIteration):
+        next(prefetcher)
+
+
+def test_prefetcher_raises_errors():
+    def iterate():
+        yield from make_batches(2)
+        raise RuntimeError("Corrupted batch")
+
+    prefetcher = BatchPrefetcher(iterate(), torch.device("cpu"))
+    next(prefetcher)
+    next(prefetcher)
+    with pytest.raises(RuntimeError, match="Corrupted batch"):
+        next(prefetcher)
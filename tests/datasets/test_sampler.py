@@ -13,10 +13,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import pytest
+import torch
 from datasets import Dataset
 
 from lerobot.common.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.common.datasets.sampler import EpisodeAwareSampler
+from lerobot.common.datasets.sampler import EpisodeAwareSampler, WeightedDatasetSampler
 from lerobot.common.datasets.utils import (
     hf_transform_to_torch,
 )
@@ -33,7 +35,7 @@ def test_drop_n_first_frames():
     dataset.set_transform(hf_transform_to_torch)
     episode_data_index = calculate_episode_data_index(dataset)
     sampler = EpisodeAwareSampler(episode_data_index, drop_n_first_frames=1)
-    assert sampler.indices == [1, 4, 5]
+    assert sampler.indices.tolist() == [1, 4, 5]
     assert len(sampler) == 3
     assert list(sampler) == [1, 4, 5]
 
@@ -49,7 +51,7 @@ def test_drop_n_last_frames():
     dataset.set_transform(hf_transform_to_torch)
     episode_data_index = calculate_episode_data_index(dataset)
     sampler = EpisodeAwareSampler(episode_data_index, drop_n_last_frames=1)
-    assert sampler.indices == [0, 3, 4]
+    assert sampler.indices.tolist() == [0, 3, 4]
     assert len(sampler) == 3
     assert list(sampler) == [0, 3, 4]
 
@@ -65,7 +67,7 @@ def test_episode_indices_to_use():
     dataset.set_transform(hf_transform_to_torch)
     episode_data_index = calculate_episode_data_index(dataset)
     sampler = EpisodeAwareSampler(episode_data_index, episode_indices_to_use=[0, 2])
-    assert sampler.indices == [0, 1, 3, 4, 5]
+    assert sampler.indices.tolist() == [0, 1, 3, 4, 5]
     assert len(sampler) == 5
     assert list(sampler) == [0, 1, 3, 4, 5]
 
@@ -81,10 +83,86 @@ def test_shuffle():
     dataset.set_transform(hf_transform_to_torch)
     episode_data_index = calculate_episode_data_index(dataset)
     sampler = EpisodeAwareSampler(episode_data_index, shuffle=False)
-    assert sampler.indices == [0, 1, 2, 3, 4, 5]
+    assert sampler.indices.tolist() == [0, 1, 2, 3, 4, 5]
     assert len(sampler) == 6
     assert list(sampler) == [0, 1, 2, 3, 4, 5]
     sampler = EpisodeAwareSampler(episode_data_index, shuffle=True)
-    assert sampler.indices == [0, 1, 2, 3, 4, 5]
+    assert sampler.indices.tolist() == [0, 1, 2, 3, 4, 5]
     assert len(sampler) == 6
     assert set(sampler) == {0, 1, 2, 3, 4, 5}
+
+
+def test_shuffle_windows():
+    dataset = Dataset.from_dict(
+        {
+            "timestamp": [0.1 * i for i in range(14)],
+            "index": list(range(14)),
+            "episode_index": [0] * 7 + [1] * 7,
+        },
+    )
+    dataset.set_transform(hf_transform_to_torch)
+    episode_data_index = calculate_episode_data_index(dataset)
+    sampler = EpisodeAwareSampler(
+        episode_data_index, drop_n_last_frames=1, shuffle=True, window_size=3, num_open_windows=2
+    )
+    assert sampler.windows.tolist() == [[0, 3], [3, 6], [7, 10], [10, 13]]
+    assert len(sampler) == 12
+
+    indices = list(sampler)
+    assert sorted(indices) == sampler.indices.tolist()
+    # Each group of `num_open_windows` windows is yielded before moving on to the next one.
+    for group_start in range(0, len(indices), 6):
+        group = set(indices[group_start : group_start + 6])
+        windows = [w for w in sampler.windows.tolist() if set(range(*w)) & group]
+        assert sum(end - start for start, end in windows) == len(group)
+
+
+@pytest.mark.parametrize("window_size", [1, 3])
+def test_shuffle_distributed(window_size):
+    episode_data_index = {"from": torch.tensor([0, 7]), "to": torch.tensor([7, 14])}
+
+    def shards(epoch):
+        shards = []
+        for rank in range(3):
+            sampler = EpisodeAwareSampler(
+                episode_data_index, shuffle=True, window_size=window_size, rank=rank, world_size=3, seed=0
+            )
+            sampler.set_epoch(epoch)
+            assert len(sampler) == 5
+            shards.append(list(sampler))
+        return shards
+
+    # Each rank gets its own part of the indices, padded to the same length
+    epoch_0 = shards(epoch=0)
+    assert sorted(set(sum(epoch_0, []))) == list(range(14))
+    assert len(set(epoch_0[0] + epoch_0[1])) == 10
+    assert shards(epoch=0) == epoch_0
+    assert shards(epoch=1) != epoch_0
+
+    with pytest.raises(ValueError):
+        EpisodeAwareSampler(episode_data_index, shuffle=True, rank=0, world_size=3)
+
+
+def test_weighted_dataset_sampler():
+    sampler = WeightedDatasetSampler(
+        [100, 0, 300], num_samples=4000, generator=torch.Generator().manual_seed(0)
+    )
+    torch.testing.assert_close(sampler.probabilities, torch.tensor([0.25, 0.0, 0.75], dtype=torch.float64))
+    indices = torch.tensor(list(sampler))
+    assert len(indices) == len(sampler) == 4000
+    assert indices.min() >= 0 and indices.max() < 400
+    assert 0.2 < (indices < 100).float().mean() < 0.3
+
+
+def test_weighted_dataset_sampler_weights_and_temperature():
+    sampler = WeightedDatasetSampler([100, 300], weights=[3.0, 1.0])
+    torch.testing.assert_close(sampler.probabilities, torch.tensor([0.5, 0.5], dtype=torch.float64))
+    # An infinite temperature would sample datasets uniformly
+    sampler = WeightedDatasetSampler([100, 900], temperature=2.0)
+    torch.testing.assert_close(sampler.probabilities, torch.tensor([0.25, 0.75], dtype=torch.float64))
+    assert len(sampler) == 1000
+
+    with pytest.raises(ValueError):
+        WeightedDatasetSampler([100, 300], weights=[1.0])
+    with pytest.raises(ValueError):
+        WeightedDatasetSampler([100, 300], temperature=0)
@@ -0,0 +1,113 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import shutil
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from lerobot.common.datasets.download import LocalDirSource
+from lerobot.common.datasets.streaming_dataset import StreamingLeRobotDataset
+
+
+@pytest.fixture
+def source_dataset(tmp_path, lerobot_dataset_factory, info_factory):
+    info = info_factory(
+        total_episodes=4, total_frames=200, total_tasks=1, camera_features={}, use_videos=False
+    )
+    delta_timestamps = {"action": [i / info["fps"] for i in range(-2, 5)]}
+    return lerobot_dataset_factory(root=tmp_path / "source", info=info, delta_timestamps=delta_timestamps)
+
+
+def make_streaming_dataset(tmp_path, source_dataset, **kwargs):
+    return StreamingLeRobotDataset(
+        source_dataset.repo_id,
+        root=tmp_path / "stream",
+        source=LocalDirSource(source_dataset.root),
+        delta_timestamps=source_dataset.delta_timestamps,
+        **kwargs,
+    )
+
+
+def test_streaming_items_match(tmp_path, source_dataset):
+    dataset = make_streaming_dataset(tmp_path, source_dataset, shuffle=False)
+    assert dataset.num_frames == source_dataset.num_frames
+
+    items = list(dataset)
+    assert len(items) == len(source_dataset)
+    for idx, streamed_item in enumerate(items):
+        item = source_dataset[idx]
+        assert item.keys() == streamed_item.keys()
+        for key, val in item.items():
+            if isinstance(val, torch.Tensor):
+                assert val.dtype == streamed_item[key].dtype, key
+                assert torch.equal(val, streamed_item[key]), key
+            else:
+                assert val == streamed_item[key], key
+
+
+def test_streaming_sharding_and_shuffling(tmp_path, source_dataset):
+    def indices(rank, epoch):
+        dataset = make_streaming_dataset(
+            tmp_path, source_dataset, shuffle_buffer_size=20, rank=rank, world_size=2
+        )
+        dataset.set_epoch(epoch)
+        return [item["index"].item() for item in dataset]
+
+    rank_0, rank_1 = indices(0, epoch=0), indices(1, epoch=0)
+    assert len(rank_0) + len(rank_1) == len(source_dataset)
+    assert sorted(rank_0 + rank_1) == list(range(len(source_dataset)))
+    assert rank_0 != sorted(rank_0)
+    assert indices(0, epoch=0) == rank_0
+    assert indices(0, epoch=1) != rank_0
+
+
+def test_streaming_cache_eviction(tmp_path, source_dataset):
+    dataset = make_streaming_dataset(tmp_path, source_dataset, shuffle=False, max_cache_bytes=0)
+    # Files which were on disk before streaming are left untouched
+    kept_file = dataset.meta.get_data_file_path(0)
+    (dataset.root / kept_file).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(source_dataset.root / kept_file, dataset.root / kept_file)
+
+    assert len(list(dataset)) == len(source_dataset)
+    assert [path.relative_to(dataset.root) for path in dataset.root.glob("data/**/*.parquet")] == [kept_file]
+    assert (dataset.root / "meta/info.json").is_file()
+
+    dataset.max_cache_bytes = 10 * 1024**3
+    assert len(list(dataset)) == len(source_dataset)
+    assert len(list(dataset.root.glob("data/**/*.parquet"))) == dataset.num_episodes
+
+
+def test_streaming_shuffle_buffer_across_episodes(tmp_path, source_dataset):
+    # The buffer spans several episodes, whose files must stay on disk until their frames leave it
+    dataset = make_streaming_dataset(tmp_path, source_dataset, shuffle_buffer_size=120, max_cache_bytes=0)
+
+    items = list(dataset)
+    assert sorted(item["index"].item() for item in items) == list(range(len(source_dataset)))
+    for streamed_item in items[:10]:
+        item = source_dataset[streamed_item["index"].item()]
+        for key in ["action", "action_is_pad", "timestamp", "episode_index"]:
+            assert torch.equal(item[key], streamed_item[key]), key
+    assert list(dataset.root.glob("data/**/*.parquet")) == []
+
+
+def test_streaming_cache_budget_per_node(tmp_path, source_dataset, monkeypatch):
+    monkeypatch.setenv("LOCAL_WORLD_SIZE", "4")
+    dataset = make_streaming_dataset(tmp_path, source_dataset, max_cache_bytes=800, rank=1, world_size=8)
+    assert dataset.local_world_size == 4
+
+    with patch.object(dataset, "_iter_items", return_value=iter([])) as mock_iter_items:
+        list(dataset)
+    # Processes on the same node share the local disk
+    assert mock_iter_items.call_args.args[1] == 200
@@ -14,12 +14,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 import torch
 from datasets import Dataset
 from huggingface_hub import DatasetCard
+from PIL import Image
 
 from lerobot.common.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.common.datasets.utils import create_lerobot_dataset_card, hf_transform_to_torch
+from lerobot.common.datasets.utils import (
+    create_lerobot_dataset_card,
+    hf_transform_to_torch,
+    uint8_images_to_float,
+)
 
 
 def test_default_parameters():
@@ -53,3 +59,17 @@ def test_calculate_episode_data_index():
     episode_data_index = calculate_episode_data_index(dataset)
     assert torch.equal(episode_data_index["from"], torch.tensor([0, 2, 3]))
     assert torch.equal(episode_data_index["to"], torch.tensor([2, 3, 6]))
+
+
+def test_hf_transform_to_torch_uint8_images():
+    img = np.random.randint(0, 256, size=(4, 6, 3), dtype=np.uint8)
+    items = {"image": [Image.fromarray(img)], "state": [[0.1, 0.2]]}
+    float_items = hf_transform_to_torch({key: list(val) for key, val in items.items()})
+    uint8_items = hf_transform_to_torch({key: list(val) for key, val in items.items()}, uint8_images=True)
+
+    assert uint8_items["image"][0].dtype == torch.uint8
+    assert uint8_items["image"][0].shape == (3, 4, 6)
+    assert torch.equal(uint8_items["state"][0], float_items["state"][0])
+
+    batch = uint8_images_to_float({"image": uint8_items["image"][0]}, ["image"])
+    assert torch.equal(batch["image"], float_items["image"][0])
@@ -0,0 +1,53 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import torch
+
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.common.datasets.utils import write_info
+from lerobot.scripts.verify_dataset import verify_dataset
+from tests.fixtures.constants import DUMMY_REPO_ID
+
+
+@pytest.fixture
+def recorded_dataset(tmp_path, empty_lerobot_dataset_factory):
+    features = {"state": {"dtype": "float32", "shape": (2,), "names": None}}
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    for ep_idx in range(3):
+        for _ in range(ep_idx + 2):
+            dataset.add_frame({"state": torch.randn(2)}, task="Dummy task")
+        dataset.save_episode()
+    return dataset
+
+
+def test_verify_recorded_dataset(recorded_dataset):
+    torch.testing.assert_close(recorded_dataset.episode_data_index["from"], torch.LongTensor([0, 2, 5]))
+    torch.testing.assert_close(recorded_dataset.episode_data_index["to"], torch.LongTensor([2, 5, 9]))
+    assert verify_dataset(recorded_dataset, check_episodes_stats=True) == []
+
+    dataset = LeRobotDataset(DUMMY_REPO_ID, root=recorded_dataset.root)
+    assert verify_dataset(dataset, check_episodes_stats=True) == []
+
+
+def test_verify_dataset_errors(recorded_dataset):
+    root = recorded_dataset.root
+    recorded_dataset.meta.info["total_frames"] += 1
+    write_info(recorded_dataset.meta.info, root)
+    (root / recorded_dataset.meta.get_data_file_path(3)).write_bytes(b"")
+    recorded_dataset.meta.episodes_stats[1]["state"]["mean"] += 1
+
+    errors = verify_dataset(recorded_dataset)
+    assert any("Total frames" in error for error in errors)
+    assert any("Unexpected file" in error for error in errors)
+    assert any("Dataset stats" in error for error in errors)
@@ -0,0 +1,107 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from lerobot.common.datasets.video_utils import (
+    VideoDecoderCache,
+    decode_video_frames,
+    encode_video_frames,
+)
+
+FPS = 10
+NUM_FRAMES = 20
+
+
+def _make_video(tmp_path, name: str):
+    imgs_dir = tmp_path / f"{name}_imgs"
+    imgs_dir.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(NUM_FRAMES):
+        img = rng.integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+        Image.fromarray(img).save(imgs_dir / f"frame_{i:06d}.png")
+    video_path = tmp_path / "videos" / f"{name}.mp4"
+    encode_video_frames(imgs_dir, video_path, FPS, vcodec="h264", overwrite=True)
+    return video_path
+
+
+@pytest.fixture(scope="module")
+def videos(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("videos")
+    return [_make_video(tmp_path, f"video_{i}") for i in range(3)]
+
+
+@pytest.mark.parametrize("timestamps", [[0.0], [0.5, 0.6], [1.9], [0.2, 1.0, 1.5]])
+def test_decoder_cache_matches_uncached(videos, timestamps):
+    cache = VideoDecoderCache()
+    expected = decode_video_frames(videos[0], timestamps, 1e-4, "pyav")
+    # Decode twice to make sure a reused decoder can seek backward and forward.
+    for ts in [[1.8], timestamps]:
+        frames = decode_video_frames(videos[0], ts, 1e-4, "pyav", decoder_cache=cache)
+    torch.testing.assert_close(frames, expected)
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+
+def test_decoder_cache_lru_eviction(videos):
+    cache = VideoDecoderCache(max_decoders=2)
+    for path in [videos[0], videos[1], videos[0], videos[2]]:
+        decode_video_frames(path, [0.0], 1e-4, "pyav", decoder_cache=cache)
+
+    assert len(cache) == 2
+    assert (str(videos[0]), "pyav") in cache
+    assert (str(videos[1]), "pyav") not in cache
+    assert (str(videos[2]), "pyav") in cache
+
+
+def test_decoder_cache_memory_budget(videos):
+    cache = VideoDecoderCache(max_bytes=1)
+    for path in videos:
+        decode_video_frames(path, [0.0], 1e-4, "pyav", decoder_cache=cache)
+
+    # Only the most recently used decoder is kept when each one exceeds the budget.
+    assert len(cache) == 1
+    assert (str(videos[2]), "pyav") in cache
+
+
+def test_decoder_cache_pickle(videos):
+    cache = VideoDecoderCache(max_decoders=3)
+    decode_video_frames(videos[0], [0.0], 1e-4, "pyav", decoder_cache=cache)
+
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert len(unpickled) == 0
+    assert unpickled.max_decoders == 3
+    decode_video_frames(videos[0], [0.0], 1e-4, "pyav", decoder_cache=unpickled)
+    assert len(unpickled) == 1
+
+
+def test_decoder_cache_reset_in_other_process(videos):
+    cache = VideoDecoderCache()
+    decode_video_frames(videos[0], [0.0], 1e-4, "pyav", decoder_cache=cache)
+    cache._pid = -1  # simulate a forked child inheriting the parent's decoders
+    decode_video_frames(videos[1], [0.0], 1e-4, "pyav", decoder_cache=cache)
+
+    assert len(cache) == 1
+    assert (str(videos[1]), "pyav") in cache
+
+
+def test_decode_uint8(videos):
+    frames = decode_video_frames(videos[0], [0.2, 0.5], 1e-4, "pyav")
+    uint8_frames = decode_video_frames(videos[0], [0.2, 0.5], 1e-4, "pyav", return_uint8=True)
+    assert uint8_frames.dtype == torch.uint8
+    assert torch.equal(uint8_frames.type(torch.float32) / 255, frames)
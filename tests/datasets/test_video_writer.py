@@ -0,0 +1,109 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from lerobot.common.datasets.compute_stats import compute_episode_stats
+from lerobot.common.datasets.image_writer import image_array_to_pil_image
+from lerobot.common.datasets.video_utils import decode_video_frames, encode_video_frames
+from lerobot.common.datasets.video_writer import StreamingVideoEncoder
+
+FPS = 10
+NUM_FRAMES = 20
+# libsvtav1 leaves worker threads behind which slow down the other tests on small machines.
+VCODEC = "h264"
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8) for _ in range(NUM_FRAMES)]
+
+
+def test_streaming_encoder_matches_png_encoding(tmp_path, frames):
+    imgs_dir = tmp_path / "imgs"
+    imgs_dir.mkdir()
+    for i, frame in enumerate(frames):
+        Image.fromarray(frame).save(imgs_dir / f"frame_{i:06d}.png")
+    encode_video_frames(imgs_dir, tmp_path / "png" / "video.mp4", FPS, vcodec=VCODEC)
+
+    encoder = StreamingVideoEncoder(tmp_path / "streaming" / "video.mp4", FPS, vcodec=VCODEC)
+    for frame in frames:
+        # Channel first float frames are accepted like in `LeRobotDataset.add_frame`
+        encoder.add_frame(torch.from_numpy(frame).permute(2, 0, 1) / 255)
+    stats = encoder.finish()
+
+    timestamps = [i / FPS for i in range(NUM_FRAMES)]
+    expected = decode_video_frames(tmp_path / "png" / "video.mp4", timestamps, 1e-4, "pyav")
+    decoded = decode_video_frames(tmp_path / "streaming" / "video.mp4", timestamps, 1e-4, "pyav")
+    torch.testing.assert_close(decoded, expected)
+
+    image_paths = [str(imgs_dir / f"frame_{i:06d}.png") for i in range(NUM_FRAMES)]
+    features = {"cam": {"dtype": "video", "shape": (32, 48, 3), "names": None}}
+    expected_stats = compute_episode_stats({"cam": image_paths}, features)["cam"]
+    assert stats.keys() == expected_stats.keys()
+    for key, val in expected_stats.items():
+        assert stats[key].shape == val.shape
+        np.testing.assert_allclose(stats[key], val)
+
+
+def test_streaming_encoder_cancel(tmp_path, frames):
+    video_path = tmp_path / "video.mp4"
+    encoder = StreamingVideoEncoder(video_path, FPS, vcodec=VCODEC)
+    for frame in frames:
+        encoder.add_frame(frame)
+    encoder.cancel()
+    assert not video_path.exists()
+
+
+def test_streaming_encoder_full_queue(tmp_path, frames, caplog):
+    release = threading.Event()
+
+    def slow_conversion(image):
+        release.wait()
+        return image_array_to_pil_image(image)
+
+    with patch("lerobot.common.datasets.video_writer.image_array_to_pil_image", side_effect=slow_conversion):
+        encoder = StreamingVideoEncoder(tmp_path / "video.mp4", FPS, vcodec=VCODEC, max_queue_size=2)
+        recorder = threading.Thread(target=lambda: [encoder.add_frame(frame) for frame in frames])
+        recorder.start()
+        recorder.join(timeout=0.5)
+
+        # Recording waits for the encoding instead of piling up frames
+        assert recorder.is_alive()
+        assert encoder.queue.qsize() == 2
+        assert "falling behind" in caplog.text
+
+        release.set()
+        recorder.join()
+        encoder.finish()
+    assert encoder.num_frames == NUM_FRAMES
+    assert encoder.num_blocked_frames > 0
+
+
+def test_streaming_encoder_error(tmp_path):
+    encoder = StreamingVideoEncoder(tmp_path / "video.mp4", FPS, vcodec=VCODEC, max_queue_size=1)
+    encoder.add_frame(np.zeros((32, 48, 5), dtype=np.uint8))
+    encoder.thread.join()
+    # Frames are not waiting forever on a full queue after the encoding failed
+    with pytest.raises(RuntimeError):
+        for _ in range(3):
+            encoder.add_frame(np.zeros((32, 48, 3), dtype=np.uint8))
+    with pytest.raises(RuntimeError):
+        encoder.finish()
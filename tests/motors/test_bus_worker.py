@@ -0,0 +1,152 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from lerobot.common.errors import DeviceNotConnectedError
+from lerobot.common.motors import MotorsBusWorker
+
+
+def make_bus_mock() -> MagicMock:
+    bus = MagicMock(name="MotorsBusMock")
+    bus.is_connected = True
+    bus.port = "/dev/dummy-port"
+    num_reads = 0
+
+    def sync_read(data_name):
+        nonlocal num_reads
+        num_reads += 1
+        return {"dummy_1": num_reads, "dummy_2": -num_reads}
+
+    bus.sync_read.side_effect = sync_read
+    bus.sync_read_many.side_effect = lambda data_names: {name: sync_read(name) for name in data_names}
+    return bus
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError
+        time.sleep(0.005)
+
+
+def test_bus_worker_read():
+    bus = make_bus_mock()
+    worker = MotorsBusWorker(bus, fps=200)
+    worker.start()
+    first_state = worker.read()
+    wait_for(lambda: bus.sync_read.call_count >= 3)
+    state = worker.read()
+    worker.stop()
+
+    assert not worker.is_running
+    assert state.timestamp > first_state.timestamp
+    assert state.values["Present_Position"]["dummy_1"] > first_state.values["Present_Position"]["dummy_1"]
+    # The published states are never modified
+    assert first_state.values["Present_Position"] == {"dummy_1": 1, "dummy_2": -1}
+    bus.sync_read.assert_called_with("Present_Position")
+    bus.sync_read_many.assert_not_called()
+
+
+def test_bus_worker_read_many():
+    bus = make_bus_mock()
+    worker = MotorsBusWorker(bus, ["Present_Position", "Present_Velocity"], fps=200)
+    worker.start()
+    state = worker.read()
+    worker.stop()
+
+    assert set(state.values) == {"Present_Position", "Present_Velocity"}
+    bus.sync_read_many.assert_called_with(["Present_Position", "Present_Velocity"])
+
+
+def test_bus_worker_write():
+    bus = make_bus_mock()
+    worker = MotorsBusWorker(bus, fps=200)
+    worker.start()
+    worker.write({"dummy_1": 10.0})
+    worker.write({"dummy_1": 20.0, "dummy_2": 30.0})
+    wait_for(lambda: bus.sync_write.called)
+    num_reads = bus.sync_read.call_count
+    wait_for(lambda: bus.sync_read.call_count > num_reads + 2)
+    worker.stop()
+
+    # Only the latest goal is written, once
+    bus.sync_write.assert_called_once_with("Goal_Position", {"dummy_1": 20.0, "dummy_2": 30.0})
+
+
+def test_bus_worker_keeps_running_on_errors():
+    bus = make_bus_mock()
+    read = bus.sync_read.side_effect
+    errors = iter([ConnectionError("No status packet")])
+
+    def sync_read(data_name):
+        for error in errors:
+            raise error
+        return read(data_name)
+
+    bus.sync_read.side_effect = sync_read
+    worker = MotorsBusWorker(bus, fps=200)
+    worker.start()
+    state = worker.read()
+    worker.stop()
+
+    assert state.values["Present_Position"] == {"dummy_1": 1, "dummy_2": -1}
+
+
+def test_bus_worker_stale_state():
+    bus = make_bus_mock()
+    read = bus.sync_read.side_effect
+    failing = False
+
+    def sync_read(data_name):
+        if failing:
+            raise ConnectionError("No status packet")
+        return read(data_name)
+
+    bus.sync_read.side_effect = sync_read
+    worker = MotorsBusWorker(bus, fps=200, max_age_ms=50)
+    worker.start()
+    worker.read()
+
+    failing = True
+    wait_for(lambda: worker.num_consecutive_errors > 0)
+    time.sleep(0.06)
+    # The last values are not returned forever once the bus fails
+    with pytest.raises(ConnectionError, match="old") as exc_info:
+        worker.read()
+    assert isinstance(exc_info.value.__cause__, ConnectionError)
+    with pytest.raises(ConnectionError):
+        worker.write({"dummy_1": 10.0})
+
+    failing = False
+    wait_for(lambda: worker.num_consecutive_errors == 0)
+    state = worker.read()
+    worker.stop()
+    assert time.perf_counter() - state.timestamp < 1
+
+
+def test_bus_worker_errors():
+    bus = make_bus_mock()
+    worker = MotorsBusWorker(bus)
+    with pytest.raises(RuntimeError, match="is not running"):
+        worker.read()
+    with pytest.raises(RuntimeError, match="is not running"):
+        worker.write({"dummy_1": 10.0})
+
+    bus.is_connected = False
+    with pytest.raises(DeviceNotConnectedError):
+        worker.start()
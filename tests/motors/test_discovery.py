@@ -0,0 +1,146 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from lerobot.common.motors.discovery import PortLayout, discover_ports, load_layouts, save_layouts
+from tests.mocks.mock_motors_bus import MockMotorsBus
+
+# port → baudrate → ids → model numbers
+PORTS_MOTORS = {
+    "/dev/dummy-port-1": {500_000: {1: 1234, 2: 1234}},
+    "/dev/dummy-port-2": {1_000_000: {3: 5678}},
+}
+
+
+class DiscoveryMotorsBus(MockMotorsBus):
+    available_baudrates = [57_600, 500_000, 1_000_000, 2_000_000]
+    default_baudrate = 1_000_000
+    probes = []
+    barrier: threading.Barrier | None = None
+
+    def _connect(self, handshake: bool = True) -> None:
+        if self.barrier is not None:
+            # Only passes if all ports are opened at the same time
+            self.barrier.wait(timeout=2)
+        if self.port not in PORTS_MOTORS:
+            raise ConnectionError(f"Could not connect on port '{self.port}'.")
+
+    def set_baudrate(self, baudrate: int) -> None:
+        self.baudrate = baudrate
+
+    def _scan_ids_models(self, ids: list[int] | None = None) -> dict[int, int] | None:
+        self.probes.append((self.port, self.baudrate))
+        return dict(PORTS_MOTORS[self.port].get(self.baudrate, {}))
+
+
+@pytest.fixture
+def bus_cls():
+    DiscoveryMotorsBus.probes = []
+    DiscoveryMotorsBus.barrier = None
+    return DiscoveryMotorsBus
+
+
+def test_order_baudrates():
+    bus = DiscoveryMotorsBus("", {})
+    ordered = bus._order_baudrates(bus.available_baudrates, preferred=[57_600])
+    assert ordered == [57_600, 1_000_000, 2_000_000, 500_000]
+
+
+def test_discover_ports(bus_cls, tmp_path):
+    cache_path = tmp_path / "layouts.json"
+    ports = [*PORTS_MOTORS, "/dev/missing-port"]
+    bus_cls.barrier = threading.Barrier(len(ports))
+
+    ports_layouts = discover_ports(bus_cls, ports, cache_path=cache_path)
+
+    expected_layouts = {
+        "/dev/dummy-port-1": PortLayout("/dev/dummy-port-1", 500_000, {1: 1234, 2: 1234}),
+        "/dev/dummy-port-2": PortLayout("/dev/dummy-port-2", 1_000_000, {3: 5678}),
+    }
+    assert ports_layouts == {
+        **{p: [layout] for p, layout in expected_layouts.items()},
+        "/dev/missing-port": [],
+    }
+    # The default baud-rate is probed first, then from the fastest to the slowest, until motors are found
+    assert [b for p, b in bus_cls.probes if p == "/dev/dummy-port-1"] == [1_000_000, 2_000_000, 500_000]
+    assert [b for p, b in bus_cls.probes if p == "/dev/dummy-port-2"] == [1_000_000]
+    assert load_layouts(bus_cls, cache_path) == expected_layouts
+
+
+def test_discover_ports_cached(bus_cls, tmp_path):
+    cache_path = tmp_path / "layouts.json"
+    ports = list(PORTS_MOTORS)
+    discover_ports(bus_cls, ports, cache_path=cache_path)
+    bus_cls.probes = []
+
+    ports_layouts = discover_ports(bus_cls, ports, cache_path=cache_path)
+
+    # The cached layouts are only checked
+    assert sorted(bus_cls.probes) == [("/dev/dummy-port-1", 500_000), ("/dev/dummy-port-2", 1_000_000)]
+    assert ports_layouts["/dev/dummy-port-1"] == [
+        PortLayout("/dev/dummy-port-1", 500_000, {1: 1234, 2: 1234})
+    ]
+
+
+def test_discover_ports_cache_outdated(bus_cls, tmp_path):
+    cache_path = tmp_path / "layouts.json"
+    discover_ports(bus_cls, ["/dev/dummy-port-1"], cache_path=cache_path)
+    bus_cls.probes = []
+    PORTS_MOTORS["/dev/dummy-port-1"][500_000][4] = 1234
+    try:
+        ports_layouts = discover_ports(bus_cls, ["/dev/dummy-port-1"], cache_path=cache_path)
+    finally:
+        del PORTS_MOTORS["/dev/dummy-port-1"][500_000][4]
+
+    # The port is scanned again, starting from the cached baud-rate
+    assert bus_cls.probes == [("/dev/dummy-port-1", 500_000), ("/dev/dummy-port-1", 500_000)]
+    assert ports_layouts["/dev/dummy-port-1"][0].ids_models == {1: 1234, 2: 1234, 4: 1234}
+    assert load_layouts(bus_cls, cache_path)["/dev/dummy-port-1"].ids_models == {1: 1234, 2: 1234, 4: 1234}
+
+
+def test_discover_ports_all_baudrates(bus_cls, tmp_path):
+    ports_layouts = discover_ports(
+        bus_cls, ["/dev/dummy-port-1"], stop_at_first=False, use_cache=False, cache_path=tmp_path / "l.json"
+    )
+
+    assert len(ports_layouts["/dev/dummy-port-1"]) == 1
+    assert len(bus_cls.probes) == len(bus_cls.available_baudrates)
+    assert not (tmp_path / "l.json").exists()
+
+
+def test_discover_ports_ids(bus_cls, tmp_path):
+    with patch.object(bus_cls, "_scan_ids_models", autospec=True, return_value={}) as mock_scan:
+        discover_ports(bus_cls, ["/dev/dummy-port-1"], ids=[1, 2], use_cache=False)
+
+    assert mock_scan.call_count == len(bus_cls.available_baudrates)
+    assert all(call.args[1] == [1, 2] for call in mock_scan.call_args_list)
+
+
+def test_save_layouts(tmp_path):
+    path = tmp_path / "layouts.json"
+    layout = PortLayout("/dev/dummy-port-1", 500_000, {1: 1234})
+    save_layouts(DiscoveryMotorsBus, {layout.port: layout}, path)
+    save_layouts(MockMotorsBus, {layout.port: layout}, path)
+    assert load_layouts(DiscoveryMotorsBus, path) == {layout.port: layout}
+    assert load_layouts(MockMotorsBus, path) == {layout.port: layout}
+
+    # The previous file is left untouched if writing the new one fails
+    content = path.read_text()
+    with patch("json.dump", side_effect=RuntimeError), pytest.raises(RuntimeError):
+        save_layouts(DiscoveryMotorsBus, {}, path)
+    assert path.read_text() == content
+    assert list(tmp_path.iterdir()) == [path]
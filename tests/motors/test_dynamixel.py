@@ -265,6 +265,64 @@ def test__sync_read_comm(raise_on_error, mock_motors, dummy_motors):
     assert mock_motors.stubs[stub].called
 
 
+def test_sync_read_many(mock_motors, dummy_motors):
+    addr = X_SERIES_CONTROL_TABLE[["Present_PWM", "Present_Current"][0]][0]
+    # Present_PWM (2 bytes) followed by Present_Current (2 bytes, two's complement)
+    ids_values = {1: 885 | (42 << 16), 2: 300 | ((2**16 - 100) << 16), 3: 0}
+    stub = mock_motors.build_sync_read_stub(addr, 4, ids_values)
+    bus = DynamixelMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    values = bus.sync_read_many(["Present_PWM", "Present_Current"], normalize=False)
+
+    assert mock_motors.stubs[stub].calls == 1
+    assert values == {
+        "Present_PWM": {"dummy_1": 885, "dummy_2": 300, "dummy_3": 0},
+        "Present_Current": {"dummy_1": 42, "dummy_2": -100, "dummy_3": 0},
+    }
+
+
+def test__sync_read_plan_reused(mock_motors, dummy_motors):
+    addr, length, ids_values = (10, 4, {1: 1337, 2: 42})
+    stub = mock_motors.build_sync_read_stub(addr, length, ids_values)
+    bus = DynamixelMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    bus._sync_read(addr, length, list(ids_values))
+    sync_reader = bus._get_sync_read_plan(addr, length, list(ids_values))
+    read_values, _ = bus._sync_read(addr, length, list(ids_values))
+
+    assert mock_motors.stubs[stub].calls == 2
+    assert read_values == ids_values
+    assert list(bus._sync_read_plans.values()) == [sync_reader]
+
+
+def test_async_read(mock_motors, dummy_motors):
+    addr, length = X_SERIES_CONTROL_TABLE["Present_Position"]
+    positions = {
+        1: [351, 42, 1337, 4],
+        2: [28, 3600, 2444, 5],
+        3: [4002, 2999, 146, 6],
+    }
+    stub = mock_motors.build_sequential_sync_read_stub(addr, length, positions)
+    bus = DynamixelMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    first_values, first_age = bus.async_read("Present_Position", normalize=False)
+    # The request for the second values is sent before they are needed
+    mock_motors.stubs[stub].wait_calls(2)
+    second_values, second_age = bus.async_read("Present_Position", normalize=False)
+    # Other communications receive the response to the pending request first
+    read_values, _ = bus._sync_read(addr, length, list(positions))
+
+    assert first_values == {"dummy_1": 351, "dummy_2": 28, "dummy_3": 4002}
+    assert second_values == {"dummy_1": 42, "dummy_2": 3600, "dummy_3": 2999}
+    assert read_values == {1: 4, 2: 5, 3: 6}
+    assert mock_motors.stubs[stub].calls == 4
+    assert first_age > 0 and second_age > 0
+    assert bus._pending_read is None
+
+
 @pytest.mark.parametrize(
     "addr, length, ids_values",
     [
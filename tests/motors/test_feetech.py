@@ -7,6 +7,7 @@ import pytest
 
 from lerobot.common.motors import Motor, MotorCalibration, MotorNormMode
 from lerobot.common.motors.feetech import MODEL_NUMBER, MODEL_NUMBER_TABLE, FeetechMotorsBus
+from lerobot.common.motors.feetech.feetech import PACKET_TIMEOUT_MARGIN_MS, SCAN_PACKET_TIMEOUT_MARGIN_MS
 from lerobot.common.motors.feetech.tables import STS_SMS_SERIES_CONTROL_TABLE
 from lerobot.common.utils.encoding_utils import encode_sign_magnitude
 
@@ -115,6 +116,29 @@ def test_ping(id_, mock_motors, dummy_motors):
     assert mock_motors.stubs[mobel_nb_stub].called
 
 
+def test__scan_ids_models_p1():
+    bus = FeetechMotorsBus("", {}, protocol_version=1)
+    packet_timeouts = []
+
+    def ping(id_):
+        bus.port_handler.setPacketTimeout(6)
+        packet_timeouts.append(bus.port_handler.packet_timeout)
+        return 777 if id_ == 2 else None
+
+    try:
+        with patch.object(bus, "ping", side_effect=ping):
+            ids_models = bus._scan_ids_models([1, 2, 3])
+        bus.port_handler.setPacketTimeout(6)
+    finally:
+        # The protocol sets the endianness of the SDK globally
+        scs.SCS_SETEND(0)
+
+    assert ids_models == {2: 777}
+    # Unanswered pings don't wait as long as regular packets
+    assert packet_timeouts == [SCAN_PACKET_TIMEOUT_MARGIN_MS] * 3
+    assert bus.port_handler.packet_timeout == PACKET_TIMEOUT_MARGIN_MS
+
+
 def test_broadcast_ping(mock_motors, dummy_motors):
     models = {m.id: m.model for m in dummy_motors.values()}
     addr, length = MODEL_NUMBER
@@ -295,6 +319,64 @@ def test__sync_read_comm(raise_on_error, mock_motors, dummy_motors):
     assert mock_motors.stubs[stub].called
 
 
+def test_sync_read_many(mock_motors, dummy_motors):
+    addr = STS_SMS_SERIES_CONTROL_TABLE[["Present_Position", "Present_Velocity"][0]][0]
+    # Present_Position (2 bytes) followed by Present_Velocity (2 bytes, sign-magnitude)
+    ids_values = {1: 1337 | (42 << 16), 2: 2048 | ((1 << 15 | 100) << 16), 3: 4016}
+    stub = mock_motors.build_sync_read_stub(addr, 4, ids_values)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    values = bus.sync_read_many(["Present_Position", "Present_Velocity"], normalize=False)
+
+    assert mock_motors.stubs[stub].calls == 1
+    assert values == {
+        "Present_Position": {"dummy_1": 1337, "dummy_2": 2048, "dummy_3": 4016},
+        "Present_Velocity": {"dummy_1": 42, "dummy_2": -100, "dummy_3": 0},
+    }
+
+
+def test__sync_read_plan_reused(mock_motors, dummy_motors):
+    addr, length, ids_values = (10, 4, {1: 1337, 2: 42})
+    stub = mock_motors.build_sync_read_stub(addr, length, ids_values)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    bus._sync_read(addr, length, list(ids_values))
+    sync_reader = bus._get_sync_read_plan(addr, length, list(ids_values))
+    read_values, _ = bus._sync_read(addr, length, list(ids_values))
+
+    assert mock_motors.stubs[stub].calls == 2
+    assert read_values == ids_values
+    assert list(bus._sync_read_plans.values()) == [sync_reader]
+
+
+def test_async_read(mock_motors, dummy_motors):
+    addr, length = STS_SMS_SERIES_CONTROL_TABLE["Present_Position"]
+    positions = {
+        1: [351, 42, 1337, 4],
+        2: [28, 3600, 2444, 5],
+        3: [4002, 2999, 146, 6],
+    }
+    stub = mock_motors.build_sequential_sync_read_stub(addr, length, positions)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    first_values, first_age = bus.async_read("Present_Position", normalize=False)
+    # The request for the second values is sent before they are needed
+    mock_motors.stubs[stub].wait_calls(2)
+    second_values, second_age = bus.async_read("Present_Position", normalize=False)
+    # Other communications receive the response to the pending request first
+    read_values, _ = bus._sync_read(addr, length, list(positions))
+
+    assert first_values == {"dummy_1": 351, "dummy_2": 28, "dummy_3": 4002}
+    assert second_values == {"dummy_1": 42, "dummy_2": 3600, "dummy_3": 2999}
+    assert read_values == {1: 4, 2: 5, 3: 6}
+    assert mock_motors.stubs[stub].calls == 4
+    assert first_age > 0 and second_age > 0
+    assert bus._pending_read is None
+
+
 @pytest.mark.parametrize(
     "addr, length, ids_values",
     [
@@ -1,10 +1,12 @@
 import re
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from lerobot.common.motors.motors_bus import (
     Motor,
+    MotorCalibration,
     MotorNormMode,
     assert_same_address,
     get_address,
@@ -27,6 +29,28 @@ def dummy_motors() -> dict[str, Motor]:
     }
 
 
+@pytest.fixture
+def calibrated_bus() -> MockMotorsBus:
+    motors = {
+        "dummy_1": Motor(1, "model_2", MotorNormMode.RANGE_M100_100),
+        "dummy_2": Motor(2, "model_3", MotorNormMode.RANGE_M100_100),
+        "dummy_3": Motor(3, "model_2", MotorNormMode.RANGE_0_100),
+        "dummy_4": Motor(4, "model_3", MotorNormMode.RANGE_0_100),
+        "dummy_5": Motor(5, "model_3", MotorNormMode.DEGREES),
+    }
+    calibration = {
+        "dummy_1": MotorCalibration(1, drive_mode=0, homing_offset=0, range_min=100, range_max=900),
+        "dummy_2": MotorCalibration(2, drive_mode=1, homing_offset=0, range_min=1000, range_max=3000),
+        "dummy_3": MotorCalibration(3, drive_mode=0, homing_offset=0, range_min=0, range_max=1023),
+        "dummy_4": MotorCalibration(4, drive_mode=1, homing_offset=0, range_min=500, range_max=3500),
+        "dummy_5": MotorCalibration(5, drive_mode=0, homing_offset=0, range_min=0, range_max=4095),
+    }
+    bus = MockMotorsBus("/dev/dummy-port", motors)
+    bus.calibration = calibration
+    bus.apply_drive_mode = True
+    return bus
+
+
 def test_get_ctrl_table():
     model = "model_1"
     ctrl_table = get_ctrl_table(DUMMY_MODEL_CTRL_TABLE, model)
@@ -340,3 +364,84 @@ def test_sync_write_by_value_dict(data_name, ids_values, dummy_motors):
     mock__encode_sign.assert_called_once_with(data_name, ids_values)
     if data_name in bus.normalized_data:
         mock__unnormalize.assert_called_once_with(ids_values)
+
+
+def test_normalize_array(calibrated_bus):
+    indices = np.arange(5)
+    raw = np.array([50, 1500, 512, 3500, 3072])
+    normalized = calibrated_bus._normalize_array(indices, raw)
+    expected = [-100.0, 50.0, 512 / 1023 * 100, 0.0, (3072 - 2047.5) * 360 / 4095]
+    np.testing.assert_allclose(normalized, expected)
+
+    unnormalized = calibrated_bus._unnormalize_array(indices, normalized)
+    np.testing.assert_array_equal(unnormalized, [100, 1500, 512, 3500, 3072])
+
+    # The dict-based conversions give the same results
+    ids_values = dict(zip(range(1, 6), raw.tolist(), strict=True))
+    assert calibrated_bus._normalize(ids_values) == dict(zip(range(1, 6), normalized.tolist(), strict=True))
+
+
+def test_unnormalize_array_bounds(calibrated_bus):
+    indices = np.array([0, 2, 3])
+    unnormalized = calibrated_bus._unnormalize_array(indices, np.array([150.0, -20.0, 120.0]))
+    np.testing.assert_array_equal(unnormalized, [900, 0, 500])
+
+
+def test_calibration_arrays_recompiled(calibrated_bus):
+    assert calibrated_bus.calibration_arrays.range_max[0] == 900
+    calibration = dict(calibrated_bus.calibration)
+    calibration["dummy_1"] = MotorCalibration(1, drive_mode=0, homing_offset=0, range_min=100, range_max=500)
+    calibrated_bus.calibration = calibration
+    assert calibrated_bus.calibration_arrays.range_max[0] == 500
+
+
+def test_normalize_array_errors(calibrated_bus):
+    calibrated_bus.calibration = {"dummy_1": calibrated_bus.calibration["dummy_1"]}
+    with pytest.raises(KeyError, match="dummy_2"):
+        calibrated_bus._normalize_array(np.array([0, 1]), np.array([0, 0]))
+
+    calibrated_bus.calibration = {
+        "dummy_1": MotorCalibration(1, drive_mode=0, homing_offset=0, range_min=100, range_max=100)
+    }
+    with pytest.raises(ValueError, match="Invalid calibration for motor 'dummy_1'"):
+        calibrated_bus._normalize_array(np.array([0]), np.array([0]))
+
+    calibrated_bus.calibration = {}
+    with pytest.raises(RuntimeError, match="has no calibration registered"):
+        calibrated_bus._normalize_array(np.array([0]), np.array([0]))
+
+
+def test_sync_read_array(calibrated_bus):
+    calibrated_bus.connect(handshake=False)
+    ids_values = {3: 512, 1: 50, 5: 3072}
+    motors = ["dummy_3", "dummy_1", "dummy_5"]
+
+    with (
+        patch.object(MockMotorsBus, "_sync_read", return_value=(ids_values, 0)),
+        patch.object(MockMotorsBus, "_decode_sign", side_effect=lambda _, ids_values: ids_values),
+    ):
+        values = calibrated_bus.sync_read_array("Present_Position", motors)
+        expected = calibrated_bus.sync_read("Present_Position", motors)
+        raw_values = calibrated_bus.sync_read_array("Present_Position", motors, normalize=False)
+
+    np.testing.assert_allclose(values, [expected[motor] for motor in motors])
+    np.testing.assert_array_equal(raw_values, [512, 50, 3072])
+
+
+def test_sync_write_array(calibrated_bus):
+    calibrated_bus.connect(handshake=False)
+    motors = ["dummy_4", "dummy_2"]
+    values = np.array([25.0, -40.0])
+
+    with (
+        patch.object(MockMotorsBus, "_sync_write", return_value=0) as mock__sync_write,
+        patch.object(MockMotorsBus, "_encode_sign", side_effect=lambda _, ids_values: ids_values),
+    ):
+        calibrated_bus.sync_write_array("Goal_Position", values, motors)
+        calibrated_bus.sync_write("Goal_Position", dict(zip(motors, values.tolist(), strict=True)))
+
+    array_call, dict_call = mock__sync_write.call_args_list
+    assert array_call.args[2] == dict_call.args[2] == {4: 2750, 2: 2400}
+
+    with pytest.raises(ValueError, match="Expected 2 values"):
+        calibrated_bus.sync_write_array("Goal_Position", np.zeros(3), motors)
@@ -1,3 +1,4 @@
+import time
 from contextlib import contextmanager
 from unittest.mock import MagicMock, patch
 
@@ -93,3 +94,55 @@ def test_send_action(follower):
 
     goal_pos = {m: (i + 1) * 10 for i, m in enumerate(follower.bus.motors)}
     follower.bus.sync_write.assert_called_once_with("Goal_Position", goal_pos)
+
+
+def test_get_observation_extra_motor_observations(follower):
+    follower.config.extra_motor_observations = ["Present_Velocity", "Present_Load"]
+    follower.connect()
+    motors = list(follower.bus.motors)
+    follower.bus.sync_read_many.return_value = {
+        data_name: {motor: offset + idx for idx, motor in enumerate(motors)}
+        for data_name, offset in [("Present_Position", 0), ("Present_Velocity", 10), ("Present_Load", 20)]
+    }
+
+    obs = follower.get_observation()
+
+    follower.bus.sync_read_many.assert_called_once_with(
+        ["Present_Position", "Present_Velocity", "Present_Load"]
+    )
+    follower.bus.sync_read.assert_not_called()
+    assert set(obs) == set(follower.observation_features)
+    for idx, motor in enumerate(motors):
+        assert (obs[f"{motor}.pos"], obs[f"{motor}.vel"], obs[f"{motor}.load"]) == (idx, 10 + idx, 20 + idx)
+
+
+def test_extra_motor_observations_invalid():
+    with pytest.raises(ValueError, match="'Goal_Position' can't be added to the observations"):
+        SO100FollowerConfig(port="/dev/null", extra_motor_observations=["Goal_Position"])
+
+
+def test_bus_worker(follower):
+    follower.config.bus_worker_fps = 200
+    follower.config.max_relative_target = 5.0
+    follower.connect()
+    assert follower.bus_worker.is_running
+
+    obs = follower.get_observation()
+    for idx, motor in enumerate(follower.bus.motors, 1):
+        assert obs[f"{motor}.pos"] == idx
+
+    action = {f"{m}.pos": i * 10 for i, m in enumerate(follower.bus.motors, 1)}
+    returned = follower.send_action(action)
+
+    # Goals are capped using the state read by the worker, and written by the worker
+    expected_goal_pos = {m: i + 5.0 for i, m in enumerate(follower.bus.motors, 1)}
+    assert returned == {f"{m}.pos": val for m, val in expected_goal_pos.items()}
+    deadline = time.perf_counter() + 2
+    while not follower.bus.sync_write.called and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    follower.bus.sync_write.assert_called_once_with("Goal_Position", expected_goal_pos)
+
+    worker = follower.bus_worker
+    follower.disconnect()
+    assert not worker.is_running
+    assert follower.bus_worker is None
@@ -0,0 +1,101 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.amp import GradScaler
+from torch.nn.parallel import DistributedDataParallel
+
+from lerobot.common.utils.distributed_utils import get_rank, get_world_size, is_main_process
+from lerobot.common.utils.logging_utils import AverageMeter, MetricsTracker
+from lerobot.scripts.train import update_policy
+
+WORLD_SIZE = 2
+
+
+class LinearPolicy(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.linear = torch.nn.Linear(3, 1)
+
+    def forward(self, batch: dict) -> tuple[torch.Tensor, dict]:
+        return torch.nn.functional.mse_loss(self.linear(batch["x"]), batch["y"]), {}
+
+
+def make_batch() -> dict:
+    generator = torch.Generator().manual_seed(1)
+    return {"x": torch.randn(8, 3, generator=generator), "y": torch.randn(8, 1, generator=generator)}
+
+
+def train_steps(policy: torch.nn.Module, batch: dict, num_steps: int = 3) -> MetricsTracker:
+    optimizer = torch.optim.SGD(policy.parameters(), lr=0.1)
+    metrics = {
+        "loss": AverageMeter("loss"),
+        "grad_norm": AverageMeter("grdn"),
+        "lr": AverageMeter("lr"),
+        "update_s": AverageMeter("updt_s"),
+    }
+    tracker = MetricsTracker(len(batch["x"]), 100, 10, metrics)
+    for _ in range(num_steps):
+        tracker, _ = update_policy(tracker, policy, batch, optimizer, 10.0, GradScaler("cpu", enabled=False))
+    return tracker
+
+
+def run_ddp_training(rank: int, init_file: str, results: dict):
+    dist.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=WORLD_SIZE)
+    try:
+        assert (get_rank(), get_world_size(), is_main_process()) == (rank, WORLD_SIZE, rank == 0)
+        policy = LinearPolicy()
+        # Each process trains on its own half of the batch
+        batch = {key: val.chunk(WORLD_SIZE)[rank] for key, val in make_batch().items()}
+        tracker = train_steps(DistributedDataParallel(policy), batch)
+        local_loss = tracker.loss.avg
+        tracker.all_reduce()
+        results[rank] = {
+            "state_dict": policy.state_dict(),
+            "local_loss": local_loss,
+            "loss": tracker.loss.avg,
+            "count": tracker.loss.count,
+        }
+    finally:
+        dist.destroy_process_group()
+
+
+def test_ddp_update_policy_and_metrics(tmp_path):
+    results = mp.Manager().dict()
+    mp.spawn(run_ddp_training, args=(str(tmp_path / "init"), results), nprocs=WORLD_SIZE)
+
+    # The gradients averaged over the processes are the gradients of the whole batch
+    policy = LinearPolicy()
+    train_steps(policy, make_batch())
+    for rank in range(WORLD_SIZE):
+        for key, val in policy.state_dict().items():
+            torch.testing.assert_close(results[rank]["state_dict"][key], val)
+
+    # Metrics are averaged over all processes
+    local_losses = [results[rank]["local_loss"] for rank in range(WORLD_SIZE)]
+    assert local_losses[0] != pytest.approx(local_losses[1])
+    for rank in range(WORLD_SIZE):
+        assert results[rank]["loss"] == pytest.approx(sum(local_losses) / WORLD_SIZE)
+        assert results[rank]["count"] == 3 * WORLD_SIZE
+
+
+def test_metrics_tracker_all_reduce_single_process():
+    tracker = MetricsTracker(8, 100, 10, {"loss": AverageMeter("loss")})
+    tracker.loss = 2.0
+    tracker.loss = 4.0
+    tracker.all_reduce()
+    assert (tracker.loss.avg, tracker.loss.count) == (3.0, 2)
@@ -14,17 +14,23 @@
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
+import torch
+from safetensors.torch import load_file
+
 from lerobot.common.constants import (
     CHECKPOINTS_DIR,
     LAST_CHECKPOINT_LINK,
     OPTIMIZER_PARAM_GROUPS,
     OPTIMIZER_STATE,
+    PRETRAINED_MODEL_DIR,
     RNG_STATE,
     SCHEDULER_STATE,
     TRAINING_STATE_DIR,
     TRAINING_STEP,
 )
 from lerobot.common.utils.train_utils import (
+    AsyncCheckpointer,
     get_step_checkpoint_dir,
     get_step_identifier,
     load_training_state,
@@ -95,3 +101,81 @@ def test_save_load_training_state(tmp_path, optimizer, scheduler):
     assert loaded_step == 10
     assert loaded_optimizer is optimizer
     assert loaded_scheduler is scheduler
+
+
+class TiedPolicy(torch.nn.Module):
+    class Config:
+        def _save_pretrained(self, save_directory: Path) -> None:
+            (save_directory / "config.json").write_text("{}")
+
+    def __init__(self):
+        super().__init__()
+        self.config = self.Config()
+        self.encoder = torch.nn.Linear(4, 4)
+        self.decoder = torch.nn.Linear(4, 4)
+        self.decoder.weight = self.encoder.weight
+
+
+class TrainConfig:
+    def save_pretrained(self, save_directory: Path) -> None:
+        (save_directory / "train_config.json").write_text("{}")
+
+
+@pytest.mark.parametrize("asynchronous", [True, False])
+def test_async_checkpointer(tmp_path, asynchronous):
+    policy = TiedPolicy()
+    optimizer = torch.optim.Adam(policy.parameters())
+    policy.encoder.bias.sum().backward()
+    optimizer.step()
+    checkpointer = AsyncCheckpointer(keep_last_n=2, asynchronous=asynchronous)
+    saved_dirs = []
+
+    for step in range(1, 4):
+        expected_state = {k: v.clone() for k, v in policy.state_dict().items()}
+        checkpoint_dir = get_step_checkpoint_dir(tmp_path, 1000, step)
+        checkpointer.save(checkpoint_dir, step, TrainConfig(), policy, optimizer, on_saved=saved_dirs.append)
+        # The checkpoint holds the states at the time of the call
+        with torch.no_grad():
+            policy.encoder.weight.add_(1.0)
+    checkpointer.close()
+
+    assert saved_dirs == [get_step_checkpoint_dir(tmp_path, 1000, step) for step in range(1, 4)]
+    # Only the last 2 checkpoints are kept
+    checkpoints_dir = tmp_path / CHECKPOINTS_DIR
+    assert sorted(path.name for path in checkpoints_dir.iterdir()) == [
+        "000002",
+        "000003",
+        LAST_CHECKPOINT_LINK,
+    ]
+    assert (checkpoints_dir / LAST_CHECKPOINT_LINK).resolve() == checkpoint_dir
+
+    pretrained_dir = checkpoint_dir / PRETRAINED_MODEL_DIR
+    assert (pretrained_dir / "config.json").is_file()
+    assert (pretrained_dir / "train_config.json").is_file()
+    # Tied weights are saved once, like `PreTrainedPolicy.save_pretrained` does
+    weights = load_file(pretrained_dir / "model.safetensors")
+    assert set(weights) == set(expected_state) - {"encoder.weight"}
+    for key, val in weights.items():
+        torch.testing.assert_close(val, expected_state[key])
+
+    loaded_step, _, _ = load_training_state(checkpoint_dir, optimizer, None)
+    assert loaded_step == 3
+
+
+def test_async_checkpointer_raises_errors(tmp_path):
+    def on_saved(checkpoint_dir):
+        raise RuntimeError("Upload failed")
+
+    policy = TiedPolicy()
+    checkpointer = AsyncCheckpointer()
+    checkpointer.save(
+        tmp_path / "000001",
+        1,
+        TrainConfig(),
+        policy,
+        torch.optim.SGD(policy.parameters(), lr=0.1),
+        on_saved=on_saved,
+    )
+    with pytest.raises(RuntimeError, match="Upload failed"):
+        checkpointer.wait()
+    assert (tmp_path / "000001" / PRETRAINED_MODEL_DIR / "model.safetensors").is_file()